@@ -1,7 +1,10 @@
 from flask import Flask
 from .config import Config
 from .database.mongo import init_mongo
-from .database.init_db import init_db
+from .database.migrations import ensure_schema, register_cli
+from .services.metrics import init_metrics
+from .services.timetable_import import register_cli as register_import_cli
+from .services.faculty_load import register_cli as register_load_cli
 from flask_cors import CORS
 
 def create_app():
@@ -9,12 +12,17 @@ def create_app():
     CORS(app)
 
     app.config.from_object(Config)
+    init_metrics(app)
 
     # Initialize MongoDB
     init_mongo(app)
 
+    # One version check; DDL only runs when migrations are pending
     from app.database.mongo import db
-    init_db(db=db)
+    ensure_schema(db)
+    register_cli(app)
+    register_import_cli(app)
+    register_load_cli(app)
 
     # import blueprints
     from app.routes.main_routes import main_bp
@@ -1,5 +1,108 @@
 import os
 
+
+def optional_int(name, default=None):
+    """Integer env var; empty or missing means the default (None = driver default)."""
+    value = os.getenv(name, "")
+    return int(value) if value.strip() else default
+
+
 class Config:
     MONGO_URI = os.getenv("MONGO_URI")
-    MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
\ No newline at end of file
+    MONGO_DB_NAME = os.getenv("MONGO_DB_NAME")
+
+    # MongoClient pool / timeouts, one pool per worker process
+    MONGO_MAX_POOL_SIZE = optional_int("MONGO_MAX_POOL_SIZE", 100)
+    MONGO_MIN_POOL_SIZE = optional_int("MONGO_MIN_POOL_SIZE", 0)
+    MONGO_MAX_CONNECTING = optional_int("MONGO_MAX_CONNECTING", 2)
+    MONGO_MAX_IDLE_TIME_MS = optional_int("MONGO_MAX_IDLE_TIME_MS")
+    # Fail a checkout instead of queueing forever when the pool is exhausted
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = optional_int("MONGO_WAIT_QUEUE_TIMEOUT_MS")
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = optional_int("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)
+    MONGO_CONNECT_TIMEOUT_MS = optional_int("MONGO_CONNECT_TIMEOUT_MS", 10000)
+    MONGO_SOCKET_TIMEOUT_MS = optional_int("MONGO_SOCKET_TIMEOUT_MS")
+    # Wire compression, e.g. "zstd,snappy,zlib" (zstd/snappy need extra packages)
+    MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+    # Seconds a cached faculty week / temp overlay stays valid in the
+    # in-memory occupancy index before it is reloaded from Mongo.
+    OCCUPANCY_INDEX_TTL = int(os.getenv("OCCUPANCY_INDEX_TTL", "30"))
+
+    # Substitution chain search (get-rearrange-options / rearrange-lecture)
+    REARRANGE_MAX_DEPTH = int(os.getenv("REARRANGE_MAX_DEPTH", "3"))
+    REARRANGE_TIME_BUDGET_MS = int(os.getenv("REARRANGE_TIME_BUDGET_MS", "250"))
+    REARRANGE_MAX_OPTIONS = int(os.getenv("REARRANGE_MAX_OPTIONS", "20"))
+    # Chain ranking: cost of each lecture moved, on top of the load score
+    # of the faculty taking it (see LOAD_SUBSTITUTION_WEIGHT)
+    REARRANGE_HOP_COST = int(os.getenv("REARRANGE_HOP_COST", "20"))
+
+    # Days a temp substitution is kept after its date before the TTL index
+    # removes it from temp_faculty_timetable.
+    TEMP_RETENTION_DAYS = int(os.getenv("TEMP_RETENTION_DAYS", "30"))
+
+    # Grouped fetch-all-changes: days either side of today when no from / to
+    # is given, and most items grouped into one response (mode=list pages)
+    CHANGES_WINDOW_DAYS = int(os.getenv("CHANGES_WINDOW_DAYS", "7"))
+    CHANGES_MAX_GROUPED = int(os.getenv("CHANGES_MAX_GROUPED", "5000"))
+
+    # Cursor batch size for streamed (NDJSON) faculty listings
+    FACULTY_STREAM_BATCH_SIZE = int(os.getenv("FACULTY_STREAM_BATCH_SIZE", "200"))
+
+    # Timetable generator (POST /api/generate-timetable): search time used
+    # when a request gives none, and the most a request may ask for
+    GENERATE_TIME_LIMIT_MS = int(os.getenv("GENERATE_TIME_LIMIT_MS", "5000"))
+    GENERATE_MAX_TIME_LIMIT_MS = int(os.getenv("GENERATE_MAX_TIME_LIMIT_MS", "20000"))
+
+    # Bulk timetable import (POST /api/timetable/import, `flask import-timetables`);
+    # XLSX files need the optional openpyxl package
+    IMPORT_MAX_ROWS = int(os.getenv("IMPORT_MAX_ROWS", "50000"))
+
+    # Timetable exports (/api/export/...): cursor batch size, longest date
+    # range, and the slot clock used for iCalendar events (slot 1 at 8:00)
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "200"))
+    EXPORT_MAX_DAYS = int(os.getenv("EXPORT_MAX_DAYS", "62"))
+    EXPORT_DAY_START_HOUR = int(os.getenv("EXPORT_DAY_START_HOUR", "8"))
+    EXPORT_SLOT_MINUTES = int(os.getenv("EXPORT_SLOT_MINUTES", "60"))
+
+    # Effective timetables (GET /api/effective-timetable) are cached per
+    # date; this many dates are kept, least recently used dropped first
+    EFFECTIVE_CACHE_DATES = int(os.getenv("EFFECTIVE_CACHE_DATES", "14"))
+
+    # Live substitution feed (GET /api/changes/stream): "mongo" follows a
+    # change stream on temp_faculty_timetable (replica set only) so every
+    # worker sees every write; "local" publishes from this process's write
+    # paths and is only complete with a single worker process; "auto" uses
+    # the change stream when available and otherwise falls back to local,
+    # sending clients a reset on every reconnect. Events kept for
+    # Last-Event-ID resume, heartbeat interval, how long one response stays
+    # open before the client reconnects, the reconnect delay suggested to
+    # EventSource, and open streams allowed per process (each holds a
+    # worker thread, see ASGI_WORKER_THREADS; beyond it clients get a 503).
+    CHANGE_FEED_SOURCE = os.getenv("CHANGE_FEED_SOURCE", "auto").lower()
+    CHANGE_FEED_BUFFER = int(os.getenv("CHANGE_FEED_BUFFER", "1000"))
+    CHANGE_FEED_HEARTBEAT = int(os.getenv("CHANGE_FEED_HEARTBEAT", "15"))
+    CHANGE_FEED_STREAM_SECONDS = int(os.getenv("CHANGE_FEED_STREAM_SECONDS", "300"))
+    CHANGE_FEED_RETRY_MS = int(os.getenv("CHANGE_FEED_RETRY_MS", "3000"))
+    CHANGE_FEED_MAX_STREAMS = int(os.getenv("CHANGE_FEED_MAX_STREAMS", "8"))
+
+    # Substitute ranking: covers dated within the last LOAD_WINDOW_DAYS count
+    # towards a faculty's recent load, each worth this many regular lectures
+    LOAD_WINDOW_DAYS = int(os.getenv("LOAD_WINDOW_DAYS", "28"))
+    LOAD_SUBSTITUTION_WEIGHT = int(os.getenv("LOAD_SUBSTITUTION_WEIGHT", "3"))
+
+    # Absence cover (POST /api/absence): longest absence, and how many
+    # lectures one substitute may be given per day
+    ABSENCE_MAX_DAYS = int(os.getenv("ABSENCE_MAX_DAYS", "31"))
+    ABSENCE_MAX_COVERS_PER_DAY = int(os.getenv("ABSENCE_MAX_COVERS_PER_DAY", "2"))
+
+    # Apply pending schema migrations at boot (otherwise: `flask migrate`)
+    AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "true").lower() == "true"
+    # Lease on the migration lock, renewed every third of it while migrating
+    MIGRATION_LOCK_SECONDS = int(os.getenv("MIGRATION_LOCK_SECONDS", "60"))
+
+    # Async mode: slot lookups run on an AsyncMongoClient with their
+    # independent queries awaited together (see app/database/async_mongo.py)
+    ASYNC_MODE = os.getenv("ASYNC_MODE", "false").lower() == "true"
+    ASYNC_TIMEOUT_SECONDS = int(os.getenv("ASYNC_TIMEOUT_SECONDS", "30"))
+    # Threads the ASGI adapter (asgi.py) uses to run Flask views
+    ASGI_WORKER_THREADS = int(os.getenv("ASGI_WORKER_THREADS", "32"))
@@ -0,0 +1,72 @@
+from flask import request, jsonify, current_app
+
+from app.services.absence_cover import (
+    AbsenceError,
+    commit_absence_cover,
+    plan_absence_cover
+)
+from app.services.temp_assignments import SlotTakenError
+
+
+# ===============================
+# 🔹 MAIN CONTROLLER
+# ===============================
+def cover_absence():
+    """
+    Cover every lecture of an absent faculty over a date range.
+
+    JSON body:
+      {
+        "faculty_id": "fac1", "from": "2025-01-27", "to"?: "2025-02-01",
+        "max_per_day"?: 2,
+        "commit"?: false to only return the plan
+      }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        faculty_id = data.get("faculty_id")
+        date_from = data.get("from") or data.get("date")
+
+        if not faculty_id or not date_from:
+            return jsonify({"success": False, "message": "Missing faculty_id or from"}), 400
+
+        try:
+            max_per_day = int(data["max_per_day"]) if data.get("max_per_day") is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "message": "max_per_day must be an integer"}), 400
+
+        if max_per_day is not None and max_per_day < 1:
+            return jsonify({"success": False, "message": "max_per_day must be at least 1"}), 400
+
+        commit = data.get("commit", True)
+        if not isinstance(commit, bool):
+            return jsonify({"success": False, "message": "commit must be true or false"}), 400
+
+        try:
+            plan = plan_absence_cover(faculty_id, date_from, data.get("to"), max_per_day)
+        except AbsenceError as e:
+            return jsonify({"success": False, "message": str(e)}), 400
+
+        if commit and plan["assignments"]:
+            try:
+                commit_absence_cover(plan)
+            except SlotTakenError as e:
+                # Someone booked a planned substitute meanwhile; nothing was stored
+                return jsonify({"success": False, "message": f"{e}, plan again"}), 409
+
+        plan["committed"] = bool(commit and plan["assignments"])
+        plan["success"] = not plan["uncovered"]
+        plan["message"] = (
+            f"{len(plan['assignments'])} lecture(s) covered, "
+            f"{len(plan['uncovered'])} without a free faculty"
+        )
+
+        if plan["uncovered"] and not plan["assignments"]:
+            return jsonify(plan), 409
+
+        return jsonify(plan), 200
+
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"success": False, "message": "Internal server error"}), 500
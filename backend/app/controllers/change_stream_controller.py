@@ -0,0 +1,47 @@
+from flask import request, jsonify, Response, stream_with_context, current_app
+
+from app.config import Config
+from app.services.change_feed import FILTER_KEYS, ensure_watcher, stream_changes, stream_limit
+
+
+# ===============================
+# 🔹 CONTROLLER
+# ===============================
+def stream_temp_changes():
+    """
+    Server-sent events for new, deleted and rearranged substitutions,
+    instead of polling fetch-all-changes.
+
+    Query params:
+      faculty, branch, class, sem   only matching events are sent
+      last_event_id                 resume point for clients that can't
+                                    send the Last-Event-ID header
+    A "reset" event means changes may have been missed: refetch the list.
+    Past CHANGE_FEED_MAX_STREAMS open streams the answer is a 503 with
+    Retry-After.
+    """
+    try:
+        ensure_watcher()
+
+        filters = {key: request.args.get(key) for key in FILTER_KEYS}
+        last_event_id = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+
+        chunks = stream_limit.open(stream_changes(last_event_id, filters))
+        if chunks is None:
+            return jsonify({
+                "error": "Too many open change streams, retry later"
+            }), 503, {"Retry-After": str(max(1, Config.CHANGE_FEED_RETRY_MS // 1000))}
+
+        return Response(
+            stream_with_context(chunks),
+            mimetype="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                # Stop nginx-style proxies from buffering the stream
+                "X-Accel-Buffering": "no",
+            }
+        )
+
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"error": "Internal server error"}), 500
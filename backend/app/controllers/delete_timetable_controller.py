@@ -1,18 +1,18 @@
 from flask import request, jsonify
 from app.database.mongo import db
-from app.controllers.timetable_controller import (
-    ALLOWED_BRANCHES,
-    TOTAL_SLOTS,
-    normalize_day_slots
-)
+from app.services.class_schedule import make_class_id
+from app.services.timetable_writer import delete_class_timetables
+from app.controllers.timetable_controller import ALLOWED_BRANCHES
 
 def delete_timetable():
     try:
         sem = request.form.get("sem")
         branch = request.form.get("branch")
         class_name = request.form.get("class")
+        # all_classes=true tears down every class of the branch/semester
+        all_classes = request.form.get("all_classes", "").lower() in ("1", "true", "yes")
 
-        if not sem or not branch or not class_name:
+        if not sem or not branch or not (class_name or all_classes):
             return jsonify({"error": "Missing sem, branch or class"}), 400
 
         if branch not in ALLOWED_BRANCHES:
@@ -22,49 +22,31 @@ def delete_timetable():
         if sem < 1 or sem > 8:
             return jsonify({"error": "Invalid semester"}), 400
 
-        safe_branch = branch.lower().replace("(", "").replace(")", "")
-        class_id = f"sem{sem}_{safe_branch}_{class_name.lower()}"
-
         classwise_col = db.classwise_faculty
-        faculty_tt_col = db.faculty_timetable
-
-        class_doc = classwise_col.find_one({"_id": class_id})
-        if not class_doc:
-            return jsonify({"error": "Timetable not found"}), 404
-
-        allowed_faculty = class_doc.get("allowed_faculty", [])
-        lecture_prefix = f"{branch}-{class_name}-Sem{sem}-"
-
-        for faculty_id in allowed_faculty:
-            faculty_doc = faculty_tt_col.find_one({"_id": faculty_id})
-            if not faculty_doc:
-                continue
 
-            timetable = faculty_doc.get("timetable", {})
-            updated = False
+        if all_classes:
+            class_docs = list(classwise_col.find({"sem": sem, "branch": branch}))
+        else:
+            class_id = make_class_id(sem, branch, class_name)
+            class_doc = classwise_col.find_one({"_id": class_id})
+            class_docs = [class_doc] if class_doc else []
 
-            for day, slots in timetable.items():
-                slots = normalize_day_slots(slots)
-
-                for i in range(TOTAL_SLOTS):
-                    if isinstance(slots[i], str) and slots[i].startswith(lecture_prefix):
-                        slots[i] = "free"
-                        updated = True
-
-                timetable[day] = slots
-
-            if updated:
-                faculty_tt_col.update_one(
-                    {"_id": faculty_id},
-                    {"$set": {"timetable": timetable}}
-                )
+        if not class_docs:
+            return jsonify({"error": "Timetable not found"}), 404
 
-        classwise_col.delete_one({"_id": class_id})
+        # One read, one bulk_write, one temp purge — in a single transaction
+        result = delete_class_timetables(class_docs)
 
-        return jsonify({
+        response = {
             "message": "Timetable deleted successfully",
-            "class_id": class_id
-        }), 200
+            "class_id": result["class_ids"][0],
+            "faculty_updated": result["faculty_updated"],
+            "temp_deleted": result["temp_deleted"]
+        }
+        if all_classes:
+            response["class_ids"] = result["class_ids"]
+
+        return jsonify(response), 200
 
     except Exception as e:
         print("ERROR:", e)
@@ -0,0 +1,58 @@
+from flask import request, jsonify, current_app
+
+from app.services.class_schedule import make_class_id
+from app.services.effective_timetable import (
+    EffectiveTimetableError,
+    effective_timetables,
+    parse_date
+)
+
+
+# ===============================
+# 🔹 CONTROLLER
+# ===============================
+def get_effective_timetable():
+    """
+    What actually happens on a date: the permanent timetable with that
+    date's substitutions applied, served from the per-date cache.
+
+    Query params:
+      date=YYYY-MM-DD          (default today)
+      sem, branch, class       a class timetable, or
+      faculty=<faculty_id>     a faculty timetable
+    """
+    try:
+        try:
+            selected_date, day_name = parse_date(request.args.get("date"))
+        except EffectiveTimetableError as e:
+            return jsonify({"error": str(e)}), 400
+
+        faculty_id = request.args.get("faculty")
+        sem = request.args.get("sem")
+        branch = request.args.get("branch")
+        class_name = request.args.get("class")
+
+        if faculty_id:
+            view = effective_timetables.for_faculty(faculty_id, selected_date, day_name)
+            if view is None:
+                return jsonify({"error": "Faculty not found"}), 404
+            return jsonify(view), 200
+
+        if not sem or not branch or not class_name:
+            return jsonify({"error": "Give faculty, or sem, branch and class"}), 400
+
+        try:
+            sem = int(sem)
+        except ValueError:
+            return jsonify({"error": "Invalid semester"}), 400
+
+        view = effective_timetables.for_class(
+            make_class_id(sem, branch, class_name), selected_date, day_name
+        )
+        if view is None:
+            return jsonify({"error": "Class not found"}), 404
+        return jsonify(view), 200
+
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,88 @@
+from flask import request, jsonify, Response, stream_with_context, current_app
+
+from app.controllers.timetable_controller import ALLOWED_BRANCHES
+from app.services.timetable_export import (
+    FORMATS,
+    ExportError,
+    class_entries,
+    export_dates,
+    faculty_entries,
+    render
+)
+
+
+# ===============================
+# 🔹 HELPERS
+# ===============================
+def parse_export_args(args):
+    """(format, branch, sem, dates) from the query string; raises ExportError."""
+    file_format = (args.get("format") or "csv").lower()
+    if file_format not in FORMATS:
+        raise ExportError("format must be csv, jsonl or ical")
+
+    branch = args.get("branch")
+    if branch and branch not in ALLOWED_BRANCHES:
+        raise ExportError("Invalid branch")
+
+    sem = args.get("sem")
+    if sem:
+        try:
+            sem = int(sem)
+        except ValueError:
+            raise ExportError("Invalid semester")
+        if sem < 1 or sem > 8:
+            raise ExportError("Invalid semester")
+
+    return file_format, branch, sem, export_dates(args.get("from"), args.get("to"))
+
+
+def stream_export(kind, entries_for):
+    try:
+        file_format, branch, sem, dates = parse_export_args(request.args)
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+
+    mimetype, extension = FORMATS[file_format]
+    name = "_".join(
+        str(part) for part in (kind, branch, f"sem{sem}" if sem else None) if part
+    )
+    filename = name.replace("(", "").replace(")", "")
+
+    chunks = render(entries_for(branch, sem, dates), file_format, kind, dates)
+
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}.{extension}"'
+        }
+    )
+
+
+# ===============================
+# 🔹 CONTROLLERS
+# ===============================
+def export_class_timetables():
+    """
+    Stream every class timetable, optionally for one branch / semester.
+
+    Query params:
+      format=csv|jsonl|ical   (default csv)
+      branch, sem             narrow the export
+      from, to                ISO dates: list each day with temp substitutions
+                              merged in instead of the weekly timetable
+    """
+    try:
+        return stream_export("classes", class_entries)
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"error": "Internal server error"}), 500
+
+
+def export_faculty_timetables():
+    """Stream every faculty timetable; same parameters as export_class_timetables."""
+    try:
+        return stream_export("faculties", faculty_entries)
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"error": "Internal server error"}), 500
@@ -1,6 +1,14 @@
+from bson import ObjectId
 from flask import Blueprint, request, jsonify
+from app.config import Config
 from app.database.mongo import db
-from datetime import date
+from app.services.change_feed import DELETED, publish_changes
+from app.services.effective_timetable import effective_timetables
+from app.services.faculty_load import count_substitutions
+from app.services.occupancy_index import occupancy_index
+from app.services.slot_codec import class_directory, decode_slot, encode_legacy_slot
+from app.services.versioning import versioned, bump, TEMP_SCOPE
+from datetime import date, timedelta
 
 fetch_all_changes_bp = Blueprint("fetch_all_changes", __name__)
 
@@ -28,9 +36,156 @@ TIME_SLOT_KEYS = [
 ]
 
 
+# Reverse lookup: "mon" -> "Monday"
+DAY_KEY_TO_NAME = {key: name for name, key in DAYS_MAP.items()}
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+class ChangesFilterError(ValueError):
+    """Bad fetch-all-changes query parameter."""
+
+
+def build_changes_filter(args):
+    """
+    Mongo filter from query params:
+    from / to (ISO dates, inclusive), faculty, branch / class / sem.
+    branch, class and sem each narrow the classes on their own.
+    """
+    query = {}
+
+    try:
+        date_from = date.fromisoformat(args["from"]).isoformat() if args.get("from") else None
+        date_to = date.fromisoformat(args["to"]).isoformat() if args.get("to") else None
+    except ValueError:
+        raise ChangesFilterError("from / to must be ISO dates (YYYY-MM-DD)")
+    if date_from and date_to and date_to < date_from:
+        raise ChangesFilterError("to is before from")
+
+    if date_from or date_to:
+        query["date"] = {}
+        if date_from:
+            query["date"]["$gte"] = date_from
+        if date_to:
+            query["date"]["$lte"] = date_to
+
+    faculty = args.get("faculty")
+    if faculty:
+        query["faculty_id"] = faculty
+
+    class_query = {}
+    if args.get("branch"):
+        class_query["branch"] = args.get("branch")
+    if args.get("class"):
+        class_query["class"] = args.get("class")
+    if args.get("sem"):
+        try:
+            class_query["sem"] = int(args.get("sem"))
+        except ValueError:
+            raise ChangesFilterError("sem must be an integer")
+
+    if class_query:
+        # Resolve the classes first; temp records are then an indexed $in on class_id
+        query["class_id"] = {
+            "$in": db.classwise_faculty.distinct("_id", class_query)
+        }
+
+    return query
+
+
+def default_window():
+    """(from, to) of the grouped view without dates: CHANGES_WINDOW_DAYS around today."""
+    today = date.today()
+    return (
+        (today - timedelta(days=Config.CHANGES_WINDOW_DAYS)).isoformat(),
+        (today + timedelta(days=Config.CHANGES_WINDOW_DAYS)).isoformat(),
+    )
+
+
+def window_variant():
+    # The default window moves with the date, which no counter tracks
+    return "{}:{}".format(*default_window())
+
+
+def decode_changes(items):
+    """Replace each item's class_id with the legacy assigned_to string."""
+    refs = class_directory.refs({item.get("class_id") for item in items})
+    for item in items:
+        item["assigned_to"] = decode_slot(
+            item.pop("class_id", None), item.get("lec_no"), refs
+        )
+    return items
+
+
+def list_changes(query, args):
+    """Cursor-paginated flat list, newest first."""
+    try:
+        limit = min(int(args.get("limit", DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+
+    cursor = args.get("cursor")
+    if cursor:
+        if not ObjectId.is_valid(cursor):
+            return jsonify({"error": "Invalid cursor"}), 400
+        query["_id"] = {"$lt": ObjectId(cursor)}
+
+    docs = list(
+        db.temp_faculty_timetable.find(
+            query,
+            {"faculty_id": 1, "class_id": 1, "date": 1, "day": 1, "lec_no": 1}
+        )
+        .sort("_id", -1)
+        .limit(limit + 1)
+    )
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+
+    changes = decode_changes([
+        {
+            "id": str(doc["_id"]),
+            "faculty": doc.get("faculty_id"),
+            "class_id": doc.get("class_id"),
+            "date": doc.get("date"),
+            "day": DAY_KEY_TO_NAME.get(doc.get("day")),
+            "lec_no": doc.get("lec_no"),
+        }
+        for doc in docs
+    ])
+
+    return jsonify({
+        "changes": changes,
+        "count": len(changes),
+        "next_cursor": str(docs[-1]["_id"]) if has_more else None,
+    }), 200
+
+
+@versioned(lambda: [TEMP_SCOPE], window_variant)
 def fetch_all_changes():
     try:
         temp_col = db.temp_faculty_timetable
+        try:
+            query = build_changes_filter(request.args)
+        except ChangesFilterError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # -------------------------------
+        # Flat, cursor-paginated listing
+        # -------------------------------
+        if request.args.get("mode") == "list":
+            return list_changes(query, request.args)
+
+        # -------------------------------
+        # Grouped view: bounded window, bounded items
+        # -------------------------------
+        # Every item is pushed into one aggregation result document, so
+        # without from / to only CHANGES_WINDOW_DAYS either side of today
+        # are grouped, and at most CHANGES_MAX_GROUPED items per response.
+        if "date" not in query:
+            window_from, window_to = default_window()
+            query["date"] = {"$gte": window_from, "$lte": window_to}
 
         # -------------------------------
         # Initialize empty schedule
@@ -38,38 +193,59 @@ def fetch_all_changes():
         schedule = {day: {slot: [] for slot in TIME_SLOT_KEYS} for day in DAYS}
 
         # -------------------------------
-        # Fetch all temp changes
+        # Group by day + slot inside Mongo, count in the same round trip
         # -------------------------------
-        changes = temp_col.find({})
+        pipeline = [
+            {"$match": query},
+            {
+                "$facet": {
+                    "total": [{"$count": "n"}],
+                    "groups": [
+                        {"$sort": {"date": 1, "_id": 1}},
+                        {"$limit": Config.CHANGES_MAX_GROUPED},
+                        {
+                            "$group": {
+                                "_id": {"day": "$day", "lec_no": "$lec_no"},
+                                "items": {
+                                    "$push": {
+                                        "faculty": "$faculty_id",
+                                        "class_id": "$class_id",
+                                        "date": "$date",
+                                        "lec_no": "$lec_no",
+                                    }
+                                },
+                            }
+                        }
+                    ],
+                }
+            },
+        ]
 
-        for change in changes:
-            faculty_id = change.get("faculty_id")
-            assigned_to = change.get("assigned_to")
-            day_key = change.get("day")  # mon, tue, etc.
-            lec_no = change.get("lec_no")  # 0-based index
-            date = change.get("date")
+        result = next(temp_col.aggregate(pipeline), {"total": [], "groups": []})
+        decode_changes([item for group in result["groups"] for item in group["items"]])
 
-            # Map day_key → Day name
-            day_name = next((d for d, k in DAYS_MAP.items() if k == day_key), None)
+        for group in result["groups"]:
+            day_name = DAY_KEY_TO_NAME.get(group["_id"].get("day"))
+            lec_no = group["_id"].get("lec_no")
 
-            if not day_name or lec_no is None or lec_no >= TOTAL_SLOTS:
+            if day_name not in schedule or not isinstance(lec_no, int):
+                continue
+            if lec_no < 0 or lec_no >= TOTAL_SLOTS:
                 continue
 
-            slot_key = TIME_SLOT_KEYS[lec_no]
+            schedule[day_name][TIME_SLOT_KEYS[lec_no]] = group["items"]
 
-            schedule[day_name][slot_key].append(
-                {
-                    "faculty": faculty_id,
-                    "assigned_to": assigned_to,
-                    "date": date,
-                    "lec_no": lec_no,
-                }
-            )
+        total = result["total"][0]["n"] if result["total"] else 0
 
         return (
-            jsonify(
-                {"total_changes": temp_col.count_documents({}), "changes": schedule}
-            ),
+            jsonify({
+                "total_changes": total,
+                "changes": schedule,
+                "from": query["date"].get("$gte"),
+                "to": query["date"].get("$lte"),
+                # More matched than were grouped: narrow the range or use mode=list
+                "truncated": total > Config.CHANGES_MAX_GROUPED,
+            }),
             200,
         )
 
@@ -101,9 +277,12 @@ def delete_temp_change():
         # Build query to find the exact record
         query = {"faculty_id": faculty_id, "date": date, "day": day, "lec_no": lec_no}
 
-        # If assigned_to is provided, include it in the query for more specificity
+        # If assigned_to is provided, include its class for more specificity
         if assigned_to:
-            query["assigned_to"] = assigned_to
+            try:
+                query["class_id"] = encode_legacy_slot(assigned_to)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
 
         # Find the document to delete
         document = temp_col.find_one(query)
@@ -115,22 +294,11 @@ def delete_temp_change():
         result = temp_col.delete_one(query)
 
         if result.deleted_count > 0:
-            # Also check if we should delete from regular timetable if it exists
-            # This is optional - depends on your business logic
-            regular_col = db.faculty_timetable
-
-            # Build query for regular timetable
-            regular_query = {"faculty_id": faculty_id, "day": day, "lec_no": lec_no}
-
-            # Check if there's a regular timetable entry for this slot
-            regular_entry = regular_col.find_one(regular_query)
-
-            if regular_entry:
-                # You could choose to restore the regular timetable here
-                # For now, just log it
-                print(
-                    f"Note: Faculty {faculty_id} has a regular timetable entry for {day} slot {lec_no}"
-                )
+            count_substitutions([document], sign=-1)
+            occupancy_index.invalidate_date(date)
+            effective_timetables.invalidate_date(date)
+            publish_changes(DELETED, [document])
+            bump(TEMP_SCOPE)
 
             return (
                 jsonify(
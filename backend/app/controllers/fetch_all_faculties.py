@@ -1,41 +1,82 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
+from app.config import Config
 from app.database.mongo import db
+from app.services.faculty_load import LOAD_FIELD
+from app.services.occupancy_index import occupancy_index
+from app.services.slot_codec import FREE_SLOT, decode_timetable, encode_legacy_timetable
+from app.services.timetable_writer import delete_faculty_timetable, save_faculty_timetable
+from app.services.versioning import versioned, bump, FACULTY_SCOPE
 from bson import ObjectId
+import json
 import re
 
 faculty_bp = Blueprint('faculty', __name__)
 
+# Fields a caller may ask for with ?fields=; id / faculty_id are always sent
+FACULTY_FIELDS = ['name', 'timetable', 'department']
+DEFAULT_FACULTY_FIELDS = ['name', 'timetable']
+
+
+def parse_faculty_fields(raw):
+    """?fields=id,name -> ['name']; unknown names are ignored"""
+    if not raw:
+        return DEFAULT_FACULTY_FIELDS
+    requested = [f.strip() for f in raw.split(',') if f.strip()]
+    return [f for f in FACULTY_FIELDS if f in requested]
+
+
+def format_faculty(faculty, fields):
+    faculty_id = faculty.get('_id')
+    formatted = {
+        'id': str(faculty_id),
+        'faculty_id': str(faculty_id),
+    }
+    if 'name' in fields:
+        formatted['name'] = faculty.get('name', 'Unknown Faculty')
+    if 'timetable' in fields:
+        formatted['timetable'] = decode_timetable(faculty.get('timetable', {}))
+    if 'department' in fields:
+        formatted['department'] = faculty.get('department', 'N/A')
+    return formatted
+
+
 @faculty_bp.route('/api/faculties', methods=['GET'])
+@versioned(lambda: [FACULTY_SCOPE])
 def get_all_faculties():
     """
     Fetch all faculties from the faculty_timetable collection
     Returns faculty with their complete timetable for calculating stats
+
+    Query params:
+      fields=id,name      only project these fields (timetables are skipped)
+      format=ndjson       stream one faculty per line straight from the cursor
     """
     try:
         faculty_col = db.faculty_timetable
-        
-        # Fetch all faculties with their timetables
-        faculties = list(faculty_col.find(
-            {},
-            {
-                '_id': 1,
-                'name': 1,
-                'timetable': 1
-            }
-        ))
-        
+        fields = parse_faculty_fields(request.args.get('fields'))
+        projection = {'_id': 1, **{field: 1 for field in fields}}
+
+        cursor = faculty_col.find({}, projection).batch_size(
+            Config.FACULTY_STREAM_BATCH_SIZE
+        )
+
+        if request.args.get('format') == 'ndjson':
+            def generate():
+                try:
+                    for faculty in cursor:
+                        yield json.dumps(
+                            format_faculty(faculty, fields), separators=(',', ':')
+                        ) + '\n'
+                finally:
+                    cursor.close()
+
+            return Response(
+                stream_with_context(generate()),
+                mimetype='application/x-ndjson'
+            )
+
         # Format faculties for frontend
-        formatted_faculties = []
-        for faculty in faculties:
-            faculty_id = faculty.get('_id')
-            
-            formatted_faculty = {
-                'id': str(faculty_id),
-                'faculty_id': str(faculty_id),
-                'name': faculty.get('name', 'Unknown Faculty'),
-                'timetable': faculty.get('timetable', {})
-            }
-            formatted_faculties.append(formatted_faculty)
+        formatted_faculties = [format_faculty(faculty, fields) for faculty in cursor]
         
         return jsonify({
             'success': True,
@@ -110,19 +151,24 @@ def create_faculty():
             '_id': faculty_id,
             'name': faculty_name.strip(),
             'timetable': {
-                'mon': ['free'] * 5,
-                'tue': ['free'] * 5,
-                'wed': ['free'] * 5,
-                'thu': ['free'] * 5,
-                'fri': ['free'] * 5,
-                'sat': ['free'] * 5
-            }
+                'mon': [FREE_SLOT] * 5,
+                'tue': [FREE_SLOT] * 5,
+                'wed': [FREE_SLOT] * 5,
+                'thu': [FREE_SLOT] * 5,
+                'fri': [FREE_SLOT] * 5,
+                'sat': [FREE_SLOT] * 5
+            },
+            LOAD_FIELD: {'weekly': 0, 'subs': {}}
         }
         
         # Insert into database
         result = faculty_col.insert_one(new_faculty)
         
         if result.inserted_id:
+            bump(FACULTY_SCOPE)
+            occupancy_index.set_timetable(
+                faculty_id, new_faculty['timetable'], name=new_faculty['name']
+            )
             return jsonify({
                 'success': True,
                 'message': f'Faculty "{faculty_name}" created successfully',
@@ -130,7 +176,7 @@ def create_faculty():
                     'id': faculty_id,
                     'faculty_id': faculty_id,
                     'name': faculty_name.strip(),
-                    'timetable': new_faculty['timetable']
+                    'timetable': decode_timetable(new_faculty['timetable'])
                 }
             }), 201
         else:
@@ -148,6 +194,7 @@ def create_faculty():
 
 
 @faculty_bp.route('/api/faculties/<faculty_id>', methods=['GET'])
+@versioned(lambda faculty_id: [FACULTY_SCOPE])
 def get_faculty(faculty_id):
     """
     Get a specific faculty by ID with their complete timetable
@@ -168,7 +215,7 @@ def get_faculty(faculty_id):
                 'id': faculty['_id'],
                 'faculty_id': faculty['_id'],
                 'name': faculty.get('name', ''),
-                'timetable': faculty.get('timetable', {})
+                'timetable': decode_timetable(faculty.get('timetable', {}))
             }
         }), 200
         
@@ -222,18 +269,31 @@ def update_faculty(faculty_id):
                         'error': f'Timetable must include {day}'
                     }), 400
             
-            update_data['timetable'] = timetable
+            # Clients send legacy slot strings; store class ids
+            try:
+                timetable = encode_legacy_timetable(timetable)
+            except (TypeError, ValueError) as e:
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+        else:
+            timetable = None
         
-        # Perform update
-        result = faculty_col.update_one(
-            {'_id': faculty_id},
-            {'$set': update_data}
-        )
+        # Perform update; the classes taught are rewritten alongside
+        result = save_faculty_timetable(existing_faculty, update_data, timetable)
+        if result['conflicts']:
+            return jsonify({
+                'success': False,
+                'error': 'Timetable clashes with lectures other faculty already teach',
+                'conflicts': result['conflicts']
+            }), 409
         
-        if result.modified_count > 0:
+        if result['modified']:
             return jsonify({
                 'success': True,
-                'message': f'Faculty "{faculty_id}" updated successfully'
+                'message': f'Faculty "{faculty_id}" updated successfully',
+                'classes_updated': result['class_ids']
             }), 200
         else:
             return jsonify({
@@ -266,12 +326,13 @@ def delete_faculty(faculty_id):
             }), 404
         
         # Delete the faculty
-        result = faculty_col.delete_one({'_id': faculty_id})
+        result = delete_faculty_timetable(existing_faculty)
         
-        if result.deleted_count > 0:
+        if result['deleted']:
             return jsonify({
                 'success': True,
-                'message': f'Faculty "{faculty_id}" deleted successfully'
+                'message': f'Faculty "{faculty_id}" deleted successfully',
+                'classes_updated': result['class_ids']
             }), 200
         else:
             return jsonify({
@@ -1,7 +1,10 @@
 # app/controllers/fetch_allowed_faculty.py
 from flask import request, jsonify
 from app.database.mongo import db
+from app.services.timetable_writer import delete_class_timetables
+from app.services.versioning import versioned, bump, CLASSWISE_SCOPE
 
+@versioned(lambda: [CLASSWISE_SCOPE])
 def fetch_allowed_faculty():
     """Fetch allowed faculty for one or multiple classes"""
     try:
@@ -183,6 +186,7 @@ def update_allowed_faculty():
             },
             upsert=True
         )
+        bump(CLASSWISE_SCOPE)
         
         if result.upserted_id:
             message = "Allowed faculty created successfully"
@@ -228,15 +232,18 @@ def delete_allowed_faculty():
         safe_branch = branch.lower().replace("(", "").replace(")", "")
         class_id = f"sem{sem}_{safe_branch}_{class_name.lower()}"
         
-        # Delete document
-        result = db.classwise_faculty.delete_one({"_id": class_id})
-        
-        if result.deleted_count == 0:
+        class_doc = db.classwise_faculty.find_one({"_id": class_id})
+        if not class_doc:
             return jsonify({"error": "Class faculty data not found"}), 404
         
+        # The class goes with it: its schedule, faculty slots and temp records
+        result = delete_class_timetables([class_doc])
+        
         return jsonify({
             "success": True,
-            "message": "Allowed faculty deleted successfully"
+            "message": "Allowed faculty deleted successfully",
+            "faculty_updated": result["faculty_updated"],
+            "temp_deleted": result["temp_deleted"]
         }), 200
         
     except ValueError as ve:
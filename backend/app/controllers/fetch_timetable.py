@@ -1,45 +1,28 @@
-import json
 from flask import request, jsonify
 from app.database.mongo import db
+from app.services.class_schedule import (
+    make_class_id,
+    get_class_schedule,
+    save_class_schedule,
+    normalize_schedule,
+    rebuild_class_schedule
+)
+from app.services.versioning import versioned, class_scope
 
-# ===============================
-# 🔹 CONSTANTS
-# ===============================
-DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
-DAYS_MAP = {
-    "Monday": "mon",
-    "Tuesday": "tue",
-    "Wednesday": "wed",
-    "Thursday": "thu",
-    "Friday": "fri",
-    "Saturday": "sat",
-    "Sunday": "sun"  # Optional, if needed
-}
 
-TOTAL_SLOTS = 8
-TIME_SLOT_KEYS = [
-    "Time Slot 1",
-    "Time Slot 2",
-    "Time Slot 3",
-    "Time Slot 4",
-    "Time Slot 5",
-    "Time Slot 6",
-    "Time Slot 7",
-    "Time Slot 8",
-]
+def class_timetable_scopes():
+    sem = request.args.get("sem")
+    branch = request.args.get("branch")
+    class_name = request.args.get("class")
+    if not sem or not branch or not class_name:
+        return []
+    return [class_scope(make_class_id(sem, branch, class_name))]
 
-# ===============================
-# 🔹 HELPERS
-# ===============================
-def normalize_faculty_slots(day_list):
-    """Ensure each day's timetable has exactly TOTAL_SLOTS slots."""
-    if not isinstance(day_list, list):
-        return ["free"] * TOTAL_SLOTS
-    return (day_list + ["free"] * TOTAL_SLOTS)[:TOTAL_SLOTS]
 
 # ===============================
 # 🔹 CONTROLLER
 # ===============================
+@versioned(class_timetable_scopes)
 def fetch_timetable():
     try:
         sem = request.args.get("sem")
@@ -53,38 +36,30 @@ def fetch_timetable():
             return jsonify({"error": "Missing sem, branch, or class"}), 400
 
         sem = int(sem)
-        safe_branch = branch.lower().replace("(", "").replace(")", "")
-        class_id = f"sem{sem}_{safe_branch}_{class_name.lower()}"
-
-        # -------------------------------
-        # Fetch classwise faculty
-        # -------------------------------
-        classwise_doc = db.classwise_faculty.find_one({"_id": class_id})
-        if not classwise_doc:
-            return jsonify({"error": "Class not found"}), 404
-
-        allowed_faculty = classwise_doc.get("allowed_faculty", [])
+        class_id = make_class_id(sem, branch, class_name)
 
         # -------------------------------
-        # Fetch faculty timetables
+        # Materialized class schedule (single _id lookup)
         # -------------------------------
-        faculty_tt_col = db.faculty_timetable
+        class_tt = get_class_schedule(class_id)
 
-        # Initialize empty schedule
-        schedule = {day: {slot: "free" for slot in TIME_SLOT_KEYS} for day in DAYS}
+        if class_tt:
+            schedule = normalize_schedule(class_tt.get("schedule"))
+        else:
+            # Class saved before schedules were materialized:
+            # rebuild once from faculty timetables and store it
+            classwise_doc = db.classwise_faculty.find_one({"_id": class_id})
+            if not classwise_doc:
+                return jsonify({"error": "Class not found"}), 404
 
-        for faculty in allowed_faculty:
-            doc = faculty_tt_col.find_one({"_id": faculty})
-            if not doc:
-                continue
-            tt = doc.get("timetable", {})
-            for day_name in DAYS:
-                day_key = DAYS_MAP[day_name]
-                slots = normalize_faculty_slots(tt.get(day_key, []))
-                for i, val in enumerate(slots):
-                    # Check if this faculty is assigned to this class in this slot
-                    if val.startswith(f"{branch}-{class_name}-Sem{sem}"):
-                        schedule[day_name][TIME_SLOT_KEYS[i]] = faculty
+            schedule = rebuild_class_schedule(classwise_doc)
+            save_class_schedule(
+                class_id,
+                classwise_doc["sem"],
+                classwise_doc["branch"],
+                classwise_doc["class"],
+                schedule
+            )
 
         return jsonify({
             "sem": sem,
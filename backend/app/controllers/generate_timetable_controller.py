@@ -0,0 +1,129 @@
+from flask import request, jsonify, current_app
+
+from app.config import Config
+from app.controllers.timetable_controller import ALLOWED_BRANCHES
+from app.services.timetable_generator import generate_timetables, GenerationError
+from app.services.timetable_writer import save_class_timetables
+
+
+# ===============================
+# 🔹 MAIN CONTROLLER
+# ===============================
+def generate_timetable():
+    """
+    Generate every class timetable of a branch/semester in one go.
+
+    JSON body:
+      {
+        "sem": 4, "branch": "CSE",
+        "classes": [{"class": "D1", "allowed_faculty": [...],
+                     "requirements": [{"subject", "faculty", "lectures"}]}],
+        "days"?, "slots_per_day"?, "max_per_day"?, "time_limit_ms"?,
+        "commit"?: true to save the result like save_timetable
+      }
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+
+        sem = data.get("sem")
+        branch = data.get("branch")
+        classes = data.get("classes")
+
+        # ===============================
+        # 🔹 BASIC VALIDATION
+        # ===============================
+        if not sem or not branch or not classes:
+            return jsonify({"error": "Missing sem, branch or classes"}), 400
+
+        if branch not in ALLOWED_BRANCHES:
+            return jsonify({"error": "Invalid branch"}), 400
+
+        try:
+            sem = int(sem)
+            slots_per_day = int(data.get("slots_per_day", 8))
+            max_per_day = int(data.get("max_per_day", 2))
+            time_limit_ms = int(data.get("time_limit_ms", Config.GENERATE_TIME_LIMIT_MS))
+        except (TypeError, ValueError):
+            return jsonify({
+                "error": "sem, slots_per_day, max_per_day and time_limit_ms must be integers"
+            }), 400
+
+        if sem < 1 or sem > 8:
+            return jsonify({"error": "Invalid semester"}), 400
+
+        if max_per_day < 1:
+            return jsonify({"error": "max_per_day must be at least 1"}), 400
+
+        commit = data.get("commit", False)
+        if not isinstance(commit, bool):
+            return jsonify({"error": "commit must be true or false"}), 400
+
+        # One request may not hold a worker for longer than the configured cap
+        time_limit_ms = max(1, min(time_limit_ms, Config.GENERATE_MAX_TIME_LIMIT_MS))
+
+        # ===============================
+        # 🔹 SOLVE
+        # ===============================
+        try:
+            result = generate_timetables(
+                sem,
+                branch,
+                classes,
+                days=data.get("days"),
+                slots_per_day=slots_per_day,
+                max_per_day=max_per_day,
+                time_limit_ms=time_limit_ms
+            )
+        except GenerationError as e:
+            return jsonify({"error": str(e)}), 400
+
+        response = {
+            "sem": sem,
+            "branch": branch,
+            "classes": [
+                {
+                    "class": entry["class"],
+                    "schedule": result["schedules"][entry["class"]],
+                    "subjects": result["subjects"][entry["class"]]
+                }
+                for entry in classes
+            ],
+            "unplaced": result["unplaced"],
+            "attempts": result["attempts"],
+            "time_limit_ms": time_limit_ms,
+            "committed": False
+        }
+
+        if result["unplaced"]:
+            response["error"] = "Could not place every lecture"
+            return jsonify(response), 422
+
+        # ===============================
+        # 🔹 OPTIONAL SAVE
+        # ===============================
+        if commit:
+            saved = save_class_timetables([
+                {
+                    "sem": sem,
+                    "branch": branch,
+                    "class": entry["class"],
+                    "schedule": result["schedules"][entry["class"]]
+                }
+                for entry in classes
+            ])
+
+            if saved["conflicts"]:
+                # Another write landed between solving and saving
+                response["error"] = "Faculty lecture conflict"
+                response["conflicts"] = saved["conflicts"]
+                return jsonify(response), 409
+
+            response["committed"] = True
+            response["class_ids"] = saved["class_ids"]
+            response["faculty_updated"] = saved["faculty_updated"]
+
+        return jsonify(response), 200
+
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"error": "Internal server error"}), 500
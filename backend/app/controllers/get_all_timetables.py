@@ -1,10 +1,12 @@
 from flask import Blueprint, jsonify
 from app.database.mongo import db
+from app.services.versioning import versioned, CLASSWISE_SCOPE
 from datetime import datetime
 
 get_all_timetable_bp = Blueprint("get_all_timetables", __name__)
 
 @get_all_timetable_bp.route("/timetables", methods=["GET"])
+@versioned(lambda: [CLASSWISE_SCOPE])
 def get_all_timetables():
     docs = db.classwise_faculty.find()
 
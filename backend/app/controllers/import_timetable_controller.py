@@ -0,0 +1,63 @@
+from flask import request, jsonify, current_app
+
+from app.controllers.timetable_controller import ALLOWED_BRANCHES
+from app.services.timetable_import import (
+    TimetableImportError,
+    format_from_filename,
+    import_timetables,
+    iter_rows
+)
+
+
+# ===============================
+# 🔹 MAIN CONTROLLER
+# ===============================
+def import_timetable():
+    """
+    Bulk import of class timetables from one CSV / XLSX upload.
+
+    multipart form:
+      file      the sheet (format taken from the extension)
+      format?   csv | xlsx, overrides the extension
+      dry_run?  true to validate without writing
+
+    Every row is validated before anything is stored; errors and conflicts
+    carry the row number of the offending line.
+    """
+    try:
+        upload = request.files.get("file")
+        if not upload:
+            return jsonify({"error": "Missing file"}), 400
+
+        file_format = request.form.get("format") or format_from_filename(upload.filename)
+        dry_run = request.form.get("dry_run", "").lower() in ("1", "true", "yes")
+
+        try:
+            result = import_timetables(
+                iter_rows(upload.stream, file_format),
+                ALLOWED_BRANCHES,
+                dry_run=dry_run
+            )
+        except TimetableImportError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if result["errors"]:
+            result["error"] = "Invalid rows"
+            return jsonify(result), 400
+
+        if result["conflicts"]:
+            result["error"] = "Faculty lecture conflict"
+            return jsonify(result), 409
+
+        if not result["classes"]:
+            result["error"] = "No timetable rows found"
+            return jsonify(result), 400
+
+        result["message"] = (
+            "Timetables validated" if dry_run else "Timetables imported successfully"
+        )
+        return jsonify(result), 200
+
+    except Exception:
+        current_app.logger.exception("%s failed", request.path)
+        return jsonify({"error": "Internal server error"}), 500
@@ -0,0 +1,11 @@
+from flask import Response
+
+from app.services.metrics import metrics
+
+
+# ===============================
+# 🔹 MAIN CONTROLLER
+# ===============================
+def get_metrics():
+    """Request latency and Mongo command counts in Prometheus text format."""
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
@@ -1,28 +1,27 @@
 from flask import Blueprint, request, jsonify
+from app.config import Config
 from app.database.mongo import db
+from app.services.change_feed import REARRANGED
+from app.services.faculty_load import fetch_loads, rank_by_load
+from app.services.occupancy_index import occupancy_index
+from app.services.temp_assignments import SlotTakenError, build_temp_record, insert_temp_records
+from app.services.substitution_chains import (
+    load_slot_snapshot,
+    find_chains,
+    validate_chain,
+    chain_cost,
+)
+from app.services.slot_codec import class_directory, class_ref, is_free
 from datetime import date
 
 rearrange_lecture_bp = Blueprint("rearrange_lecture", __name__)
 
 
-def is_faculty_free(fac_id, day, lec_no, selected_date):
-    # 1️⃣ Temp timetable check (highest priority) for specific date
-    if db.temp_faculty_timetable.find_one(
-        {"faculty_id": fac_id, "date": selected_date, "day": day, "lec_no": lec_no}
-    ):
-        return False
-
-    # 2️⃣ Permanent timetable (for recurring schedule)
-    fac_doc = db.faculty_timetable.find_one({"_id": fac_id})
-    if not fac_doc:
-        return False
-
-    timetable = fac_doc.get("timetable", {})
-    return (
-        day in timetable
-        and 0 <= lec_no < len(timetable[day])
-        and timetable[day][lec_no] == "free"
-    )
+def is_faculty_free(fac_id, day, lec_no, selected_date, refresh=False):
+    # Temp timetable (for the date) + permanent timetable, as one bit test
+    # on the occupancy index. Writes rely on the temp insert rejecting a
+    # faculty booked in the meantime (SlotTakenError), not on refresh=True.
+    return occupancy_index.is_free(fac_id, day, lec_no, selected_date, refresh=refresh)
 
 
 def get_faculty_name(fac_id):
@@ -31,19 +30,13 @@ def get_faculty_name(fac_id):
     return faculty.get("name", fac_id) if faculty else fac_id
 
 
-def assign_temp(fac_id, day, lec_no, assignment, selected_date):
-    db.temp_faculty_timetable.insert_one(
-        {
-            "faculty_id": fac_id,
-            "date": selected_date,
-            "day": day,
-            "lec_no": lec_no,
-            "assigned_to": assignment,
-        }
-    )
+def assign_temp(fac_id, day, lec_no, class_id, selected_date):
+    insert_temp_records([
+        build_temp_record(fac_id, selected_date, day, lec_no, class_id)
+    ])
 
 
-def replace_lecture_helper(selected_date, day, class_name, sem, branch, lec_no):
+def replace_lecture_helper(selected_date, day, class_name, sem, branch, lec_no, assign=False):
     class_doc = db.classwise_faculty.find_one(
         {"class": class_name, "sem": sem, "branch": branch}
     )
@@ -51,13 +44,81 @@ def replace_lecture_helper(selected_date, day, class_name, sem, branch, lec_no):
     if not class_doc:
         return {"success": False}
 
-    for fac_id in class_doc.get("allowed_faculty", []):
-        if is_faculty_free(fac_id, day, lec_no, selected_date):
-            return {"success": True, "assigned_faculty": fac_id}
+    candidates = occupancy_index.free_faculty(
+        class_doc.get("allowed_faculty", []), day, lec_no, selected_date
+    )
+
+    # Lightest load first, so covers don't all go to the first free name
+    for fac_id in rank_by_load(candidates, fetch_loads(candidates)):
+        # assign=True reserves the slot; someone booked meanwhile -> next one
+        if assign:
+            try:
+                assign_temp(fac_id, day, lec_no, class_doc["_id"], selected_date)
+            except SlotTakenError:
+                continue
+        return {"success": True, "assigned_faculty": fac_id}
 
     return {"success": False}
 
 
+def build_option(snapshot, steps, target):
+    """Shape a chain from the search engine into a rearrange option."""
+    primary = steps[0]
+    secondary = steps[1]
+
+    primary_fac_name = snapshot.name(primary["faculty_id"])
+    secondary_fac_name = snapshot.name(secondary["faculty_id"])
+
+    moves = [
+        f"{snapshot.name(step['faculty_id'])} moves from {step['from_class']} to {step['to_class']}"
+        for step in steps[:-1]
+    ]
+    last = steps[-1]
+    description = (
+        ", ".join(moves)
+        + f", while {snapshot.name(last['faculty_id'])} takes over {last['to_class']}"
+    )
+
+    return {
+        "option_id": "_".join(step["faculty_id"] for step in steps),
+        "primary_faculty": {
+            "id": primary["faculty_id"],
+            "name": primary_fac_name,
+            "current_class": primary["from_class"],
+            "new_class": target,
+        },
+        "secondary_faculty": {
+            "id": secondary["faculty_id"],
+            "name": secondary_fac_name,
+            "takes_over": secondary["to_class"],
+        },
+        "chain": [
+            dict(step, name=snapshot.name(step["faculty_id"])) for step in steps
+        ],
+        "hops": len(steps),
+        "cost": chain_cost(snapshot, steps),
+        "description": description,
+    }
+
+
+def assign_chain(snapshot, steps):
+    """
+    Store one temp assignment per chain step, all or nothing.
+    Raises SlotTakenError if any step's faculty was booked meanwhile.
+    """
+    records = [
+        build_temp_record(
+            step["faculty_id"],
+            snapshot.selected_date,
+            snapshot.day,
+            snapshot.lec_no,
+            snapshot.classes[step["to_class"]].class_id,
+        )
+        for step in steps
+    ]
+    insert_temp_records(records, event=REARRANGED)
+
+
 @rearrange_lecture_bp.route("/get-rearrange-options", methods=["POST", "OPTIONS"])
 def get_rearrange_options():
     """Get all possible rearrangement options for a lecture on a specific date"""
@@ -82,76 +143,32 @@ def get_rearrange_options():
     except (TypeError, ValueError):
         return jsonify({"success": False, "message": "lec_no must be an integer"}), 400
 
-    # Get allowed faculty for the target class
-    class_doc = db.classwise_faculty.find_one(
-        {"class": class_name, "sem": sem, "branch": branch}
-    )
-
-    if not class_doc:
-        return (
-            jsonify({"success": False, "message": "Class configuration not found"}),
-            404,
-        )
-
-    allowed_faculty = class_doc.get("allowed_faculty", [])
-    rearrange_options = []
+    try:
+        sem = int(sem)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "sem must be an integer"}), 400
 
-    # Try to find all possible rearrangements
-    for fac_id in allowed_faculty:
-        fac_doc = db.faculty_timetable.find_one({"_id": fac_id})
-        if not fac_doc:
-            continue
+    try:
+        max_depth = int(data.get("max_depth", Config.REARRANGE_MAX_DEPTH))
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "max_depth must be an integer"}), 400
 
-        timetable = fac_doc.get("timetable", {})
-        if day not in timetable or lec_no >= len(timetable[day]):
-            continue
+    max_depth = max(2, min(max_depth, Config.REARRANGE_MAX_DEPTH))
 
-        current_slot = timetable[day][lec_no]
-        if current_slot == "free":
-            continue
+    # One in-memory snapshot of the classes a chain can reach; the chain
+    # search never hits Mongo
+    target_ref = class_ref(sem, branch, class_name)
+    snapshot = load_slot_snapshot(selected_date, day, lec_no, target_ref.class_id, max_depth)
+    target = target_ref.label
 
-        # Parse the current slot to extract class info
-        # Format: "branch-class-SemX-Time Slot Y"
-        try:
-            parts = current_slot.split("-")
-            occupied_branch = parts[0]
-            occupied_class = parts[1]
-            occupied_sem = int(parts[2].replace("Sem", ""))
-        except Exception:
-            continue
-
-        # Try to find another faculty for the occupied class
-        reassign_attempt = replace_lecture_helper(
-            selected_date, day, occupied_class, occupied_sem, occupied_branch, lec_no
+    if target not in snapshot.allowed:
+        return (
+            jsonify({"success": False, "message": "Class configuration not found"}),
+            404,
         )
 
-        if not reassign_attempt["success"]:
-            continue
-
-        new_fac = reassign_attempt["assigned_faculty"]
-
-        # Get faculty names
-        primary_fac_name = get_faculty_name(fac_id)
-        secondary_fac_name = get_faculty_name(new_fac)
-
-        # Create option object
-        option = {
-            "option_id": f"{fac_id}_{new_fac}",
-            "primary_faculty": {
-                "id": fac_id,
-                "name": primary_fac_name,
-                "current_class": f"{occupied_branch}-{occupied_class}-Sem{occupied_sem}",
-                "new_class": f"{branch}-{class_name}-Sem{sem}",
-            },
-            "secondary_faculty": {
-                "id": new_fac,
-                "name": secondary_fac_name,
-                "takes_over": f"{occupied_branch}-{occupied_class}-Sem{occupied_sem}",
-            },
-            "description": f"{primary_fac_name} moves from {occupied_branch}-{occupied_class} to {branch}-{class_name}, while {secondary_fac_name} takes over {occupied_branch}-{occupied_class}",
-        }
-
-        rearrange_options.append(option)
+    chains, timed_out = find_chains(snapshot, target, max_depth=max_depth)
+    rearrange_options = [build_option(snapshot, steps, target) for steps in chains]
 
     if not rearrange_options:
         return (
@@ -159,6 +176,7 @@ def get_rearrange_options():
                 {
                     "success": False,
                     "message": "No possible rearrangement options found",
+                    "timed_out": timed_out,
                 }
             ),
             409,
@@ -170,6 +188,8 @@ def get_rearrange_options():
                 "success": True,
                 "count": len(rearrange_options),
                 "options": rearrange_options,
+                "max_depth": max_depth,
+                "timed_out": timed_out,
                 "message": f"Found {len(rearrange_options)} possible rearrangement option(s)",
             }
         ),
@@ -194,6 +214,24 @@ def execute_rearrange():
     lec_no = data.get("lec_no")
     primary_faculty_id = data.get("primary_faculty_id")
     secondary_faculty_id = data.get("secondary_faculty_id")
+    chain = data.get("chain")
+
+    # Chains longer than one swap come from the multi-hop search
+    if isinstance(chain, list) and len(chain) > 2:
+        if not all([selected_date, day, class_name, sem, branch, lec_no is not None]):
+            return jsonify({"success": False, "message": "Missing required fields"}), 400
+
+        try:
+            lec_no = int(lec_no)
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "message": "lec_no must be an integer"}), 400
+
+        try:
+            sem = int(sem)
+        except (TypeError, ValueError):
+            return jsonify({"success": False, "message": "sem must be an integer"}), 400
+
+        return execute_chain(selected_date, day, class_name, sem, branch, lec_no, chain)
 
     if not all(
         [
@@ -214,6 +252,11 @@ def execute_rearrange():
     except (TypeError, ValueError):
         return jsonify({"success": False, "message": "lec_no must be an integer"}), 400
 
+    try:
+        sem = int(sem)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "sem must be an integer"}), 400
+
     # Get primary faculty's current assignment
     fac_doc = db.faculty_timetable.find_one({"_id": primary_faculty_id})
     if not fac_doc:
@@ -230,47 +273,50 @@ def execute_rearrange():
         )
 
     current_slot = timetable[day][lec_no]
-    if current_slot == "free":
+    if is_free(current_slot):
         return (
             jsonify({"success": False, "message": "Primary faculty is already free"}),
             409,
         )
 
-    # Parse current slot to get occupied class details
-    try:
-        parts = current_slot.split("-")
-        occupied_branch = parts[0]
-        occupied_class = parts[1]
-        occupied_sem = int(parts[2].replace("Sem", ""))
-        time_slot_str = parts[3]  # "Time Slot X"
-    except Exception:
+    # The slot holds the occupied class's id
+    occupied = class_directory.get(current_slot)
+    if occupied is None:
         return (
             jsonify(
-                {"success": False, "message": "Could not parse current assignment"}
+                {"success": False, "message": "Could not resolve current assignment"}
             ),
             400,
         )
-
-    # Verify secondary faculty is free
+    occupied_branch = occupied.branch
+    occupied_class = occupied.class_name
+    occupied_sem = occupied.sem
+
+    # Execute the swap as one reservation: the occupied class goes to the
+    # secondary faculty, the target class to the primary. Both slots are
+    # booked together or not at all.
+    target = class_ref(sem, branch, class_name)
+    records = [
+        build_temp_record(secondary_faculty_id, selected_date, day, lec_no, occupied.class_id),
+        build_temp_record(primary_faculty_id, selected_date, day, lec_no, target.class_id),
+    ]
+
+    taken = None
     if not is_faculty_free(secondary_faculty_id, day, lec_no, selected_date):
+        taken = secondary_faculty_id
+    else:
+        try:
+            insert_temp_records(records, event=REARRANGED)
+        except SlotTakenError as e:
+            taken = e.record["faculty_id"]
+
+    if taken:
+        who = "Secondary" if taken == secondary_faculty_id else "Primary"
         return (
-            jsonify(
-                {
-                    "success": False,
-                    "message": "Secondary faculty is no longer available",
-                }
-            ),
+            jsonify({"success": False, "message": f"{who} faculty is no longer available"}),
             409,
         )
 
-    # Execute the swap
-    # 1. Assign the occupied class to secondary faculty
-    assign_temp(secondary_faculty_id, day, lec_no, current_slot, selected_date)
-
-    # 2. Assign the target class to primary faculty
-    target_assignment = f"{branch}-{class_name}-Sem{sem}-{time_slot_str}"
-    assign_temp(primary_faculty_id, day, lec_no, target_assignment, selected_date)
-
     primary_fac_name = get_faculty_name(primary_faculty_id)
     secondary_fac_name = get_faculty_name(secondary_faculty_id)
 
@@ -328,6 +374,84 @@ def execute_rearrange():
     )
 
 
+def execute_chain(selected_date, day, class_name, sem, branch, lec_no, chain):
+    """Re-validate a multi-hop chain on a fresh snapshot and store it"""
+    target_ref = class_ref(sem, branch, class_name)
+    snapshot = load_slot_snapshot(
+        selected_date, day, lec_no, target_ref.class_id,
+        min(len(chain), Config.REARRANGE_MAX_DEPTH)
+    )
+    target = target_ref.label
+
+    steps = validate_chain(snapshot, target, chain)
+    if steps is None:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "message": "Rearrangement chain is no longer available",
+                }
+            ),
+            409,
+        )
+
+    try:
+        assign_chain(snapshot, steps)
+    except SlotTakenError:
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "message": "Rearrangement chain is no longer available",
+                }
+            ),
+            409,
+        )
+
+    affected_classes = []
+    for i, step in enumerate(steps):
+        step_ref = snapshot.classes[step["to_class"]]
+        step_branch, step_class, step_sem = step_ref.branch, step_ref.class_name, step_ref.sem
+        new_name = snapshot.name(step["faculty_id"])
+        previous_name = snapshot.name(steps[i + 1]["faculty_id"]) if i + 1 < len(steps) else None
+
+        affected_classes.append(
+            {
+                "branch": step_branch,
+                "class": step_class,
+                "sem": step_sem,
+                "message": (
+                    f"@ {step_branch}_{step_class}\t"
+                    f"Change in Lecture\n\n"
+                    f"Date: {selected_date}\n\n"
+                    f"Lecture no.: {lec_no+1}\n\n"
+                    f"Faculty: {new_name}\n\n"
+                    f"Location: Same as per timetable"
+                ),
+                "new_faculty": new_name,
+                "previous_faculty": previous_name,
+            }
+        )
+
+    return (
+        jsonify(
+            {
+                "success": True,
+                "assigned_faculty": steps[0]["faculty_id"],
+                "faculty_name": snapshot.name(steps[0]["faculty_id"]),
+                "secondary_faculty_id": steps[-1]["faculty_id"],
+                "secondary_faculty_name": snapshot.name(steps[-1]["faculty_id"]),
+                "type": "rearranged",
+                "chain": steps,
+                "affected_classes": affected_classes,
+                "message": f"Rearrangement successful for {len(steps)} classes",
+                "detailed_message": affected_classes[0]["message"],
+            }
+        ),
+        200,
+    )
+
+
 @rearrange_lecture_bp.route("/rearrange-lecture", methods=["POST", "OPTIONS"])
 def rearrange_lecture():
     """Original auto-rearrange endpoint (kept for backward compatibility)"""
@@ -352,16 +476,19 @@ def rearrange_lecture():
     except (TypeError, ValueError):
         return jsonify({"success": False, "message": "lec_no must be an integer"}), 400
 
+    try:
+        sem = int(sem)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "sem must be an integer"}), 400
+
     # 1️⃣ FIRST TRY — Normal replace
-    first_try = replace_lecture_helper(selected_date, day, class_name, sem, branch, lec_no)
+    # The helper reserves the slot for the first free faculty it can book
+    first_try = replace_lecture_helper(
+        selected_date, day, class_name, sem, branch, lec_no, assign=True
+    )
 
     if first_try["success"]:
-        # Assign the lecture
         fac_id = first_try["assigned_faculty"]
-        assign_temp(
-            fac_id, day, lec_no, f"{branch}-{class_name}-Sem{sem}-Time Slot {lec_no+1}", selected_date
-        )
-
         fac_name = get_faculty_name(fac_id)
 
         return (
@@ -386,54 +513,35 @@ def rearrange_lecture():
             200,
         )
 
-    # 2️⃣ SECOND TRY — Auto rearrangement (first available option)
-    class_doc = db.classwise_faculty.find_one(
-        {"class": class_name, "sem": sem, "branch": branch}
-    )
+    # 2️⃣ SECOND TRY — Auto rearrangement (cheapest chain found)
+    target_ref = class_ref(sem, branch, class_name)
+    snapshot = load_slot_snapshot(selected_date, day, lec_no, target_ref.class_id)
+    target = target_ref.label
 
-    if not class_doc:
+    if target not in snapshot.allowed:
         return (
             jsonify({"success": False, "message": "Class configuration not found"}),
             404,
         )
 
-    allowed_faculty = class_doc.get("allowed_faculty", [])
-
-    for fac_id in allowed_faculty:
-        fac_doc = db.faculty_timetable.find_one({"_id": fac_id})
-        if not fac_doc:
-            continue
-
-        timetable = fac_doc.get("timetable", {})
-        if day not in timetable or lec_no >= len(timetable[day]):
-            continue
-
-        current_slot = timetable[day][lec_no]
-        if current_slot == "free":
-            continue
+    chains, _ = find_chains(snapshot, target, limit=1)
 
+    if chains:
+        steps = chains[0]
         try:
-            parts = current_slot.split("-")
-            occupied_branch = parts[0]
-            occupied_class = parts[1]
-            occupied_sem = int(parts[2].replace("Sem", ""))
-        except Exception:
-            continue
-
-        reassign_attempt = replace_lecture_helper(
-            selected_date, day, occupied_class, occupied_sem, occupied_branch, lec_no
-        )
-
-        if not reassign_attempt["success"]:
-            continue
-
-        new_fac = reassign_attempt["assigned_faculty"]
-
-        assign_temp(new_fac, day, lec_no, current_slot, selected_date)
-        assign_temp(
-            fac_id, day, lec_no, f"{branch}-{class_name}-Sem{sem}-Time Slot {lec_no+1}", selected_date
-        )
-
+            assign_chain(snapshot, steps)
+        except SlotTakenError:
+            return (
+                jsonify(
+                    {
+                        "success": False,
+                        "message": "Rearrangement failed: a faculty in the chain was just assigned elsewhere",
+                    }
+                ),
+                409,
+            )
+
+        fac_id = steps[0]["faculty_id"]
         fac_name = get_faculty_name(fac_id)
 
         return (
@@ -443,6 +551,7 @@ def rearrange_lecture():
                     "assigned_faculty": fac_id,
                     "faculty_name": fac_name,
                     "type": "rearranged",
+                    "chain": steps,
                     "message": (
                         f"@ {branch}_{class_name}\n"
                         f"Lecture Rearranged\n"
@@ -1,31 +1,90 @@
+import asyncio
 from flask import Blueprint, request, jsonify
+from app.config import Config
+from app.database.async_mongo import get_async_db, run_async
 from app.database.mongo import db
+from app.services.faculty_load import LOAD_FIELD, fetch_loads, load_summary, rank_by_load
+from app.services.occupancy_index import occupancy_index, DAY_INDEX
+from app.services.slot_codec import is_free
+from app.services.temp_assignments import SlotTakenError, build_temp_record, insert_temp_records
 from datetime import date
 
 # Blueprint
 replace_lecture_bp = Blueprint("replace_lecture", __name__)
 
 
-def is_faculty_free(fac_id, day, lec_no):
+def is_faculty_free(fac_id, day, lec_no, refresh=False):
+    # Temp + permanent timetable check as a bit test on the occupancy index.
+    # Writes don't need refresh=True: the temp insert itself rejects a
+    # faculty that was booked in the meantime (SlotTakenError).
     today = date.today().isoformat()
+    return occupancy_index.is_free(fac_id, day, lec_no, today, refresh=refresh)
 
-    # 1️⃣ Check temp timetable FIRST
-    temp = db.temp_faculty_timetable.find_one(
-        {"faculty_id": fac_id, "date": today, "day": day, "lec_no": lec_no}
+
+def batch_queries(fac_ids, day, lec_no, selected_date):
+    """Faculty and temp lookups for a slot; neither depends on the other."""
+    faculty_query = (
+        {"_id": {"$in": fac_ids}},
+        {"name": 1, "department": 1, f"timetable.{day}": 1, LOAD_FIELD: 1},
     )
-    if temp:
-        return False
+    temp_query = {
+        "faculty_id": {"$in": fac_ids},
+        "date": selected_date,
+        "day": day,
+        "lec_no": lec_no,
+    }
+    return faculty_query, temp_query
+
+
+def free_from_docs(fac_ids, day, lec_no, faculty_docs, busy_temp):
+    free = []
+    for fac_id in fac_ids:
+        doc = faculty_docs.get(fac_id)
+        if not doc or fac_id in busy_temp:
+            continue
 
-    # 2️⃣ Check permanent timetable
-    faculty_doc = db.faculty_timetable.find_one({"_id": fac_id})
-    if not faculty_doc:
-        return False
+        slots = doc.get("timetable", {}).get(day, [])
+        if 0 <= lec_no < len(slots) and is_free(slots[lec_no]):
+            free.append((fac_id, doc))
 
-    timetable = faculty_doc.get("timetable", {})
-    return (
-        day in timetable
-        and 0 <= lec_no < len(timetable[day])
-        and timetable[day][lec_no] == "free"
+    return free
+
+
+def find_free_faculty_batch(fac_ids, day, lec_no, selected_date):
+    """
+    Free faculty among fac_ids for one slot, in the given order.
+    Costs two queries however many faculty are passed: one $in on
+    faculty_timetable and one on temp_faculty_timetable (run concurrently
+    in async mode).
+    Returns a list of (fac_id, faculty_doc).
+    """
+    fac_ids = list(dict.fromkeys(fac_ids))
+    if not fac_ids or day not in DAY_INDEX:
+        return []
+
+    if Config.ASYNC_MODE:
+        return run_async(find_free_faculty_batch_async(fac_ids, day, lec_no, selected_date))
+
+    faculty_query, temp_query = batch_queries(fac_ids, day, lec_no, selected_date)
+    faculty_docs = {doc["_id"]: doc for doc in db.faculty_timetable.find(*faculty_query)}
+    busy_temp = set(db.temp_faculty_timetable.distinct("faculty_id", temp_query))
+
+    return free_from_docs(fac_ids, day, lec_no, faculty_docs, busy_temp)
+
+
+async def find_free_faculty_batch_async(fac_ids, day, lec_no, selected_date):
+    async_db = get_async_db()
+    faculty_query, temp_query = batch_queries(fac_ids, day, lec_no, selected_date)
+
+    faculty_list, busy_temp = await asyncio.gather(
+        async_db.faculty_timetable.find(*faculty_query).to_list(None),
+        async_db.temp_faculty_timetable.distinct("faculty_id", temp_query),
+    )
+
+    return free_from_docs(
+        fac_ids, day, lec_no,
+        {doc["_id"]: doc for doc in faculty_list},
+        set(busy_temp)
     )
 
 
@@ -56,21 +115,25 @@ def get_available_faculty():
     if not class_doc:
         return jsonify({"success": False, "message": "Class not found"}), 404
 
-    # Get all free faculty from allowed list
+    # Get all free faculty from allowed list (two queries in total)
+    today = date.today().isoformat()
+    free = dict(find_free_faculty_batch(
+        class_doc.get("allowed_faculty", []), day, lec_no, today
+    ))
+
+    # Lightest load first; the counters come with the same batch
     available_faculty = []
-    for fac_id in class_doc.get("allowed_faculty", []):
-        if is_faculty_free(fac_id, day, lec_no):
-            # Get faculty details (name, department, etc.)
-            faculty_doc = db.faculty_timetable.find_one({"_id": fac_id})
-
-            faculty_info = {
-                "faculty_id": fac_id,
-                "name": faculty_doc.get("name", fac_id) if faculty_doc else fac_id,
-                "department": (
-                    faculty_doc.get("department", "N/A") if faculty_doc else "N/A"
-                ),
-            }
-            available_faculty.append(faculty_info)
+    for fac_id in rank_by_load(
+        list(free), {fac_id: doc.get(LOAD_FIELD) for fac_id, doc in free.items()}
+    ):
+        faculty_doc = free[fac_id]
+        faculty_info = {
+            "faculty_id": fac_id,
+            "name": faculty_doc.get("name", fac_id),
+            "department": faculty_doc.get("department", "N/A"),
+            **load_summary(faculty_doc.get(LOAD_FIELD)),
+        }
+        available_faculty.append(faculty_info)
 
     if not available_faculty:
         return (
@@ -133,8 +196,25 @@ def assign_faculty():
             403,
         )
 
-    # Double-check faculty is still free
-    if not is_faculty_free(faculty_id, day, lec_no):
+    # ✅ STORE IN TEMP TIMETABLE
+    # Permanent lectures come from the cached index; a temp booking made
+    # meanwhile by someone else is rejected by the insert itself
+    available = is_faculty_free(faculty_id, day, lec_no)
+    if available:
+        try:
+            insert_temp_records([
+                build_temp_record(
+                    faculty_id,
+                    today,
+                    day,
+                    lec_no,
+                    class_doc["_id"],
+                )
+            ])
+        except SlotTakenError:
+            available = False
+
+    if not available:
         return (
             jsonify(
                 {
@@ -145,20 +225,9 @@ def assign_faculty():
             409,
         )
 
-    # ✅ STORE IN TEMP TIMETABLE
-    db.temp_faculty_timetable.insert_one(
-        {
-            "faculty_id": faculty_id,
-            "date": today,
-            "day": day,
-            "lec_no": lec_no,
-            "assigned_to": f"{branch}-{class_name}-Sem{sem}-Time Slot {lec_no+1}",
-        }
-    )
-
     # Get faculty name for confirmation message
-    faculty_doc = db.faculty_timetable.find_one({"_id": faculty_id})
-    faculty_name = faculty_doc.get("name", faculty_id) if faculty_doc else faculty_id
+    faculty_info = occupancy_index.faculty_info(faculty_id) or {}
+    faculty_name = faculty_info.get("name", faculty_id)
 
     return (
         jsonify(
@@ -207,21 +276,27 @@ def replace_lecture():
     if not class_doc:
         return jsonify({"success": False, "message": "Class not found"}), 404
 
-    for fac_id in class_doc.get("allowed_faculty", []):
+    candidates = occupancy_index.free_faculty(
+        class_doc.get("allowed_faculty", []), day, lec_no, today
+    )
 
-        if not is_faculty_free(fac_id, day, lec_no):
-            continue
+    # Lightest load first instead of allowed_faculty order
+    for fac_id in rank_by_load(candidates, fetch_loads(candidates)):
 
         # ✅ STORE IN TEMP TIMETABLE (NOT PERMANENT)
-        db.temp_faculty_timetable.insert_one(
-            {
-                "faculty_id": fac_id,
-                "date": today,
-                "day": day,
-                "lec_no": lec_no,
-                "assigned_to": f"{branch}-{class_name}-Sem{sem}-Time Slot {lec_no+1}",
-            }
-        )
+        # Booked by someone else since the index was read: try the next one
+        try:
+            insert_temp_records([
+                build_temp_record(
+                    fac_id,
+                    today,
+                    day,
+                    lec_no,
+                    class_doc["_id"],
+                )
+            ])
+        except SlotTakenError:
+            continue
 
         return (
             jsonify(
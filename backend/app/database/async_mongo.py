@@ -0,0 +1,93 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+
+from pymongo import AsyncMongoClient
+
+from app.config import Config
+from app.database.mongo import connection_manager
+from app.services.metrics import capture_request_scope, command_listener, request_scope
+
+
+# ===============================
+# 🔹 BACKGROUND EVENT LOOP
+# ===============================
+class AsyncRunner:
+    """
+    One event loop thread per process owning an AsyncMongoClient.
+
+    Flask views stay synchronous; in async mode they hand a coroutine to
+    run_async(), which executes it on this loop so independent queries can
+    be awaited together with asyncio.gather. Like the sync connection
+    manager, the loop and client are re-created after fork().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._client = None
+        self._db_name = None
+        self._pid = None
+
+    def _ensure_loop(self):
+        pid = os.getpid()
+        if self._loop is not None and self._pid == pid:
+            return self._loop
+
+        with self._lock:
+            if self._loop is None or self._pid != pid:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name="async-mongo",
+                    daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._client = None
+                self._pid = pid
+
+        return self._loop
+
+    def get_db(self):
+        """AsyncDatabase for the running loop; call from coroutines only."""
+        if self._client is None:
+            uri, db_name, options = connection_manager.settings()
+            self._client = AsyncMongoClient(
+                uri,
+                event_listeners=[command_listener],
+                **options
+            )
+            self._db_name = db_name
+        return self._client[self._db_name]
+
+    def run(self, coro, timeout=None):
+        """Run coro on the background loop and wait for its result."""
+        loop = self._ensure_loop()
+        scope = capture_request_scope()
+
+        async def attributed():
+            # Mongo commands issued by coro count towards the calling request
+            request_scope.set(scope)
+            return await coro
+
+        future = asyncio.run_coroutine_threadsafe(attributed(), loop)
+        try:
+            return future.result(
+                timeout if timeout is not None else Config.ASYNC_TIMEOUT_SECONDS
+            )
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+
+async_runner = AsyncRunner()
+
+
+def run_async(coro, timeout=None):
+    return async_runner.run(coro, timeout)
+
+
+def get_async_db():
+    return async_runner.get_db()
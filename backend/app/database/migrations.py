@@ -0,0 +1,524 @@
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import click
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+
+from app.config import Config
+from app.models.faculty import (
+    COLLECTION_NAME as FACULTY_COLLECTION,
+    FACULTY_TIMETABLE_SCHEMA
+)
+from app.models.classwise_faculty import (
+    COLLECTION_NAME as CLASS_COLLECTION,
+    CLASSWISE_FACULTY_SCHEMA
+)
+from app.models.temp_faculty_timetable import (
+    COLLECTION_NAME as TEMP_COLLECTION,
+    TEMP_FACULTY_TIMETABLE_SCHEMA
+)
+from app.models.class_timetable import (
+    COLLECTION_NAME as CLASS_TIMETABLE_COLLECTION,
+    CLASS_TIMETABLE_SCHEMA
+)
+from app.services.faculty_load import recount_loads
+from app.services.slot_codec import FREE_SLOT, LEGACY_FREE, parse_legacy_slot
+
+logger = logging.getLogger(__name__)
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+MIGRATIONS_COLLECTION = "schema_migrations"
+VERSION_ID = "schema"
+LOCK_ID = "lock"
+BATCH_SIZE = 500
+
+
+# ===============================
+# 🔹 SHIPPED INDEX SETS
+# ===============================
+# Steps create the indexes they shipped with, never the live model lists:
+# those describe the state after every step has run and keep changing.
+
+# Step 2, as first released
+STEP_2_INDEXES = {
+    FACULTY_COLLECTION: [
+        {"fields": [("name", ASCENDING)], "unique": False},
+    ],
+    CLASS_COLLECTION: [
+        {
+            "fields": [("sem", ASCENDING), ("branch", ASCENDING), ("class", ASCENDING)],
+            "unique": True
+        },
+        {"fields": [("allowed_faculty", ASCENDING)], "unique": False},
+    ],
+    CLASS_TIMETABLE_COLLECTION: [
+        {
+            "fields": [("sem", ASCENDING), ("branch", ASCENDING), ("class", ASCENDING)],
+            "unique": True
+        },
+    ],
+    TEMP_COLLECTION: [
+        {
+            "fields": [
+                ("faculty_id", ASCENDING),
+                ("date", ASCENDING),
+                ("day", ASCENDING),
+                ("lec_no", ASCENDING)
+            ],
+            "unique": False
+        },
+        {
+            "fields": [("date", ASCENDING), ("day", ASCENDING), ("lec_no", ASCENDING)],
+            "unique": False
+        },
+        {"fields": [("assigned_to", ASCENDING)], "unique": False},
+        {"fields": [("expires_at", ASCENDING)], "unique": False, "expire_after_seconds": 0},
+    ],
+}
+
+# Step 4 swaps the assigned_to index for this one
+TEMP_CLASS_ID_INDEX = {"fields": [("class_id", ASCENDING)], "unique": False}
+
+# Step 6 replaces the non-unique availability index with this one
+TEMP_RESERVATION_INDEX = {
+    "fields": [("faculty_id", ASCENDING), ("date", ASCENDING), ("lec_no", ASCENDING)],
+    "unique": True
+}
+
+
+# ===============================
+# 🔹 DDL HELPERS
+# ===============================
+def create_collection_if_not_exists(db, name, schema=None, existing=None):
+    if existing is None:
+        existing = db.list_collection_names()
+    if name not in existing:
+        if schema:
+            db.create_collection(name, validator=schema)
+        else:
+            db.create_collection(name)
+        logger.info("Created collection: %s", name)
+
+
+def create_indexes(db, collection_name, indexes):
+    collection = db[collection_name]
+    for index in indexes:
+        options = {"unique": index.get("unique", False)}
+        if "expire_after_seconds" in index:
+            options["expireAfterSeconds"] = index["expire_after_seconds"]
+        collection.create_index(index["fields"], **options)
+    logger.info("Indexes ensured for: %s", collection_name)
+
+
+# ===============================
+# 🔹 MIGRATION STEPS
+# ===============================
+# Append new steps at the end with the next version number; never edit or
+# reorder a step that has shipped. Steps must be safe to re-run, since a
+# deployment that predates this table starts at version 0 with data in place.
+
+def create_collections(db):
+    existing = db.list_collection_names()
+    create_collection_if_not_exists(db, FACULTY_COLLECTION, FACULTY_TIMETABLE_SCHEMA, existing)
+    create_collection_if_not_exists(db, CLASS_COLLECTION, CLASSWISE_FACULTY_SCHEMA, existing)
+    create_collection_if_not_exists(db, CLASS_TIMETABLE_COLLECTION, CLASS_TIMETABLE_SCHEMA, existing)
+    create_collection_if_not_exists(db, TEMP_COLLECTION, TEMP_FACULTY_TIMETABLE_SCHEMA, existing)
+
+
+def create_all_indexes(db):
+    for collection_name, indexes in STEP_2_INDEXES.items():
+        create_indexes(db, collection_name, indexes)
+
+
+def backfill_temp_expiry(db):
+    """Give temp records created before the TTL index an expires_at."""
+    result = db[TEMP_COLLECTION].update_many(
+        {"expires_at": {"$exists": False}},
+        [{
+            "$set": {
+                "expires_at": {
+                    "$dateAdd": {
+                        "startDate": {
+                            "$dateFromString": {
+                                "dateString": "$date",
+                                "onError": "$$NOW",
+                                "onNull": "$$NOW"
+                            }
+                        },
+                        "unit": "day",
+                        "amount": Config.TEMP_RETENTION_DAYS + 1
+                    }
+                }
+            }
+        }]
+    )
+    if result.modified_count:
+        logger.info("Backfilled expires_at on %d temp records", result.modified_count)
+
+
+def flush(collection, ops):
+    check_lease()
+    if ops:
+        collection.bulk_write(ops, ordered=False)
+        ops.clear()
+
+
+def compact_slot(value):
+    """Legacy faculty slot value -> class_id / null; unknown values are kept."""
+    if value == LEGACY_FREE:
+        return FREE_SLOT
+    parsed = parse_legacy_slot(value)
+    return parsed[0].class_id if parsed else value
+
+
+def compact_slot_encoding(db):
+    """
+    Switch faculty slots from "CSE-D1-Sem4-Time Slot 3" / "free" strings to
+    the class _id / null, and temp records from assigned_to to class_id.
+    Validators are relaxed first so the rewritten documents pass them.
+    """
+    existing = db.list_collection_names()
+    for name, schema in (
+        (FACULTY_COLLECTION, FACULTY_TIMETABLE_SCHEMA),
+        (TEMP_COLLECTION, TEMP_FACULTY_TIMETABLE_SCHEMA),
+    ):
+        if name in existing:
+            db.command("collMod", name, validator=schema)
+
+    faculty_col = db[FACULTY_COLLECTION]
+    ops = []
+    converted = 0
+    for doc in faculty_col.find({}, {"timetable": 1}):
+        update = {}
+        for day, slots in (doc.get("timetable") or {}).items():
+            if not isinstance(slots, list):
+                continue
+            compact = [compact_slot(value) for value in slots]
+            if compact != slots:
+                update[f"timetable.{day}"] = compact
+        if update:
+            ops.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+            converted += 1
+        if len(ops) >= BATCH_SIZE:
+            flush(faculty_col, ops)
+    flush(faculty_col, ops)
+
+    temp_col = db[TEMP_COLLECTION]
+    ops = []
+    skipped = 0
+    for rec in temp_col.find({"assigned_to": {"$exists": True}}, {"assigned_to": 1}):
+        parsed = parse_legacy_slot(rec["assigned_to"])
+        if parsed is None:
+            skipped += 1
+            continue
+        ops.append(UpdateOne(
+            {"_id": rec["_id"]},
+            {"$set": {"class_id": parsed[0].class_id}, "$unset": {"assigned_to": ""}}
+        ))
+        if len(ops) >= BATCH_SIZE:
+            flush(temp_col, ops)
+    flush(temp_col, ops)
+
+    if "assigned_to_1" in temp_col.index_information():
+        temp_col.drop_index("assigned_to_1")
+    create_indexes(db, TEMP_COLLECTION, [TEMP_CLASS_ID_INDEX])
+
+    logger.info("Compacted slots for %d faculty", converted)
+    if skipped:
+        logger.warning("%d temp records have an unparseable assigned_to", skipped)
+
+
+def drop_double_bookings(db):
+    """
+    Keep the oldest temp record of every (faculty_id, date, lec_no) so the
+    unique reservation index can be built. Returns the removed _ids.
+    """
+    temp_col = db[TEMP_COLLECTION]
+
+    duplicates = []
+    for group in temp_col.aggregate([
+        {"$sort": {"_id": 1}},
+        {"$group": {
+            "_id": {"faculty_id": "$faculty_id", "date": "$date", "lec_no": "$lec_no"},
+            "ids": {"$push": "$_id"},
+        }},
+        {"$match": {"ids.1": {"$exists": True}}},
+    ], allowDiskUse=True):
+        duplicates.extend(group["ids"][1:])
+
+    for start in range(0, len(duplicates), BATCH_SIZE):
+        temp_col.delete_many({"_id": {"$in": duplicates[start:start + BATCH_SIZE]}})
+
+    return duplicates
+
+
+def reserve_temp_slots(db):
+    """
+    Make (faculty_id, date, lec_no) unique in temp_faculty_timetable,
+    replacing the non-unique availability index from step 2. Existing
+    double bookings are removed first; their _ids are logged so they
+    can be followed up.
+    """
+    temp_col = db[TEMP_COLLECTION]
+
+    removed = drop_double_bookings(db)
+    if removed:
+        logger.warning("Removed %d double-booked temp records:", len(removed))
+        for start in range(0, len(removed), BATCH_SIZE):
+            logger.warning("  %s", ", ".join(str(_id) for _id in removed[start:start + BATCH_SIZE]))
+
+    if "faculty_id_1_date_1_day_1_lec_no_1" in temp_col.index_information():
+        temp_col.drop_index("faculty_id_1_date_1_day_1_lec_no_1")
+    create_indexes(db, TEMP_COLLECTION, [TEMP_RESERVATION_INDEX])
+
+    if removed:
+        # Dropped double bookings were counted as substitutions
+        recount_loads(db)
+
+
+def enable_temp_pre_images(db):
+    """
+    Keep pre-images of temp records so change-stream deletes carry the
+    deleted record (MongoDB 6+). Older servers go on sending bare _ids,
+    which the change feed passes to every stream unfiltered.
+    """
+    try:
+        db.command("collMod", TEMP_COLLECTION, changeStreamPreAndPostImages={"enabled": True})
+    except OperationFailure as e:
+        logger.warning("Change stream pre-images unavailable: %s", e)
+
+
+MIGRATIONS = [
+    (1, "create collections with validators", create_collections),
+    (2, "create indexes", create_all_indexes),
+    (3, "backfill temp expires_at", backfill_temp_expiry),
+    (4, "compact slot encoding", compact_slot_encoding),
+    (5, "backfill faculty load counters", recount_loads),
+    (6, "unique temp slot reservations", reserve_temp_slots),
+    (7, "temp change stream pre-images", enable_temp_pre_images),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ===============================
+# 🔹 VERSION + LOCK
+# ===============================
+def current_version(db):
+    doc = db[MIGRATIONS_COLLECTION].find_one({"_id": VERSION_ID}, {"version": 1})
+    return doc.get("version", 0) if doc else 0
+
+
+def acquire_lock(db, owner, lease_seconds):
+    """
+    Take the migration lease. The lock is a single document: the upsert
+    either matches an expired lease or inserts a fresh one; a live lease
+    held by someone else makes the insert fail with a duplicate key.
+    """
+    now = datetime.now(timezone.utc)
+    try:
+        db[MIGRATIONS_COLLECTION].find_one_and_update(
+            {"_id": LOCK_ID, "expires_at": {"$lt": now}},
+            {"$set": {
+                "owner": owner,
+                "expires_at": now + timedelta(seconds=lease_seconds),
+            }},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+def renew_lock(db, owner, lease_seconds):
+    """Extend the lease; False once it expired and someone else took it."""
+    result = db[MIGRATIONS_COLLECTION].update_one(
+        {"_id": LOCK_ID, "owner": owner},
+        {"$set": {
+            "expires_at": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)
+        }}
+    )
+    return result.matched_count == 1
+
+
+def lock_holder(db):
+    """(owner, expires_at) of the current lease, or None when nobody holds it."""
+    doc = db[MIGRATIONS_COLLECTION].find_one({"_id": LOCK_ID}, {"owner": 1, "expires_at": 1})
+    return (doc.get("owner"), doc.get("expires_at")) if doc else None
+
+
+def release_lock(db, owner):
+    db[MIGRATIONS_COLLECTION].delete_one({"_id": LOCK_ID, "owner": owner})
+
+
+class MigrationLeaseLost(RuntimeError):
+    """The migration lease expired and another process may be migrating."""
+
+
+class LeaseHeartbeat:
+    """
+    Renews the migration lease every third of its length from a daemon
+    thread, so a step that runs longer than the lease keeps it. A failed
+    renewal marks the lease lost; check() then raises, and the runner stops
+    before recording another version.
+    """
+
+    def __init__(self, db, owner, lease_seconds):
+        self._db = db
+        self._owner = owner
+        self._lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._lost = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="migration-lease", daemon=True
+        )
+
+    def _run(self):
+        while not self._stop.wait(self._lease_seconds / 3):
+            try:
+                renewed = renew_lock(self._db, self._owner, self._lease_seconds)
+            except Exception:
+                logger.exception("Migration lease renewal failed")
+                continue
+            if not renewed:
+                self._lost.set()
+                return
+
+    def check(self):
+        if self._lost.is_set():
+            raise MigrationLeaseLost("Schema migration lease lost; aborting")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+# Heartbeat of the migration running in this process, checked by flush()
+_heartbeat = None
+
+
+def check_lease():
+    if _heartbeat is not None:
+        _heartbeat.check()
+
+
+# ===============================
+# 🔹 RUNNER
+# ===============================
+def migrate(db, target=None):
+    """
+    Apply every pending step up to target (default: latest) under the lease.
+    Other processes wait for the lease holder instead of repeating the DDL,
+    for as long as its heartbeat keeps renewing the lease; a lease that
+    expires is taken over. Returns the schema version afterwards.
+    """
+    target = LATEST_VERSION if target is None else target
+    lease = Config.MIGRATION_LOCK_SECONDS
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    holder = None
+    stale_at = None
+
+    while not acquire_lock(db, owner, lease):
+        if current_version(db) >= target:
+            return current_version(db)
+
+        # Every renewal moves expires_at: the holder is still migrating
+        seen = lock_holder(db)
+        if seen != holder:
+            holder = seen
+            stale_at = time.monotonic() + lease * 2
+        elif time.monotonic() > stale_at:
+            raise RuntimeError(
+                f"Schema migration lease went stale before version {target} was reached"
+            )
+        time.sleep(0.5)
+
+    global _heartbeat
+    try:
+        with LeaseHeartbeat(db, owner, lease) as heartbeat:
+            _heartbeat = heartbeat
+            version = current_version(db)
+            for step_version, name, step in MIGRATIONS:
+                if step_version <= version or step_version > target:
+                    continue
+
+                logger.info("Applying migration %d: %s", step_version, name)
+                step(db)
+
+                # Never record a step another process may be re-running
+                heartbeat.check()
+                if not renew_lock(db, owner, lease):
+                    raise MigrationLeaseLost("Schema migration lease lost; aborting")
+
+                db[MIGRATIONS_COLLECTION].update_one(
+                    {"_id": VERSION_ID},
+                    {
+                        "$set": {"version": step_version},
+                        "$push": {"applied": {
+                            "version": step_version,
+                            "name": name,
+                            "applied_at": datetime.now(timezone.utc),
+                        }},
+                    },
+                    upsert=True
+                )
+                version = step_version
+
+            return version
+    finally:
+        _heartbeat = None
+        release_lock(db, owner)
+
+
+def ensure_schema(db):
+    """
+    Boot-time check: one find_one on the version document. Pending steps are
+    applied here only when Config.AUTO_MIGRATE is on; otherwise run
+    `flask migrate` as a deploy step.
+    """
+    version = current_version(db)
+    if version >= LATEST_VERSION:
+        return version
+
+    if not Config.AUTO_MIGRATE:
+        logger.warning(
+            "Schema at version %d, latest is %d; run `flask migrate`", version, LATEST_VERSION
+        )
+        return version
+
+    return migrate(db)
+
+
+# ===============================
+# 🔹 FLASK CLI
+# ===============================
+def register_cli(app):
+    @app.cli.command("migrate")
+    @click.option("--status", is_flag=True, help="Only show the current schema version.")
+    @click.option("--to", "target", type=int, default=None, help="Migrate up to this version.")
+    def migrate_command(status, target):
+        """Apply pending schema migrations."""
+        from app.database.mongo import db
+
+        version = current_version(db)
+        if status:
+            click.echo(f"Schema version {version} (latest {LATEST_VERSION})")
+            for step_version, name, _ in MIGRATIONS:
+                mark = "x" if step_version <= version else " "
+                click.echo(f"  [{mark}] {step_version}: {name}")
+            return
+
+        version = migrate(db, target)
+        click.echo(f"Schema at version {version}")
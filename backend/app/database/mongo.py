@@ -1,12 +1,122 @@
+import os
+import threading
+
 from pymongo import MongoClient
 
-mongo_client = None
-db = None
+from app.services.metrics import command_listener, pool_listener
 
-def init_mongo(app):
-    global mongo_client, db
 
-    mongo_client = MongoClient(app.config["MONGO_URI"])
-    db = mongo_client[app.config["MONGO_DB_NAME"]]
+# ===============================
+# 🔹 CONNECTION MANAGER
+# ===============================
+class ConnectionManager:
+    """
+    Owns the process's MongoClient.
+
+    The client is created on first use and re-created whenever the process
+    id changes, so a pre-forking server (gunicorn with --preload, or a
+    master that touched the database at boot) gives every worker its own
+    pool instead of sharing sockets inherited across fork().
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._uri = None
+        self._db_name = None
+        self._options = {}
+        self._client = None
+        self._pid = None
+
+    def configure(self, config):
+        self._uri = config["MONGO_URI"]
+        self._db_name = config["MONGO_DB_NAME"]
+        self._options = client_options(config)
+
+    def get_client(self):
+        pid = os.getpid()
+        if self._client is not None and self._pid == pid:
+            return self._client
+
+        with self._lock:
+            if self._client is None or self._pid != pid:
+                if self._uri is None:
+                    raise RuntimeError("init_mongo(app) must run before the database is used")
+
+                # A client inherited from the parent is abandoned, not closed:
+                # its sockets belong to the parent process
+                pool_listener.reset()
+                self._client = MongoClient(
+                    self._uri,
+                    event_listeners=[command_listener, pool_listener],
+                    **self._options
+                )
+                self._pid = pid
+
+        return self._client
+
+    def get_db(self):
+        return self.get_client()[self._db_name]
+
+    def close(self):
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+    @property
+    def options(self):
+        return dict(self._options)
+
+    def settings(self):
+        """(uri, db name, client options), for clients built elsewhere."""
+        if self._uri is None:
+            raise RuntimeError("init_mongo(app) must run before the database is used")
+        return self._uri, self._db_name, dict(self._options)
+
+
+def client_options(config):
+    """MongoClient keyword options from Config; unset values keep pymongo defaults."""
+    options = {
+        "maxPoolSize": config.get("MONGO_MAX_POOL_SIZE"),
+        "minPoolSize": config.get("MONGO_MIN_POOL_SIZE"),
+        "maxConnecting": config.get("MONGO_MAX_CONNECTING"),
+        "maxIdleTimeMS": config.get("MONGO_MAX_IDLE_TIME_MS"),
+        "waitQueueTimeoutMS": config.get("MONGO_WAIT_QUEUE_TIMEOUT_MS"),
+        "serverSelectionTimeoutMS": config.get("MONGO_SERVER_SELECTION_TIMEOUT_MS"),
+        "connectTimeoutMS": config.get("MONGO_CONNECT_TIMEOUT_MS"),
+        "socketTimeoutMS": config.get("MONGO_SOCKET_TIMEOUT_MS"),
+        "compressors": config.get("MONGO_COMPRESSORS"),
+    }
+    return {key: value for key, value in options.items() if value not in (None, "")}
+
+
+class DatabaseProxy:
+    """
+    Stand-in for the pymongo Database, safe to import at module level:
+    every attribute access resolves against the current process's client.
+    """
+
+    def __getattr__(self, name):
+        return getattr(connection_manager.get_db(), name)
+
+    def __getitem__(self, name):
+        return connection_manager.get_db()[name]
+
+    def __repr__(self):
+        return f"<DatabaseProxy {connection_manager._db_name}>"
+
+
+connection_manager = ConnectionManager()
+
+db = DatabaseProxy()
+
+
+def get_client():
+    return connection_manager.get_client()
+
+
+def init_mongo(app):
+    connection_manager.configure(app.config)
 
-    print("Mongo connected to:", db.name)
\ No newline at end of file
+    app.logger.info("Mongo configured for: %s", app.config["MONGO_DB_NAME"])
@@ -0,0 +1,37 @@
+import logging
+
+from pymongo.errors import OperationFailure
+
+from app.database import mongo
+
+logger = logging.getLogger(__name__)
+
+# "Transaction numbers are only allowed on a replica set member or mongos"
+ILLEGAL_OPERATION = 20
+
+_transactions_supported = None
+
+
+def run_transaction(callback):
+    """
+    Run callback(session) inside a multi-document transaction.
+
+    A standalone mongod (local development) has no transactions; there the
+    callback runs once with session=None so writes still happen, just not
+    atomically. The first such failure is remembered for the process.
+    """
+    global _transactions_supported
+
+    if _transactions_supported is not False:
+        with mongo.get_client().start_session() as session:
+            try:
+                result = session.with_transaction(callback)
+                _transactions_supported = True
+                return result
+            except OperationFailure as e:
+                if e.code != ILLEGAL_OPERATION:
+                    raise
+                _transactions_supported = False
+                logger.warning("Mongo transactions unavailable, writing without a session")
+
+    return callback(None)
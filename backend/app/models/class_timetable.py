@@ -0,0 +1,46 @@
+from pymongo import ASCENDING
+
+COLLECTION_NAME = "class_timetable"
+
+CLASS_TIMETABLE_SCHEMA = {
+    "$jsonSchema": {
+        "bsonType": "object",
+        "required": ["_id", "class", "sem", "branch", "schedule"],
+        "properties": {
+            "_id": {
+                "bsonType": "string",
+                "description": "Same id as classwise_faculty (e.g., 'sem4_cseaiml_d1')"
+            },
+            "class": {
+                "bsonType": "string",
+                "description": "Class/Division identifier (e.g., 'D1', 'D2')"
+            },
+            "sem": {
+                "bsonType": "int",
+                "minimum": 1,
+                "maximum": 8,
+                "description": "Semester number (1-8)"
+            },
+            "branch": {
+                "bsonType": "string",
+                "enum": ["CSE", "CSE(AIML)", "DS"],
+                "description": "Academic branch"
+            },
+            "schedule": {
+                "bsonType": "object",
+                "description": "Day name -> time slot -> faculty id or 'free'"
+            }
+        }
+    }
+}
+
+CLASS_TIMETABLE_INDEXES = [
+    {
+        "fields": [
+            ("sem", ASCENDING),
+            ("branch", ASCENDING),
+            ("class", ASCENDING)
+        ],
+        "unique": True
+    }
+]
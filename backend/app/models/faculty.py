@@ -19,14 +19,18 @@ FACULTY_TIMETABLE_SCHEMA = {
                 "bsonType": "object",
                 "required": ["mon", "tue", "wed", "thu", "fri", "sat"],
                 "properties": {
-                    "mon": {"bsonType": "array", "items": {"bsonType": "string"}},
-                    "tue": {"bsonType": "array", "items": {"bsonType": "string"}},
-                    "wed": {"bsonType": "array", "items": {"bsonType": "string"}},
-                    "thu": {"bsonType": "array", "items": {"bsonType": "string"}},
-                    "fri": {"bsonType": "array", "items": {"bsonType": "string"}},
-                    "sat": {"bsonType": "array", "items": {"bsonType": "string"}}
+                    "mon": {"bsonType": "array", "items": {"bsonType": ["string", "null"]}},
+                    "tue": {"bsonType": "array", "items": {"bsonType": ["string", "null"]}},
+                    "wed": {"bsonType": "array", "items": {"bsonType": ["string", "null"]}},
+                    "thu": {"bsonType": "array", "items": {"bsonType": ["string", "null"]}},
+                    "fri": {"bsonType": "array", "items": {"bsonType": ["string", "null"]}},
+                    "sat": {"bsonType": "array", "items": {"bsonType": ["string", "null"]}}
                 },
-                "description": "Day-wise timetable with periods"
+                "description": "Day-wise periods: class _id taught, or null when free"
+            },
+            "load": {
+                "bsonType": "object",
+                "description": "Counters: weekly lectures, substitutions per date"
             }
         }
     }
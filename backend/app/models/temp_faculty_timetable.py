@@ -0,0 +1,72 @@
+from pymongo import ASCENDING
+
+COLLECTION_NAME = "temp_faculty_timetable"
+
+TEMP_FACULTY_TIMETABLE_SCHEMA = {
+    "$jsonSchema": {
+        "bsonType": "object",
+        "required": ["faculty_id", "date", "day", "lec_no", "class_id"],
+        "properties": {
+            "faculty_id": {
+                "bsonType": "string",
+                "description": "Faculty covering the lecture (e.g., 'fac1')"
+            },
+            "date": {
+                "bsonType": "string",
+                "description": "ISO date of the substitution (e.g., '2025-01-31')"
+            },
+            "day": {
+                "bsonType": "string",
+                "enum": ["mon", "tue", "wed", "thu", "fri", "sat"],
+                "description": "Timetable day key"
+            },
+            "lec_no": {
+                "bsonType": "int",
+                "minimum": 0,
+                "maximum": 7,
+                "description": "0-based lecture slot"
+            },
+            "class_id": {
+                "bsonType": "string",
+                "description": "classwise_faculty _id of the covered class (e.g., 'sem4_cse_d1')"
+            },
+            "expires_at": {
+                "bsonType": "date",
+                "description": "Removed by the TTL index once past the retention window"
+            }
+        }
+    }
+}
+
+TEMP_FACULTY_TIMETABLE_INDEXES = [
+    # Slot reservation: at most one temp lecture per faculty, date and
+    # slot, enforced at insert time; also serves availability checks
+    {
+        "fields": [
+            ("faculty_id", ASCENDING),
+            ("date", ASCENDING),
+            ("lec_no", ASCENDING)
+        ],
+        "unique": True
+    },
+    # Per-date overlays / slot snapshots and date-range listings
+    {
+        "fields": [
+            ("date", ASCENDING),
+            ("day", ASCENDING),
+            ("lec_no", ASCENDING)
+        ],
+        "unique": False
+    },
+    # Class cascades and class-filtered listings match on class_id
+    {
+        "fields": [("class_id", ASCENDING)],
+        "unique": False
+    },
+    # Past substitutions expire after Config.TEMP_RETENTION_DAYS
+    {
+        "fields": [("expires_at", ASCENDING)],
+        "unique": False,
+        "expire_after_seconds": 0
+    }
+]
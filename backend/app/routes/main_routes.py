@@ -1,5 +1,7 @@
 from flask import Blueprint
 from app.controllers.timetable_controller import save_timetable
+from app.controllers.generate_timetable_controller import generate_timetable
+from app.controllers.import_timetable_controller import import_timetable
 from app.controllers.get_all_timetables import get_all_timetables
 from app.controllers.replace_lecture_controller import replace_lecture, get_available_faculty, assign_faculty
 from app.controllers.rearrange_lecture_controller import rearrange_lecture, get_rearrange_options, execute_rearrange
@@ -12,11 +14,18 @@ from app.controllers.fetch_allowed_faculty import (
     delete_allowed_faculty
 )
 from app.controllers.fetch_all_faculties import get_all_faculties, create_faculty, get_faculty, delete_faculty, update_faculty
+from app.controllers.metrics_controller import get_metrics
+from app.controllers.absence_controller import cover_absence
+from app.controllers.export_controller import export_class_timetables, export_faculty_timetables
+from app.controllers.effective_timetable_controller import get_effective_timetable
+from app.controllers.change_stream_controller import stream_temp_changes
 
 main_bp = Blueprint("main", __name__)
 
 main_bp.route("/api/timetable", methods=["POST"])(save_timetable)
 main_bp.route("/api/timetable", methods=["DELETE"])(delete_timetable)
+main_bp.route("/api/generate-timetable", methods=["POST"])(generate_timetable)
+main_bp.route("/api/timetable/import", methods=["POST"])(import_timetable)
 
 main_bp.route("/api/replacetimetable", methods=["POST"])(replace_lecture)
 main_bp.route("/api/rearrangetimetable", methods=["POST"])(rearrange_lecture)
@@ -24,16 +33,23 @@ main_bp.route("/api/get-rearrange-options", methods=["POST"])(get_rearrange_opti
 main_bp.route("/api/execute-rearrange", methods=["POST", "OPTIONS"])(execute_rearrange)
 main_bp.route("/api/get-available-faculty", methods=["POST"])(get_available_faculty)
 main_bp.route("/api/assign-faculty", methods=["POST"])(assign_faculty)
+main_bp.route("/api/absence", methods=["POST"])(cover_absence)
 
 main_bp.route("/api/fetchtimetable", methods=["GET"])(fetch_timetable)
 main_bp.route("/api/timetable", methods=["GET"])(get_all_timetables)
+main_bp.route("/api/export/classes", methods=["GET"])(export_class_timetables)
+main_bp.route("/api/export/faculties", methods=["GET"])(export_faculty_timetables)
+main_bp.route("/api/effective-timetable", methods=["GET"])(get_effective_timetable)
 
 main_bp.route("/api/fetch-all-changes", methods=["GET"])(fetch_all_changes)
 main_bp.route("/api/delete-temp-change", methods=["DELETE"])(delete_temp_change)
+main_bp.route("/api/changes/stream", methods=["GET"])(stream_temp_changes)
 main_bp.route("/api/classwise-faculty", methods=["GET"])(fetch_allowed_faculty)
 
 main_bp.route("/api/faculties", methods=["GET"])(get_all_faculties)
 main_bp.route("/api/faculties", methods=["POST"])(create_faculty)
 main_bp.route("/api/faculties/<faculty_id>", methods=["GET"])(get_faculty)
 main_bp.route("/api/faculties/<faculty_id>", methods=["DELETE"])(delete_faculty)
-main_bp.route("/api/faculties/<faculty_id>", methods=["PUT"])(update_faculty)
\ No newline at end of file
+main_bp.route("/api/faculties/<faculty_id>", methods=["PUT"])(update_faculty)
+
+main_bp.route("/api/metrics", methods=["GET"])(get_metrics)
@@ -0,0 +1,331 @@
+import heapq
+from datetime import date, timedelta
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.class_schedule import DAYS, DAYS_MAP, TIME_SLOT_KEYS, TOTAL_SLOTS
+from app.services.slot_codec import is_free, ref_from_doc
+from app.services.temp_assignments import build_temp_record, insert_temp_records
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+DAY_KEYS = [DAYS_MAP[day] for day in DAYS]
+
+# Cost weights: a cover is cheaper for someone with a light day, and
+# cheaper again for someone who has covered little in the range.
+DAY_LOAD_WEIGHT = 1
+RANGE_LOAD_WEIGHT = 2
+
+
+class AbsenceError(ValueError):
+    """Bad absence request (unknown faculty, dates, range)."""
+
+
+# ===============================
+# 🔹 MIN-COST FLOW
+# ===============================
+class _MinCostFlow:
+    """
+    Successive shortest paths with Dijkstra on reduced costs (all arc
+    costs are non-negative, so potentials start at zero).
+    """
+
+    def __init__(self):
+        self.graph = []  # node -> [edge index]
+        self.edges = []  # [to, capacity, cost]
+
+    def node(self):
+        self.graph.append([])
+        return len(self.graph) - 1
+
+    def add_edge(self, u, v, capacity, cost):
+        self.graph[u].append(len(self.edges))
+        self.edges.append([v, capacity, cost])
+        self.graph[v].append(len(self.edges))
+        self.edges.append([u, 0, -cost])
+        return len(self.edges) - 2
+
+    def flow(self, source, sink):
+        n = len(self.graph)
+        potential = [0] * n
+        total_flow = total_cost = 0
+
+        while True:
+            dist = [None] * n
+            prev_edge = [None] * n
+            dist[source] = 0
+            heap = [(0, source)]
+
+            while heap:
+                d, u = heapq.heappop(heap)
+                if d > dist[u]:
+                    continue
+                for e in self.graph[u]:
+                    v, capacity, cost = self.edges[e]
+                    if capacity <= 0:
+                        continue
+                    nd = d + cost + potential[u] - potential[v]
+                    if dist[v] is None or nd < dist[v]:
+                        dist[v] = nd
+                        prev_edge[v] = e
+                        heapq.heappush(heap, (nd, v))
+
+            if dist[sink] is None:
+                return total_flow, total_cost
+
+            # Keep reduced costs non-negative: nodes past the sink (or
+            # unreachable) move by the sink's distance
+            for v in range(n):
+                potential[v] += min(dist[v], dist[sink]) if dist[v] is not None else dist[sink]
+
+            # Unit capacities from the source: augment one lecture at a time
+            v = sink
+            while v != source:
+                e = prev_edge[v]
+                self.edges[e][1] -= 1
+                self.edges[e ^ 1][1] += 1
+                v = self.edges[e ^ 1][0]
+
+            total_flow += 1
+            total_cost += potential[sink] - potential[source]
+
+    def used(self, e):
+        return self.edges[e ^ 1][1] > 0
+
+
+# ===============================
+# 🔹 SNAPSHOT
+# ===============================
+def absence_dates(date_from, date_to):
+    """[(iso date, day key)] for the inclusive range, Sundays skipped."""
+    try:
+        start = date.fromisoformat(date_from)
+        end = date.fromisoformat(date_to or date_from)
+    except (TypeError, ValueError):
+        raise AbsenceError("from / to must be ISO dates (YYYY-MM-DD)")
+
+    if end < start:
+        raise AbsenceError("to is before from")
+    if (end - start).days + 1 > Config.ABSENCE_MAX_DAYS:
+        raise AbsenceError(f"Absences are limited to {Config.ABSENCE_MAX_DAYS} days")
+
+    dates = []
+    day = start
+    while day <= end:
+        if day.weekday() < len(DAY_KEYS):
+            dates.append((day.isoformat(), DAY_KEYS[day.weekday()]))
+        day += timedelta(days=1)
+    return dates
+
+
+def day_slots(timetable, day_key):
+    slots = (timetable or {}).get(day_key, [])
+    return slots[:TOTAL_SLOTS] if isinstance(slots, list) else []
+
+
+def load_snapshot(faculty_id, dates):
+    """
+    Everything the solver needs, in four queries whatever the range:
+    the absent faculty, their classes, the candidates' timetables and the
+    temp records of the range.
+    """
+    absent = db.faculty_timetable.find_one({"_id": faculty_id}, {"name": 1, "timetable": 1})
+    if not absent:
+        raise AbsenceError(f'Faculty "{faculty_id}" not found')
+
+    timetable = absent.get("timetable", {})
+    class_ids = {
+        value
+        for _, day_key in dates
+        for value in day_slots(timetable, day_key)
+        if not is_free(value)
+    }
+
+    classes = {
+        doc["_id"]: doc
+        for doc in db.classwise_faculty.find(
+            {"_id": {"$in": list(class_ids)}},
+            {"branch": 1, "class": 1, "sem": 1, "allowed_faculty": 1}
+        )
+    }
+
+    candidates = {
+        fac_id
+        for doc in classes.values()
+        for fac_id in doc.get("allowed_faculty", [])
+        if fac_id != faculty_id
+    }
+
+    faculty = {
+        doc["_id"]: doc
+        for doc in db.faculty_timetable.find(
+            {"_id": {"$in": list(candidates)}},
+            {"name": 1, "timetable": 1}
+        )
+    }
+
+    temps = []
+    if dates:
+        temps = list(db.temp_faculty_timetable.find(
+            {
+                "date": {"$gte": dates[0][0], "$lte": dates[-1][0]},
+                "$or": [
+                    {"faculty_id": {"$in": list(candidates) + [faculty_id]}},
+                    {"class_id": {"$in": list(class_ids)}},
+                ],
+            },
+            {"faculty_id": 1, "class_id": 1, "date": 1, "lec_no": 1}
+        ))
+
+    return absent, classes, faculty, temps
+
+
+# ===============================
+# 🔹 SOLVER
+# ===============================
+def plan_absence_cover(faculty_id, date_from, date_to=None, max_per_day=None):
+    """
+    Cover every lecture of faculty_id between date_from and date_to.
+
+    Lectures are matched to free allowed faculty as a min-cost flow:
+    lecture -> (faculty, date) -> faculty -> sink, where the (faculty, date)
+    arcs are capped at max_per_day and both the day and range arcs get
+    dearer with every cover, so the work is spread instead of landing on
+    the first free name. The maximum number of lectures is always covered.
+
+    Returns {"faculty_id", "name", "lectures", "assignments", "uncovered",
+             "already_covered", "cost"}; assignments are temp records.
+    """
+    dates = absence_dates(date_from, date_to)
+    if max_per_day is None:
+        max_per_day = Config.ABSENCE_MAX_COVERS_PER_DAY
+    if max_per_day < 1:
+        raise AbsenceError("max_per_day must be at least 1")
+
+    absent, classes, faculty, temps = load_snapshot(faculty_id, dates)
+    timetable = absent.get("timetable", {})
+
+    covered = {(rec.get("class_id"), rec["date"], rec["lec_no"]) for rec in temps}
+    busy = {(rec["faculty_id"], rec["date"], rec["lec_no"]) for rec in temps}
+    range_load = {}
+    day_temp_load = {}
+    for rec in temps:
+        range_load[rec["faculty_id"]] = range_load.get(rec["faculty_id"], 0) + 1
+        key = (rec["faculty_id"], rec["date"])
+        day_temp_load[key] = day_temp_load.get(key, 0) + 1
+
+    # -------------------------------
+    # Lectures that need a cover
+    # -------------------------------
+    lectures = []
+    already_covered = []
+    for selected_date, day_key in dates:
+        for lec_no, class_id in enumerate(day_slots(timetable, day_key)):
+            if is_free(class_id) or class_id not in classes:
+                continue
+            lecture = {
+                "date": selected_date,
+                "day": day_key,
+                "lec_no": lec_no,
+                "time_slot": TIME_SLOT_KEYS[lec_no],
+                "class_id": class_id,
+                "assigned_to": ref_from_doc(classes[class_id]).slot_string(lec_no),
+            }
+            if (class_id, selected_date, lec_no) in covered:
+                already_covered.append(lecture)
+            else:
+                lectures.append(lecture)
+
+    # -------------------------------
+    # Flow network
+    # -------------------------------
+    graph = _MinCostFlow()
+    source = graph.node()
+    sink = graph.node()
+
+    fac_nodes = {}
+    fac_day_nodes = {}
+    arcs = []  # (edge, lecture index, faculty id)
+
+    def fac_node(fac_id):
+        if fac_id not in fac_nodes:
+            node = graph.node()
+            fac_nodes[fac_id] = node
+            base = range_load.get(fac_id, 0)
+            for k in range(len(lectures)):
+                graph.add_edge(node, sink, 1, RANGE_LOAD_WEIGHT * (base + k))
+        return fac_nodes[fac_id]
+
+    def fac_day_node(fac_id, selected_date, day_key):
+        key = (fac_id, selected_date)
+        if key not in fac_day_nodes:
+            node = graph.node()
+            fac_day_nodes[key] = node
+            teaching = sum(
+                1 for value in day_slots(faculty[fac_id].get("timetable"), day_key)
+                if not is_free(value)
+            )
+            base = teaching + day_temp_load.get(key, 0)
+            for k in range(max_per_day):
+                graph.add_edge(node, fac_node(fac_id), 1, DAY_LOAD_WEIGHT * (base + k))
+        return fac_day_nodes[key]
+
+    for i, lecture in enumerate(lectures):
+        node = graph.node()
+        graph.add_edge(source, node, 1, 0)
+
+        for fac_id in classes[lecture["class_id"]].get("allowed_faculty", []):
+            if fac_id == faculty_id or fac_id not in faculty:
+                continue
+            if (fac_id, lecture["date"], lecture["lec_no"]) in busy:
+                continue
+            slots = day_slots(faculty[fac_id].get("timetable"), lecture["day"])
+            if lecture["lec_no"] >= len(slots) or not is_free(slots[lecture["lec_no"]]):
+                continue
+
+            target = fac_day_node(fac_id, lecture["date"], lecture["day"])
+            arcs.append((graph.add_edge(node, target, 1, 0), i, fac_id))
+
+    _, cost = graph.flow(source, sink)
+
+    chosen = {}
+    for edge, i, fac_id in arcs:
+        if graph.used(edge):
+            chosen[i] = fac_id
+
+    assignments = []
+    uncovered = []
+    for i, lecture in enumerate(lectures):
+        if i in chosen:
+            fac_id = chosen[i]
+            assignments.append(dict(
+                lecture,
+                faculty_id=fac_id,
+                faculty_name=faculty[fac_id].get("name", fac_id)
+            ))
+        else:
+            uncovered.append(lecture)
+
+    return {
+        "faculty_id": faculty_id,
+        "name": absent.get("name", faculty_id),
+        "lectures": len(lectures) + len(already_covered),
+        "assignments": assignments,
+        "uncovered": uncovered,
+        "already_covered": already_covered,
+        "cost": cost,
+    }
+
+
+def commit_absence_cover(plan):
+    """
+    Store every assignment of a plan with one bulk insert, all or nothing.
+    Raises SlotTakenError if a substitute was booked since planning.
+    """
+    insert_temp_records([
+        build_temp_record(
+            item["faculty_id"], item["date"], item["day"], item["lec_no"], item["class_id"]
+        )
+        for item in plan["assignments"]
+    ])
@@ -0,0 +1,374 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.slot_codec import class_directory, decode_slot
+
+logger = logging.getLogger(__name__)
+
+# ===============================
+# 🔹 EVENTS
+# ===============================
+# One event per temp record, pushed to /api/changes/stream:
+#
+#   {"type": "created" | "deleted" | "rearranged", "id": "<temp _id>",
+#    "faculty", "date", "day", "lec_no", "class_id", "assigned_to",
+#    "branch", "class", "sem"}
+#
+# Sequence ids are "<epoch>-<n>": n counts events in this process and the
+# epoch changes on every restart, so a Last-Event-ID from another worker
+# or an older process is recognised and answered with a "reset" event
+# (refetch fetch-all-changes) instead of silently missing changes.
+
+CREATED = "created"
+DELETED = "deleted"
+REARRANGED = "rearranged"
+RESET = "reset"
+
+FILTER_KEYS = ["faculty", "branch", "class", "sem"]
+
+# Change stream operations -> event types
+STREAM_EVENTS = {"insert": CREATED, "delete": DELETED}
+
+
+def event_from_record(event_type, rec, refs):
+    class_id = rec.get("class_id")
+    ref = refs.get(class_id)
+    return {
+        "type": event_type,
+        "id": str(rec["_id"]) if rec.get("_id") is not None else None,
+        "faculty": rec.get("faculty_id"),
+        "date": rec.get("date"),
+        "day": rec.get("day"),
+        "lec_no": rec.get("lec_no"),
+        "class_id": class_id,
+        "assigned_to": decode_slot(class_id, rec.get("lec_no"), refs) if class_id else None,
+        "branch": ref.branch if ref else None,
+        "class": ref.class_name if ref else None,
+        "sem": ref.sem if ref else None,
+    }
+
+
+def event_from_change(change):
+    """(event type, record) for a change stream document."""
+    rec = (
+        change.get("fullDocument")
+        or change.get("fullDocumentBeforeChange")
+        or change.get("documentKey", {})
+    )
+    event_type = STREAM_EVENTS[change["operationType"]]
+    if event_type == CREATED:
+        # insert_temp_records stores the event when it is not a plain assignment
+        event_type = rec.get("event", CREATED)
+    return event_type, rec
+
+
+def unfiltered(event):
+    """
+    A delete seen without its pre-image only knows the record's _id, so
+    no filter can match it; it goes to every stream instead of none.
+    """
+    return event["type"] == DELETED and event.get("faculty") is None
+
+
+def matches(event, filters):
+    """filters: {key: query value}; sem may arrive as a string."""
+    return all(
+        str(event.get(key)) == str(value)
+        for key, value in filters.items()
+        if value
+    )
+
+
+# ===============================
+# 🔹 FEED
+# ===============================
+class ChangeFeed:
+    """
+    Per-process ring buffer of the last CHANGE_FEED_BUFFER events.
+
+    Writers append under a condition variable; every open stream waits on
+    it and reads only what is newer than its own sequence number, so a
+    new substitution costs one append however many tabs are listening.
+    """
+
+    def __init__(self, size=None):
+        self._cond = threading.Condition()
+        self._events = deque(maxlen=size or Config.CHANGE_FEED_BUFFER)
+        self._seq = 0
+        self.epoch = uuid.uuid4().hex[:8]
+
+    # -------------------------------
+    # Ids
+    # -------------------------------
+    def event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def parse_event_id(self, value):
+        """Sequence number for a Last-Event-ID of this process, else None."""
+        epoch, _, seq = (value or "").partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    @property
+    def last_seq(self):
+        with self._cond:
+            return self._seq
+
+    # -------------------------------
+    # Writers
+    # -------------------------------
+    def publish(self, event_type, records, refs=None):
+        if not records:
+            return
+
+        refs = dict(refs or {})
+        missing = {rec.get("class_id") for rec in records} - set(refs)
+        refs.update(class_directory.refs(missing))
+        events = [event_from_record(event_type, rec, refs) for rec in records]
+
+        with self._cond:
+            for event in events:
+                self._seq += 1
+                self._events.append((self._seq, event))
+            self._cond.notify_all()
+
+    def publish_reset(self):
+        """Tell every stream that changes may have been missed."""
+        with self._cond:
+            self._seq += 1
+            self._events.append((self._seq, {"type": RESET}))
+            self._cond.notify_all()
+
+    # -------------------------------
+    # Readers
+    # -------------------------------
+    def since(self, seq):
+        """([(seq, event)] newer than seq, gap) — gap if some were dropped."""
+        with self._cond:
+            gap = bool(self._events) and seq < self._events[0][0] - 1
+            return [item for item in self._events if item[0] > seq], gap
+
+    def wait(self, seq, timeout):
+        """Block until an event newer than seq exists or timeout passes."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._seq > seq, timeout)
+
+
+change_feed = ChangeFeed()
+
+
+# ===============================
+# 🔹 SOURCES
+# ===============================
+# CHANGE_FEED_SOURCE=local: the write paths publish (this process only),
+# so it is only complete with a single worker process.
+# CHANGE_FEED_SOURCE=mongo / auto: a change stream on temp_faculty_timetable
+# publishes instead, so every worker sees writes made by every other one.
+# It needs a replica set; on a standalone mongod the feed falls back to
+# local, and since other workers' writes are then missed, every resuming
+# client gets a reset. Rearranged records carry their event type, so the
+# stream tells them from plain assignments. Deletes carry the deleted
+# record only where pre-images are on (MongoDB 6+, migration step 7);
+# otherwise they reach every stream unfiltered (see unfiltered()).
+
+# Resume token no longer in the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+_watcher = None
+_watcher_lock = threading.Lock()
+_source = None
+
+
+def feed_source():
+    """"mongo" while the change stream publishes, else "local"."""
+    global _source
+    if _source is None:
+        _source = "local" if Config.CHANGE_FEED_SOURCE == "local" else "mongo"
+    return _source
+
+
+def delivery_guaranteed():
+    """False once the feed fell back to local: other workers' writes are missed."""
+    return feed_source() == "mongo" or Config.CHANGE_FEED_SOURCE == "local"
+
+
+def publish_changes(event_type, records, refs=None):
+    """Write-path hook; a no-op while the change stream is the source."""
+    if feed_source() == "local":
+        change_feed.publish(event_type, records, refs)
+
+
+def watch_temp_changes():
+    """Feed change_feed from a change stream until it becomes unusable."""
+    global _source
+    resume_token = None
+    started = False
+    options = {"full_document_before_change": "whenAvailable"}
+
+    while True:
+        try:
+            with db.temp_faculty_timetable.watch(
+                [{"$match": {"operationType": {"$in": list(STREAM_EVENTS)}}}],
+                resume_after=resume_token,
+                **options
+            ) as stream:
+                started = True
+                for change in stream:
+                    resume_token = stream.resume_token
+                    event_type, rec = event_from_change(change)
+                    change_feed.publish(event_type, [rec])
+        except Exception as e:
+            if options and "fullDocumentBeforeChange" in str(e):
+                # Pre-images need MongoDB 6+; deletes then only carry the _id
+                options = {}
+                continue
+            if not started:
+                logger.warning("Change streams unavailable, publishing from the write paths: %s", e)
+                _source = "local"
+                # Writes made before the switch were published nowhere
+                change_feed.publish_reset()
+                return
+            if getattr(e, "code", None) == CHANGE_STREAM_HISTORY_LOST:
+                # Too long disconnected to resume: start over, changes were missed
+                resume_token = None
+                change_feed.publish_reset()
+            logger.exception("Change stream interrupted, resuming")
+            time.sleep(1)
+
+
+def ensure_watcher():
+    """Start the change stream thread on first use when configured."""
+    global _watcher
+    if feed_source() != "mongo":
+        return
+    with _watcher_lock:
+        if _watcher is None or not _watcher.is_alive():
+            _watcher = threading.Thread(
+                target=watch_temp_changes, name="temp-change-stream", daemon=True
+            )
+            _watcher.start()
+
+
+# ===============================
+# 🔹 SSE
+# ===============================
+def sse_message(data, event_id=None):
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+def stream_changes(last_event_id, filters):
+    """
+    SSE chunks for one client: the buffered events after last_event_id,
+    then live ones, with a comment every CHANGE_FEED_HEARTBEAT seconds.
+    The response ends after CHANGE_FEED_STREAM_SECONDS; EventSource
+    reconnects by itself and resumes with Last-Event-ID. Heartbeats carry
+    the id too, so events filtered out are not replayed on reconnect.
+    """
+    deadline = time.monotonic() + Config.CHANGE_FEED_STREAM_SECONDS
+
+    yield f"retry: {Config.CHANGE_FEED_RETRY_MS}\n\n"
+
+    seq = change_feed.parse_event_id(last_event_id) if last_event_id else None
+    if seq is None:
+        seq = change_feed.last_seq
+        if last_event_id:
+            # Id from another worker or an older process: changes may be missing
+            yield sse_message({"type": RESET}, change_feed.event_id(seq))
+    elif not delivery_guaranteed():
+        # Local fallback: writes handled by other workers never reached us
+        yield sse_message({"type": RESET}, change_feed.event_id(seq))
+
+    while time.monotonic() < deadline:
+        events, gap = change_feed.since(seq)
+        if gap:
+            yield sse_message({"type": RESET}, change_feed.event_id(events[0][0] - 1))
+
+        for event_seq, event in events:
+            seq = event_seq
+            if event["type"] == RESET or unfiltered(event) or matches(event, filters):
+                yield sse_message(event, change_feed.event_id(event_seq))
+
+        timeout = max(0, min(Config.CHANGE_FEED_HEARTBEAT, deadline - time.monotonic()))
+        if not change_feed.wait(seq, timeout):
+            yield f": keep-alive\nid: {change_feed.event_id(seq)}\n\n"
+
+
+# ===============================
+# 🔹 STREAM LIMIT
+# ===============================
+class StreamLimit:
+    """
+    At most CHANGE_FEED_MAX_STREAMS open streams per process. Every open
+    response keeps a worker thread busy for CHANGE_FEED_STREAM_SECONDS, so
+    past the limit new clients are turned away instead of starving the
+    rest of the API.
+    """
+
+    def __init__(self, size=None):
+        self._lock = threading.Lock()
+        self._open = 0
+        self.size = size or Config.CHANGE_FEED_MAX_STREAMS
+
+    @property
+    def open_count(self):
+        with self._lock:
+            return self._open
+
+    def open(self, chunks):
+        """chunks holding one slot until closed or exhausted, or None when full."""
+        with self._lock:
+            if self._open >= self.size:
+                return None
+            self._open += 1
+        return HeldStream(self, chunks)
+
+    def _release(self):
+        with self._lock:
+            self._open -= 1
+
+
+class HeldStream:
+    """Iterator over a stream's chunks that gives its slot back exactly once."""
+
+    def __init__(self, limit, chunks):
+        self._limit = limit
+        self._chunks = chunks
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            if hasattr(self._chunks, "close"):
+                self._chunks.close()
+        finally:
+            self._limit._release()
+
+    def __del__(self):
+        # Responses dropped before their first chunk are never closed
+        self.close()
+
+
+stream_limit = StreamLimit()
@@ -0,0 +1,97 @@
+from app.database.mongo import db
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
+DAYS_MAP = {
+    "Monday": "mon",
+    "Tuesday": "tue",
+    "Wednesday": "wed",
+    "Thursday": "thu",
+    "Friday": "fri",
+    "Saturday": "sat",
+}
+
+TOTAL_SLOTS = 8
+TIME_SLOT_KEYS = [f"Time Slot {i + 1}" for i in range(TOTAL_SLOTS)]
+
+
+# ===============================
+# 🔹 HELPERS
+# ===============================
+def make_class_id(sem, branch, class_name):
+    """'sem4_cseaiml_d1' — shared _id of classwise_faculty and class_timetable."""
+    safe_branch = branch.lower().replace("(", "").replace(")", "")
+    return f"sem{sem}_{safe_branch}_{class_name.lower()}"
+
+
+def empty_schedule():
+    return {day: {slot: "free" for slot in TIME_SLOT_KEYS} for day in DAYS}
+
+
+def normalize_schedule(schedule):
+    """Keep only known days / time slots; everything missing is 'free'."""
+    normalized = empty_schedule()
+
+    for day_name, slots in (schedule or {}).items():
+        if day_name not in normalized or not isinstance(slots, dict):
+            continue
+        for time_slot, faculty in slots.items():
+            if time_slot in normalized[day_name] and faculty:
+                normalized[day_name][time_slot] = faculty
+
+    return normalized
+
+
+# ===============================
+# 🔹 MATERIALIZED CLASS SCHEDULE
+# ===============================
+def get_class_schedule(class_id):
+    """Materialized class schedule document, or None."""
+    return db.class_timetable.find_one({"_id": class_id})
+
+
+def save_class_schedule(class_id, sem, branch, class_name, schedule, session=None):
+    db.class_timetable.update_one(
+        {"_id": class_id},
+        {
+            "$set": {
+                "sem": sem,
+                "branch": branch,
+                "class": class_name,
+                "schedule": normalize_schedule(schedule),
+            }
+        },
+        upsert=True,
+        session=session
+    )
+
+
+def delete_class_schedule(class_id, session=None):
+    db.class_timetable.delete_one({"_id": class_id}, session=session)
+
+
+def rebuild_class_schedule(class_doc):
+    """
+    Rebuild a class grid from faculty timetables (pre-materialization data).
+    One $in query over the class's allowed faculty.
+    """
+    class_id = class_doc["_id"]
+
+    schedule = empty_schedule()
+
+    for doc in db.faculty_timetable.find(
+        {"_id": {"$in": class_doc.get("allowed_faculty", [])}},
+        {"timetable": 1}
+    ):
+        tt = doc.get("timetable", {})
+        for day_name in DAYS:
+            slots = tt.get(DAYS_MAP[day_name], [])
+            if not isinstance(slots, list):
+                continue
+            for i, val in enumerate(slots[:TOTAL_SLOTS]):
+                if val == class_id:
+                    schedule[day_name][TIME_SLOT_KEYS[i]] = doc["_id"]
+
+    return schedule
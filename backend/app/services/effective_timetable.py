@@ -0,0 +1,248 @@
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.class_schedule import (
+    DAYS,
+    DAYS_MAP,
+    TIME_SLOT_KEYS,
+    TOTAL_SLOTS,
+    get_class_schedule,
+    normalize_schedule,
+    rebuild_class_schedule
+)
+from app.services.slot_codec import FREE_SLOT, LEGACY_FREE, class_directory, decode_slot, is_free
+
+
+class EffectiveTimetableError(ValueError):
+    """Bad effective-timetable request (date)."""
+
+
+def parse_date(value):
+    """(iso date, day name or None on Sundays); defaults to today."""
+    try:
+        selected = date.fromisoformat(value) if value else date.today()
+    except (TypeError, ValueError):
+        raise EffectiveTimetableError("date must be an ISO date (YYYY-MM-DD)")
+
+    day_name = DAYS[selected.weekday()] if selected.weekday() < len(DAYS) else None
+    return selected.isoformat(), day_name
+
+
+# ===============================
+# 🔹 VIEWS
+# ===============================
+def class_view(class_doc, selected_date, day_name, covers):
+    """
+    A class on one date: the permanent grid for that weekday with the
+    date's temp substitutions written over it. Every cover of a slot is
+    listed; the grid shows the latest one.
+    covers: {(class_id, lec_no): [faculty_id, ...]} for the date, oldest first.
+    """
+    class_id = class_doc["_id"]
+    regular = normalize_schedule(class_doc.get("schedule")).get(day_name, {}) if day_name else {}
+
+    schedule = {}
+    substitutions = []
+    for lec_no, time_slot in enumerate(TIME_SLOT_KEYS if day_name else []):
+        faculty = regular.get(time_slot, LEGACY_FREE)
+        slot_covers = covers.get((class_id, lec_no), [])
+        for cover in slot_covers:
+            substitutions.append({
+                "lec_no": lec_no,
+                "time_slot": time_slot,
+                "faculty": cover,
+                "regular_faculty": None if is_free(faculty) else faculty,
+            })
+        schedule[time_slot] = slot_covers[-1] if slot_covers else faculty
+
+    return {
+        "class_id": class_id,
+        "sem": class_doc.get("sem"),
+        "branch": class_doc.get("branch"),
+        "class": class_doc.get("class"),
+        "date": selected_date,
+        "day": day_name,
+        "schedule": schedule,
+        "substitutions": substitutions,
+    }
+
+
+def faculty_view(faculty_doc, selected_date, day_name, covers, taking):
+    """
+    A faculty on one date: permanent lectures of that weekday, minus the
+    ones someone else covers, plus the substitutions they were given.
+    taking: {(faculty_id, lec_no): class_id} for the date.
+    Every lecture of the day is listed, however short the stored array
+    (faculty created empty start with fewer slots).
+    """
+    fac_id = faculty_doc["_id"]
+    slots = []
+    if day_name:
+        stored = (faculty_doc.get("timetable") or {}).get(DAYS_MAP[day_name], [])
+        stored = stored[:TOTAL_SLOTS] if isinstance(stored, list) else []
+        slots = stored + [FREE_SLOT] * (TOTAL_SLOTS - len(stored))
+
+    refs = class_directory.refs(
+        set(slots) | {class_id for (f, _), class_id in taking.items() if f == fac_id}
+    )
+
+    effective = []
+    substitutions = []
+    covered = []
+    for lec_no in range(TOTAL_SLOTS if day_name else 0):
+        class_id = slots[lec_no]
+        time_slot = TIME_SLOT_KEYS[lec_no]
+        substitute_for = taking.get((fac_id, lec_no))
+
+        if substitute_for:
+            substitutions.append({
+                "lec_no": lec_no,
+                "time_slot": time_slot,
+                "class_id": substitute_for,
+                "assigned_to": decode_slot(substitute_for, lec_no, refs),
+            })
+            class_id = substitute_for
+        elif not is_free(class_id):
+            others = [
+                cover for cover in covers.get((class_id, lec_no), []) if cover != fac_id
+            ]
+            if others:
+                covered_by = others[-1]
+                covered.append({
+                    "lec_no": lec_no,
+                    "time_slot": time_slot,
+                    "class_id": class_id,
+                    "assigned_to": decode_slot(class_id, lec_no, refs),
+                    "covered_by": covered_by,
+                })
+                class_id = None
+
+        effective.append(decode_slot(class_id, lec_no, refs))
+
+    return {
+        "faculty_id": fac_id,
+        "name": faculty_doc.get("name", fac_id),
+        "date": selected_date,
+        "day": day_name,
+        "timetable": effective,
+        "substitutions": substitutions,
+        "covered": covered,
+    }
+
+
+# ===============================
+# 🔹 CACHE
+# ===============================
+class EffectiveTimetableCache:
+    """
+    Per-process cache of effective timetables, keyed by date.
+
+    A date entry holds that date's temp records (one query) and every class
+    or faculty view built from them (one _id lookup each), so repeated
+    "today's timetable" requests are served from memory. Temp writes
+    invalidate their date, permanent writes clear everything, and entries
+    expire after OCCUPANCY_INDEX_TTL seconds to pick up other workers.
+    At most EFFECTIVE_CACHE_DATES dates are kept.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # date -> {"covers", "taking", "views": {(kind, id): view}, "loaded_at"}
+        self._dates = OrderedDict()
+        # Bumped on every invalidation so a load racing a write is not stored
+        self._generation = 0
+
+    def _load_date(self, selected_date):
+        covers = {}
+        taking = {}
+        for rec in db.temp_faculty_timetable.find(
+            {"date": selected_date},
+            {"faculty_id": 1, "class_id": 1, "lec_no": 1}
+        ).sort("_id", 1):
+            covers.setdefault((rec.get("class_id"), rec["lec_no"]), []).append(rec["faculty_id"])
+            taking[(rec["faculty_id"], rec["lec_no"])] = rec.get("class_id")
+
+        return {
+            "covers": covers,
+            "taking": taking,
+            "views": {},
+            "loaded_at": time.monotonic(),
+        }
+
+    def _entry(self, selected_date):
+        with self._lock:
+            entry = self._dates.get(selected_date)
+            if entry and time.monotonic() - entry["loaded_at"] <= Config.OCCUPANCY_INDEX_TTL:
+                self._dates.move_to_end(selected_date)
+                return entry, self._generation
+            generation = self._generation
+
+        entry = self._load_date(selected_date)
+
+        with self._lock:
+            if generation == self._generation:
+                self._dates[selected_date] = entry
+                self._dates.move_to_end(selected_date)
+                while len(self._dates) > Config.EFFECTIVE_CACHE_DATES:
+                    self._dates.popitem(last=False)
+        return entry, generation
+
+    def _view(self, selected_date, key, build):
+        entry, generation = self._entry(selected_date)
+        with self._lock:
+            if key in entry["views"]:
+                return entry["views"][key]
+
+        view = build(entry)
+        if view is not None:
+            with self._lock:
+                if generation == self._generation:
+                    entry["views"][key] = view
+        return view
+
+    def for_class(self, class_id, selected_date, day_name):
+        """Effective view of a class on a date, or None if the class is unknown."""
+        def build(entry):
+            class_doc = get_class_schedule(class_id)
+            if not class_doc:
+                classwise_doc = db.classwise_faculty.find_one({"_id": class_id})
+                if not classwise_doc:
+                    return None
+                class_doc = dict(classwise_doc, schedule=rebuild_class_schedule(classwise_doc))
+            return class_view(class_doc, selected_date, day_name, entry["covers"])
+
+        return self._view(selected_date, ("class", class_id), build)
+
+    def for_faculty(self, fac_id, selected_date, day_name):
+        """Effective view of a faculty on a date, or None if the faculty is unknown."""
+        def build(entry):
+            faculty_doc = db.faculty_timetable.find_one(
+                {"_id": fac_id}, {"name": 1, "timetable": 1}
+            )
+            if not faculty_doc:
+                return None
+            return faculty_view(
+                faculty_doc, selected_date, day_name, entry["covers"], entry["taking"]
+            )
+
+        return self._view(selected_date, ("faculty", fac_id), build)
+
+    # -------------------------------
+    # Write-path invalidation
+    # -------------------------------
+    def invalidate_date(self, selected_date):
+        with self._lock:
+            self._generation += 1
+            self._dates.pop(selected_date, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._dates.clear()
+
+
+effective_timetables = EffectiveTimetableCache()
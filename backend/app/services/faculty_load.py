@@ -0,0 +1,175 @@
+from datetime import date, timedelta
+
+import click
+from pymongo import UpdateOne
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.slot_codec import is_free
+
+# ===============================
+# 🔹 COUNTERS
+# ===============================
+# faculty_timetable.<id>.load:
+#   weekly   lectures in the permanent week
+#   subs     {"2025-01-31": n} temp substitutions per date
+#
+# Write paths keep both up to date, so ranking never scans
+# temp_faculty_timetable; every substitution update also drops date buckets
+# that fell out of the window or reached 0, so subs stays window-sized.
+# `flask recount-loads` rebuilds them from scratch.
+
+LOAD_FIELD = "load"
+
+
+def weekly_load(timetable):
+    """Permanent lectures in a faculty timetable."""
+    return sum(
+        1
+        for slots in (timetable or {}).values() if isinstance(slots, list)
+        for value in slots
+        if not is_free(value)
+    )
+
+
+def window_start(today=None):
+    today = today or date.today()
+    return (today - timedelta(days=Config.LOAD_WINDOW_DAYS)).isoformat()
+
+
+def recent_substitutions(load, today=None):
+    """Substitutions dated inside the rolling window (future ones included)."""
+    start = window_start(today)
+    subs = (load or {}).get("subs") or {}
+    return sum(n for day, n in subs.items() if day >= start)
+
+
+def load_summary(load, today=None):
+    return {
+        "weekly_load": (load or {}).get("weekly", 0),
+        "recent_substitutions": recent_substitutions(load, today),
+    }
+
+
+def load_score(load, today=None):
+    """Lower is lighter: recent covers weigh more than the regular week."""
+    summary = load_summary(load, today)
+    return (
+        summary["recent_substitutions"] * Config.LOAD_SUBSTITUTION_WEIGHT
+        + summary["weekly_load"]
+    )
+
+
+def rank_by_load(fac_ids, loads, today=None):
+    """fac_ids lightest first; ties keep the given (allowed_faculty) order."""
+    return sorted(fac_ids, key=lambda fac_id: load_score(loads.get(fac_id), today))
+
+
+def fetch_loads(fac_ids):
+    """{faculty_id: load} with one $in query."""
+    return {
+        doc["_id"]: doc.get(LOAD_FIELD, {})
+        for doc in db.faculty_timetable.find(
+            {"_id": {"$in": list(fac_ids)}},
+            {LOAD_FIELD: 1}
+        )
+    }
+
+
+# ===============================
+# 🔹 WRITE-PATH UPDATES
+# ===============================
+def subs_update(per_day, start):
+    """
+    Pipeline update adding per_day ({date: n}) to load.subs, then keeping
+    only the buckets dated from start on with a positive count.
+    """
+    subs = f"${LOAD_FIELD}.subs"
+    return [
+        {"$set": {
+            f"{LOAD_FIELD}.subs.{day}": {"$add": [{"$ifNull": [f"{subs}.{day}", 0]}, n]}
+            for day, n in per_day.items()
+        }},
+        {"$set": {f"{LOAD_FIELD}.subs": {"$arrayToObject": {"$filter": {
+            "input": {"$objectToArray": subs},
+            "as": "bucket",
+            "cond": {"$and": [
+                {"$gte": ["$$bucket.k", start]},
+                {"$gt": ["$$bucket.v", 0]},
+            ]},
+        }}}}},
+    ]
+
+
+def substitution_ops(records, sign=1, today=None):
+    """One pruning update per faculty for a batch of temp records."""
+    counts = {}
+    for rec in records:
+        per_day = counts.setdefault(rec["faculty_id"], {})
+        per_day[rec["date"]] = per_day.get(rec["date"], 0) + sign
+
+    start = window_start(today)
+    return [
+        UpdateOne({"_id": fac_id}, subs_update(per_day, start))
+        for fac_id, per_day in counts.items()
+    ]
+
+
+def count_substitutions(records, sign=1, session=None):
+    ops = substitution_ops(records, sign)
+    if ops:
+        db.faculty_timetable.bulk_write(ops, ordered=False, session=session)
+
+
+def weekly_delta(before, after):
+    """Change in permanent lectures between two versions of some slots."""
+    return (
+        sum(1 for value in after if not is_free(value))
+        - sum(1 for value in before if not is_free(value))
+    )
+
+
+# ===============================
+# 🔹 RECOUNT
+# ===============================
+def recount_loads(database=None):
+    """
+    Rebuild every counter from faculty_timetable and temp_faculty_timetable.
+    Used by the backfill migration and `flask recount-loads`.
+    """
+    database = database if database is not None else db
+    start = window_start()
+
+    subs = {}
+    for row in database.temp_faculty_timetable.aggregate([
+        {"$match": {"date": {"$gte": start}}},
+        {"$group": {
+            "_id": {"faculty_id": "$faculty_id", "date": "$date"},
+            "n": {"$sum": 1},
+        }},
+    ]):
+        key = row["_id"]
+        subs.setdefault(key["faculty_id"], {})[key["date"]] = row["n"]
+
+    ops = []
+    for doc in database.faculty_timetable.find({}, {"timetable": 1}):
+        ops.append(UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {LOAD_FIELD: {
+                "weekly": weekly_load(doc.get("timetable")),
+                "subs": subs.get(doc["_id"], {}),
+            }}}
+        ))
+        if len(ops) >= 500:
+            database.faculty_timetable.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        database.faculty_timetable.bulk_write(ops, ordered=False)
+
+
+def register_cli(app):
+    @app.cli.command("recount-loads")
+    def recount_command():
+        """Rebuild faculty load counters from timetables and temp records."""
+        recount_loads()
+        click.echo("Faculty load counters rebuilt")
@@ -0,0 +1,338 @@
+import threading
+import time
+from contextvars import ContextVar
+
+from flask import g, has_request_context, request
+from pymongo import monitoring
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+LATENCY_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+COMMAND_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100, 200]
+
+# Label used for commands issued outside a request (startup, background work)
+NO_ENDPOINT = "none"
+
+
+# Request attribution for commands issued off the request thread
+# (async mode runs them on the background event loop)
+request_scope = ContextVar("metrics_request_scope", default=None)
+
+
+def current_endpoint():
+    if has_request_context():
+        return request.endpoint or request.path
+    scope = request_scope.get()
+    return scope["endpoint"] if scope else NO_ENDPOINT
+
+
+def capture_request_scope():
+    """Snapshot of the current request for request_scope, or None."""
+    if not has_request_context():
+        return None
+    return {"endpoint": current_endpoint(), "g": g._get_current_object()}
+
+
+# ===============================
+# 🔹 HISTOGRAM
+# ===============================
+class Histogram:
+    """Cumulative Prometheus-style histogram."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.total += 1
+        self.sum += value
+
+
+# ===============================
+# 🔹 REGISTRY
+# ===============================
+class Metrics:
+    """
+    In-process metrics for the API: per-route request counts and latency,
+    and every Mongo command attributed to the Flask endpoint that issued it.
+    Values are per worker process, like the occupancy index.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (endpoint, method, status) -> count
+        self.requests = {}
+        # endpoint -> Histogram of seconds
+        self.latency = {}
+        # endpoint -> Histogram of Mongo commands per request
+        self.commands_per_request = {}
+        # (endpoint, command) -> [count, failures, seconds]
+        self.commands = {}
+
+    def record_command(self, endpoint, command, seconds, failed=False):
+        with self._lock:
+            entry = self.commands.setdefault((endpoint, command), [0, 0, 0.0])
+            entry[0] += 1
+            entry[1] += 1 if failed else 0
+            entry[2] += seconds
+
+    def record_request(self, endpoint, method, status, seconds, commands):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(endpoint, Histogram(LATENCY_BUCKETS)).observe(seconds)
+            self.commands_per_request.setdefault(
+                endpoint, Histogram(COMMAND_BUCKETS)
+            ).observe(commands)
+
+    def reset(self):
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.commands_per_request.clear()
+            self.commands.clear()
+
+    # -------------------------------
+    # Prometheus text format
+    # -------------------------------
+    def render(self):
+        with self._lock:
+            lines = []
+
+            lines.append("# HELP timetable_http_requests_total HTTP requests by endpoint, method and status.")
+            lines.append("# TYPE timetable_http_requests_total counter")
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f"timetable_http_requests_total{labels(endpoint=endpoint, method=method, status=status)} {count}"
+                )
+
+            render_histograms(
+                lines,
+                "timetable_http_request_duration_seconds",
+                "Request latency by endpoint.",
+                self.latency
+            )
+            render_histograms(
+                lines,
+                "timetable_mongo_commands_per_request",
+                "Mongo commands issued per request, by endpoint.",
+                self.commands_per_request
+            )
+
+            lines.append("# HELP timetable_mongo_commands_total Mongo commands by endpoint and command name.")
+            lines.append("# TYPE timetable_mongo_commands_total counter")
+            for (endpoint, command), entry in sorted(self.commands.items()):
+                lines.append(
+                    f"timetable_mongo_commands_total{labels(endpoint=endpoint, command=command)} {entry[0]}"
+                )
+
+            lines.append("# HELP timetable_mongo_command_failures_total Failed Mongo commands by endpoint and command name.")
+            lines.append("# TYPE timetable_mongo_command_failures_total counter")
+            for (endpoint, command), entry in sorted(self.commands.items()):
+                lines.append(
+                    f"timetable_mongo_command_failures_total{labels(endpoint=endpoint, command=command)} {entry[1]}"
+                )
+
+            lines.append("# HELP timetable_mongo_command_seconds_total Time spent in Mongo commands by endpoint and command name.")
+            lines.append("# TYPE timetable_mongo_command_seconds_total counter")
+            for (endpoint, command), entry in sorted(self.commands.items()):
+                lines.append(
+                    f"timetable_mongo_command_seconds_total{labels(endpoint=endpoint, command=command)} {entry[2]:.6f}"
+                )
+
+        pool_listener.render(lines)
+
+        return "\n".join(lines) + "\n"
+
+
+def labels(**values):
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in values.items()
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def render_histograms(lines, name, help_text, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for endpoint, histogram in sorted(histograms.items()):
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            lines.append(f"{name}_bucket{labels(endpoint=endpoint, le=bound)} {count}")
+        lines.append(f"{name}_bucket{labels(endpoint=endpoint, le='+Inf')} {histogram.total}")
+        lines.append(f"{name}_sum{labels(endpoint=endpoint)} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{labels(endpoint=endpoint)} {histogram.total}")
+
+
+metrics = Metrics()
+
+
+# ===============================
+# 🔹 MONGO COMMAND LISTENER
+# ===============================
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Attributes every Mongo command to the current Flask request.
+
+    pymongo calls listeners on the thread that runs the command, so the
+    request context (and g) of the controller that issued it is available.
+    """
+
+    def started(self, event):
+        if has_request_context():
+            g.mongo_commands = g.get("mongo_commands", 0) + 1
+            return
+
+        scope = request_scope.get()
+        if scope:
+            scope["g"].mongo_commands = scope["g"].get("mongo_commands", 0) + 1
+
+    def succeeded(self, event):
+        metrics.record_command(
+            current_endpoint(), event.command_name, event.duration_micros / 1e6
+        )
+
+    def failed(self, event):
+        metrics.record_command(
+            current_endpoint(), event.command_name, event.duration_micros / 1e6, failed=True
+        )
+
+
+command_listener = MongoCommandMetrics()
+
+
+# ===============================
+# 🔹 CONNECTION POOL LISTENER
+# ===============================
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool statistics per server address for this process:
+    open / checked-out connections, checkouts, checkout failures by reason
+    and pool clears.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = {}
+
+    def _pool(self, address):
+        key = f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+        return self.pools.setdefault(key, {
+            "open": 0,
+            "in_use": 0,
+            "checkouts": 0,
+            "checkout_failures": {},
+            "cleared": 0,
+        })
+
+    def _update(self, address, field, delta=1):
+        with self._lock:
+            self._pool(address)[field] += delta
+
+    def reset(self):
+        with self._lock:
+            self.pools.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                address: dict(pool, checkout_failures=dict(pool["checkout_failures"]))
+                for address, pool in self.pools.items()
+            }
+
+    def pool_created(self, event):
+        with self._lock:
+            self._pool(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(event.address, "cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(event.address, "open")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(event.address, "open", -1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            failures = self._pool(event.address)["checkout_failures"]
+            failures[str(event.reason)] = failures.get(str(event.reason), 0) + 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["checkouts"] += 1
+            pool["in_use"] += 1
+
+    def connection_checked_in(self, event):
+        self._update(event.address, "in_use", -1)
+
+    def render(self, lines):
+        stats = self.stats()
+
+        for name, field, kind, help_text in [
+            ("timetable_mongo_pool_connections", "open", "gauge", "Open pool connections."),
+            ("timetable_mongo_pool_in_use", "in_use", "gauge", "Connections checked out of the pool."),
+            ("timetable_mongo_pool_checkouts_total", "checkouts", "counter", "Successful connection checkouts."),
+            ("timetable_mongo_pool_cleared_total", "cleared", "counter", "Times the pool was cleared."),
+        ]:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for address, pool in sorted(stats.items()):
+                lines.append(f"{name}{labels(address=address)} {pool[field]}")
+
+        lines.append("# HELP timetable_mongo_pool_checkout_failures_total Failed checkouts by reason.")
+        lines.append("# TYPE timetable_mongo_pool_checkout_failures_total counter")
+        for address, pool in sorted(stats.items()):
+            for reason, count in sorted(pool["checkout_failures"].items()):
+                lines.append(
+                    f"timetable_mongo_pool_checkout_failures_total{labels(address=address, reason=reason)} {count}"
+                )
+
+
+pool_listener = PoolMetrics()
+
+
+# ===============================
+# 🔹 FLASK HOOKS
+# ===============================
+def init_metrics(app):
+    """Time every request and record it once the response is ready."""
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        g.mongo_commands = 0
+
+    @app.after_request
+    def record_request(response):
+        # Streamed bodies run after this hook; their commands still count
+        # towards timetable_mongo_commands_total
+        started = g.get("request_started")
+        if started is not None:
+            metrics.record_request(
+                current_endpoint(),
+                request.method,
+                response.status_code,
+                time.perf_counter() - started,
+                g.get("mongo_commands", 0)
+            )
+        return response
@@ -0,0 +1,271 @@
+import threading
+import time
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.slot_codec import is_free
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+DAY_KEYS = ["mon", "tue", "wed", "thu", "fri", "sat"]
+DAY_INDEX = {day: i for i, day in enumerate(DAY_KEYS)}
+
+TOTAL_SLOTS = 8
+
+
+# ===============================
+# 🔹 HELPERS
+# ===============================
+def slot_bit(day, lec_no):
+    """Bit for (day, lec_no) in a 6x8 week mask, or 0 if out of range."""
+    day_idx = DAY_INDEX.get(day)
+    if day_idx is None or not isinstance(lec_no, int) or not 0 <= lec_no < TOTAL_SLOTS:
+        return 0
+    return 1 << (day_idx * TOTAL_SLOTS + lec_no)
+
+
+def timetable_masks(timetable):
+    """
+    Build (valid, busy) masks from a faculty timetable dict.
+    'valid' marks slots that exist in the stored arrays, so short
+    arrays keep the old "slot out of range means not free" behaviour.
+    """
+    valid = 0
+    busy = 0
+
+    for day, slots in (timetable or {}).items():
+        if day not in DAY_INDEX or not isinstance(slots, list):
+            continue
+
+        for lec_no, value in enumerate(slots[:TOTAL_SLOTS]):
+            bit = slot_bit(day, lec_no)
+            valid |= bit
+            if not is_free(value):
+                busy |= bit
+
+    return valid, busy
+
+
+# ===============================
+# 🔹 INDEX
+# ===============================
+class OccupancyIndex:
+    """
+    Per-process cache of faculty occupancy.
+
+    Each faculty's permanent week is a 48-bit mask and temp_faculty_timetable
+    records are overlaid per date, so availability checks are bit tests.
+    Entries expire after OCCUPANCY_INDEX_TTL seconds so writes made by other
+    workers are picked up; write controllers update the index directly.
+    """
+
+    def __init__(self, ttl=None):
+        self._lock = threading.RLock()
+        self._ttl = Config.OCCUPANCY_INDEX_TTL if ttl is None else ttl
+
+        # fac_id -> {"valid", "busy", "timetable", "info", "loaded_at"}
+        self._faculty = {}
+        # date -> {"masks": {fac_id: mask}, "loaded_at"}
+        self._temp = {}
+
+    # -------------------------------
+    # Loading
+    # -------------------------------
+    def _expired(self, loaded_at):
+        return time.monotonic() - loaded_at > self._ttl
+
+    def ensure_faculty(self, fac_ids, refresh=False):
+        """Load missing or stale faculty weeks with a single $in query."""
+        with self._lock:
+            pending = [
+                fac_id for fac_id in dict.fromkeys(fac_ids)
+                if refresh
+                or fac_id not in self._faculty
+                or self._expired(self._faculty[fac_id]["loaded_at"])
+            ]
+
+        if not pending:
+            return
+
+        docs = {
+            doc["_id"]: doc
+            for doc in db.faculty_timetable.find(
+                {"_id": {"$in": pending}},
+                {"name": 1, "department": 1, "timetable": 1}
+            )
+        }
+
+        with self._lock:
+            for fac_id in pending:
+                doc = docs.get(fac_id)
+                if doc is None:
+                    self._store_faculty(fac_id, None, None)
+                else:
+                    self._store_faculty(
+                        fac_id,
+                        doc.get("timetable", {}),
+                        {
+                            "name": doc.get("name", fac_id),
+                            "department": doc.get("department", "N/A"),
+                        }
+                    )
+
+    def ensure_date(self, selected_date, refresh=False):
+        """Load the temp overlay for a date with a single query."""
+        with self._lock:
+            entry = self._temp.get(selected_date)
+            if entry and not refresh and not self._expired(entry["loaded_at"]):
+                return
+
+        masks = {}
+        for rec in db.temp_faculty_timetable.find(
+            {"date": selected_date},
+            {"faculty_id": 1, "day": 1, "lec_no": 1}
+        ):
+            bit = slot_bit(rec.get("day"), rec.get("lec_no"))
+            if bit:
+                fac_id = rec.get("faculty_id")
+                masks[fac_id] = masks.get(fac_id, 0) | bit
+
+        with self._lock:
+            self._temp[selected_date] = {
+                "masks": masks,
+                "loaded_at": time.monotonic(),
+            }
+
+    def _store_faculty(self, fac_id, timetable, info):
+        if timetable is None:
+            # Unknown faculty is never free
+            valid, busy = 0, 0
+        else:
+            valid, busy = timetable_masks(timetable)
+
+        self._faculty[fac_id] = {
+            "valid": valid,
+            "busy": busy,
+            "timetable": timetable or {},
+            "info": info,
+            "loaded_at": time.monotonic(),
+        }
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def _free_mask(self, fac_id, selected_date):
+        entry = self._faculty.get(fac_id)
+        if entry is None:
+            return 0
+
+        temp_entry = self._temp.get(selected_date)
+        temp_mask = temp_entry["masks"].get(fac_id, 0) if temp_entry else 0
+
+        return entry["valid"] & ~entry["busy"] & ~temp_mask
+
+    def is_free(self, fac_id, day, lec_no, selected_date, refresh=False):
+        """True if faculty has no permanent or temp lecture in the slot."""
+        self.ensure_faculty([fac_id], refresh=refresh)
+        self.ensure_date(selected_date, refresh=refresh)
+
+        bit = slot_bit(day, lec_no)
+        with self._lock:
+            return bool(bit and self._free_mask(fac_id, selected_date) & bit)
+
+    def free_faculty(self, fac_ids, day, lec_no, selected_date):
+        """Subset of fac_ids free in the slot, keeping the given order."""
+        fac_ids = list(fac_ids)
+        self.ensure_faculty(fac_ids)
+        self.ensure_date(selected_date)
+
+        bit = slot_bit(day, lec_no)
+        if not bit:
+            return []
+
+        with self._lock:
+            return [
+                fac_id for fac_id in fac_ids
+                if self._free_mask(fac_id, selected_date) & bit
+            ]
+
+    def slot_value(self, fac_id, day, lec_no):
+        """Class id taught in the slot permanently, or None if free/unknown."""
+        self.ensure_faculty([fac_id])
+
+        with self._lock:
+            entry = self._faculty.get(fac_id)
+            bit = slot_bit(day, lec_no)
+            if not entry or not bit or not entry["busy"] & bit:
+                return None
+            return entry["timetable"][day][lec_no]
+
+    def slot_values(self, fac_ids, day, lec_no):
+        """
+        {fac_id: class id taught permanently in the slot, or None if free}
+        for the fac_ids whose timetable has the slot; unknown ones are left out.
+        """
+        fac_ids = list(fac_ids)
+        self.ensure_faculty(fac_ids)
+
+        bit = slot_bit(day, lec_no)
+        values = {}
+        with self._lock:
+            for fac_id in fac_ids:
+                entry = self._faculty.get(fac_id)
+                if not entry or not bit or not entry["valid"] & bit:
+                    continue
+                values[fac_id] = entry["timetable"][day][lec_no] if entry["busy"] & bit else None
+        return values
+
+    def faculty_info(self, fac_id):
+        """Cached {name, department} for a faculty, or None if unknown."""
+        self.ensure_faculty([fac_id])
+
+        with self._lock:
+            entry = self._faculty.get(fac_id)
+            return dict(entry["info"]) if entry and entry["info"] else None
+
+    # -------------------------------
+    # Write-path updates
+    # -------------------------------
+    def set_timetable(self, fac_id, timetable, name=None):
+        with self._lock:
+            entry = self._faculty.get(fac_id)
+            info = entry["info"] if entry and entry["info"] else {
+                "name": fac_id,
+                "department": "N/A",
+            }
+            if name is not None:
+                info = dict(info, name=name)
+            self._store_faculty(fac_id, timetable, info)
+
+    def drop_faculty(self, fac_id):
+        with self._lock:
+            self._faculty.pop(fac_id, None)
+
+    def add_temp(self, fac_id, selected_date, day, lec_no):
+        bit = slot_bit(day, lec_no)
+        with self._lock:
+            entry = self._temp.get(selected_date)
+            if entry is None or not bit:
+                # Not cached yet: next read loads it from Mongo
+                return
+            masks = entry["masks"]
+            masks[fac_id] = masks.get(fac_id, 0) | bit
+
+    def invalidate_date(self, selected_date):
+        # Several temp records may share a slot, so reload instead of clearing a bit
+        with self._lock:
+            self._temp.pop(selected_date, None)
+
+    def invalidate_dates(self):
+        """Drop every cached temp overlay (e.g. after a bulk temp purge)."""
+        with self._lock:
+            self._temp.clear()
+
+    def clear(self):
+        with self._lock:
+            self._faculty.clear()
+            self._temp.clear()
+
+
+occupancy_index = OccupancyIndex()
@@ -0,0 +1,168 @@
+import re
+import threading
+import time
+from collections import namedtuple
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.class_schedule import make_class_id
+
+# ===============================
+# 🔹 STORAGE FORMAT
+# ===============================
+# faculty_timetable.timetable.<day>[lec_no] holds the _id of the class
+# taught in that slot ("sem4_cse_d1", the key shared by classwise_faculty
+# and class_timetable) or null when the slot is free; the lecture number
+# is the array position. temp_faculty_timetable records carry class_id
+# next to lec_no. Both are plain equality matches, so they index.
+#
+# The legacy "CSE-D1-Sem4-Time Slot 3" / "free" strings only exist at the
+# API boundary: decode_slot() produces them, encode_legacy_slot() reads
+# them back.
+
+FREE_SLOT = None
+LEGACY_FREE = "free"
+
+LEGACY_SLOT_RE = re.compile(
+    r"^(?P<branch>.+)-(?P<class_name>[^-]+)-Sem(?P<sem>\d+)-Time Slot (?P<slot>\d+)$"
+)
+
+
+class ClassRef(namedtuple("ClassRef", ["class_id", "branch", "class_name", "sem"])):
+    """A class as stored in classwise_faculty."""
+
+    __slots__ = ()
+
+    @property
+    def label(self):
+        """'CSE-D1-Sem4'"""
+        return f"{self.branch}-{self.class_name}-Sem{self.sem}"
+
+    def slot_string(self, lec_no):
+        """Legacy slot string, e.g. 'CSE-D1-Sem4-Time Slot 3'."""
+        return f"{self.label}-Time Slot {lec_no + 1}"
+
+
+def class_ref(sem, branch, class_name):
+    return ClassRef(make_class_id(sem, branch, class_name), branch, class_name, int(sem))
+
+
+def ref_from_doc(doc):
+    """ClassRef from a classwise_faculty / class_timetable document."""
+    return ClassRef(doc["_id"], doc["branch"], doc["class"], int(doc["sem"]))
+
+
+def is_free(value):
+    # "free" is still accepted until the compact-encoding migration has run
+    return value is FREE_SLOT or value == LEGACY_FREE
+
+
+def parse_legacy_slot(value):
+    """(ClassRef, lec_no) for a legacy slot string, or None."""
+    match = LEGACY_SLOT_RE.match(value) if isinstance(value, str) else None
+    if not match:
+        return None
+    ref = class_ref(match["sem"], match["branch"], match["class_name"])
+    return ref, int(match["slot"]) - 1
+
+
+# ===============================
+# 🔹 CLASS DIRECTORY
+# ===============================
+class ClassDirectory:
+    """
+    Per-process class_id -> ClassRef cache, loaded from classwise_faculty
+    with one query. Unknown ids trigger a reload (at most once a second),
+    and the whole map expires after OCCUPANCY_INDEX_TTL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._refs = {}
+        self._loaded_at = None
+
+    def _load(self):
+        refs = {
+            doc["_id"]: ref_from_doc(doc)
+            for doc in db.classwise_faculty.find(
+                {}, {"branch": 1, "class": 1, "sem": 1}
+            )
+        }
+        with self._lock:
+            self._refs = refs
+            self._loaded_at = time.monotonic()
+
+    def _stale(self, missing):
+        if self._loaded_at is None:
+            return True
+        age = time.monotonic() - self._loaded_at
+        return age > Config.OCCUPANCY_INDEX_TTL or (missing and age > 1)
+
+    def refs(self, class_ids):
+        """{class_id: ClassRef} for the known ids among class_ids."""
+        class_ids = [c for c in class_ids if c is not None]
+        with self._lock:
+            missing = any(c not in self._refs for c in class_ids)
+        if self._stale(missing):
+            self._load()
+        with self._lock:
+            return {c: self._refs[c] for c in class_ids if c in self._refs}
+
+    def get(self, class_id):
+        return self.refs([class_id]).get(class_id)
+
+    def forget(self, class_ids):
+        with self._lock:
+            for class_id in class_ids:
+                self._refs.pop(class_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._refs = {}
+            self._loaded_at = None
+
+
+class_directory = ClassDirectory()
+
+
+# ===============================
+# 🔹 API BOUNDARY
+# ===============================
+def decode_slot(value, lec_no, refs=None):
+    """Stored slot value -> legacy string; unknown class ids pass through."""
+    if is_free(value):
+        return LEGACY_FREE
+    ref = (refs or {}).get(value) or class_directory.get(value)
+    return ref.slot_string(lec_no) if ref else value
+
+
+def decode_timetable(timetable):
+    """Stored faculty timetable -> legacy {day: ["free" | slot string]}."""
+    timetable = timetable or {}
+    refs = class_directory.refs({
+        value
+        for slots in timetable.values() if isinstance(slots, list)
+        for value in slots
+    })
+    return {
+        day: [decode_slot(value, i, refs) for i, value in enumerate(slots)]
+        if isinstance(slots, list) else slots
+        for day, slots in timetable.items()
+    }
+
+
+def encode_legacy_slot(value):
+    """Legacy slot string (or 'free') from a client -> stored value."""
+    if value is None or value == LEGACY_FREE:
+        return FREE_SLOT
+    parsed = parse_legacy_slot(value)
+    if parsed is None:
+        raise ValueError(f"Unrecognised slot value: {value!r}")
+    return parsed[0].class_id
+
+
+def encode_legacy_timetable(timetable):
+    return {
+        day: [encode_legacy_slot(value) for value in slots]
+        for day, slots in timetable.items()
+    }
@@ -0,0 +1,284 @@
+import asyncio
+import time
+from collections import deque
+
+from app.config import Config
+from app.database.async_mongo import get_async_db, run_async
+from app.database.mongo import db
+from app.services.faculty_load import LOAD_FIELD, load_score
+from app.services.occupancy_index import DAY_INDEX, occupancy_index
+from app.services.slot_codec import is_free, ref_from_doc
+
+# ===============================
+# 🔹 SNAPSHOT
+# ===============================
+FREE = "free"
+BUSY = "busy"      # permanent lecture in this slot, may be moved
+FIXED = "fixed"    # already has a temp assignment for the date, never moved
+
+
+class SlotSnapshot:
+    """
+    In-memory view of a single (date, day, lec_no) slot around one class:
+    who is free, who teaches which class, each class's allowed faculty and
+    every faculty's load counters.
+    """
+
+    def __init__(self, selected_date, day, lec_no, classes, allowed, state, names, loads=None):
+        self.selected_date = selected_date
+        self.day = day
+        self.lec_no = lec_no
+        self.classes = classes  # class label -> ClassRef
+        self.allowed = allowed  # class label -> [faculty ids]
+        self.state = state      # faculty id -> (kind, class label or None)
+        self.names = names      # faculty id -> name
+        self.loads = loads or {}  # faculty id -> faculty_timetable.load
+
+    def name(self, fac_id):
+        return self.names.get(fac_id, fac_id)
+
+
+CLASS_PROJECTION = {"branch": 1, "class": 1, "sem": 1, "allowed_faculty": 1}
+
+
+def reachable_classes(target_id, day, lec_no, max_depth):
+    """
+    Classes a chain of up to max_depth steps can pass through, and the
+    slot values of their allowed faculty.
+
+    Starting from the target, each round reads the classes found so far
+    with one $in query and follows their allowed faculty, via the
+    occupancy index, to the class each of them teaches in this slot.
+    Only those classes and faculty are loaded, not the whole institute.
+
+    Returns (class docs, {faculty id: class id taught or None when free}).
+    """
+    class_docs = []
+    slot_values = {}
+    seen = {target_id}
+    frontier = [target_id]
+
+    for _ in range(max_depth):
+        if not frontier:
+            break
+
+        docs = list(db.classwise_faculty.find({"_id": {"$in": frontier}}, CLASS_PROJECTION))
+        class_docs.extend(docs)
+
+        new_faculty = [
+            fac_id
+            for doc in docs
+            for fac_id in doc.get("allowed_faculty", [])
+            if fac_id not in slot_values
+        ]
+        values = occupancy_index.slot_values(new_faculty, day, lec_no)
+        slot_values.update(values)
+
+        frontier = []
+        for class_id in values.values():
+            if class_id is not None and class_id not in seen:
+                seen.add(class_id)
+                frontier.append(class_id)
+
+    return class_docs, slot_values
+
+
+def slot_queries(selected_date, day, lec_no, fac_ids):
+    """(collection, filter, projection) for the temp and load queries."""
+    return [
+        (
+            "temp_faculty_timetable",
+            {"date": selected_date, "day": day, "lec_no": lec_no, "faculty_id": {"$in": fac_ids}},
+            {"faculty_id": 1},
+        ),
+        ("faculty_timetable", {"_id": {"$in": fac_ids}}, {LOAD_FIELD: 1}),
+    ]
+
+
+def build_slot_snapshot(selected_date, day, lec_no, class_docs, slot_values, temp_docs,
+                        load_docs=()):
+    classes = {}
+    labels = {}     # class_id -> label, for reading timetable slots
+    allowed = {}
+    for doc in class_docs:
+        ref = ref_from_doc(doc)
+        classes[ref.label] = ref
+        labels[ref.class_id] = ref.label
+        allowed[ref.label] = doc.get("allowed_faculty", [])
+
+    state = {}
+    names = {}
+    for fac_id, value in slot_values.items():
+        info = occupancy_index.faculty_info(fac_id)
+        names[fac_id] = info["name"] if info else fac_id
+
+        if is_free(value):
+            state[fac_id] = (FREE, None)
+        elif value in labels:
+            state[fac_id] = (BUSY, labels[value])
+
+    for rec in temp_docs:
+        fac_id = rec.get("faculty_id")
+        if fac_id in state:
+            state[fac_id] = (FIXED, None)
+
+    loads = {doc["_id"]: doc.get(LOAD_FIELD, {}) for doc in load_docs}
+
+    return SlotSnapshot(selected_date, day, lec_no, classes, allowed, state, names, loads)
+
+
+def load_slot_snapshot(selected_date, day, lec_no, target_id, max_depth=None):
+    """
+    Build a SlotSnapshot for chains of up to max_depth steps covering
+    target_id: one classwise $in query per depth level (faculty slots come
+    from the occupancy index), then the slot's temp assignments and the
+    load counters of the faculty involved. In async mode those last two
+    go through the async driver concurrently.
+    """
+    max_depth = Config.REARRANGE_MAX_DEPTH if max_depth is None else max_depth
+
+    if day not in DAY_INDEX:
+        class_docs = db.classwise_faculty.find({"_id": target_id}, CLASS_PROJECTION)
+        return build_slot_snapshot(selected_date, day, lec_no, class_docs, {}, [])
+
+    class_docs, slot_values = reachable_classes(target_id, day, lec_no, max_depth)
+    queries = slot_queries(selected_date, day, lec_no, list(slot_values))
+
+    if Config.ASYNC_MODE:
+        temp_docs, load_docs = run_async(fetch_slot_docs_async(queries))
+    else:
+        temp_docs, load_docs = (
+            list(db[name].find(query, projection))
+            for name, query, projection in queries
+        )
+
+    return build_slot_snapshot(
+        selected_date, day, lec_no, class_docs, slot_values, temp_docs, load_docs
+    )
+
+
+async def fetch_slot_docs_async(queries):
+    """Async-mode snapshot queries, run concurrently."""
+    async_db = get_async_db()
+
+    async def fetch(name, query, projection):
+        return await async_db[name].find(query, projection).to_list(None)
+
+    return await asyncio.gather(*(
+        fetch(name, query, projection) for name, query, projection in queries
+    ))
+
+
+# ===============================
+# 🔹 SEARCH
+# ===============================
+def chain_cost(snapshot, chain):
+    """
+    Ranking cost of a chain, lower first. Every step moves one more
+    lecture (REARRANGE_HOP_COST) onto a faculty whose current load
+    (faculty_load.load_score) is added too, so among chains of the same
+    length the one spreading covers onto lighter faculty wins.
+    """
+    return sum(
+        Config.REARRANGE_HOP_COST + load_score(snapshot.loads.get(step["faculty_id"]))
+        for step in chain
+    )
+
+
+def find_chains(snapshot, target_label, max_depth=None, time_budget_ms=None, limit=None):
+    """
+    Breadth-first search for substitution chains covering target_label.
+
+    A chain is a list of steps; step i moves a faculty from the class it
+    teaches into the class vacated by step i-1 (step 0 into the target),
+    and the last step is a free faculty. Only chains of length 2..max_depth
+    are returned (length 1 is a plain replacement), cheapest first
+    (chain_cost) among the ones found before the limit or time budget.
+
+    Returns (chains, timed_out).
+    """
+    max_depth = Config.REARRANGE_MAX_DEPTH if max_depth is None else max_depth
+    time_budget_ms = (
+        Config.REARRANGE_TIME_BUDGET_MS if time_budget_ms is None else time_budget_ms
+    )
+    limit = Config.REARRANGE_MAX_OPTIONS if limit is None else limit
+
+    deadline = time.monotonic() + time_budget_ms / 1000.0
+    chains = []
+
+    def by_cost(chain):
+        return chain_cost(snapshot, chain)
+
+    # (class needing cover, steps so far, faculty used, classes touched)
+    queue = deque([(target_label, (), frozenset(), frozenset([target_label]))])
+
+    while queue:
+        if time.monotonic() > deadline:
+            return sorted(chains, key=by_cost), True
+
+        needs_cover, steps, used, touched = queue.popleft()
+        depth = len(steps)
+
+        for fac_id in snapshot.allowed.get(needs_cover, []):
+            if fac_id in used or fac_id not in snapshot.state:
+                continue
+
+            kind, teaching = snapshot.state[fac_id]
+
+            if kind == FREE:
+                if depth >= 1:
+                    chains.append(list(steps) + [{
+                        "faculty_id": fac_id,
+                        "from_class": None,
+                        "to_class": needs_cover,
+                    }])
+                    if len(chains) >= limit:
+                        return sorted(chains, key=by_cost), False
+
+            elif kind == BUSY and depth + 1 < max_depth and teaching not in touched:
+                queue.append((
+                    teaching,
+                    steps + ({
+                        "faculty_id": fac_id,
+                        "from_class": teaching,
+                        "to_class": needs_cover,
+                    },),
+                    used | {fac_id},
+                    touched | {teaching},
+                ))
+
+    return sorted(chains, key=by_cost), False
+
+
+def validate_chain(snapshot, target_label, fac_ids):
+    """
+    Rebuild the steps for an explicit list of faculty ids against a
+    fresh snapshot. Returns the steps, or None if the chain is no longer
+    feasible.
+    """
+    if len(fac_ids) < 2 or len(set(fac_ids)) != len(fac_ids):
+        return None
+
+    steps = []
+    needs_cover = target_label
+    touched = {target_label}
+
+    for i, fac_id in enumerate(fac_ids):
+        if fac_id not in snapshot.allowed.get(needs_cover, []):
+            return None
+
+        kind, teaching = snapshot.state.get(fac_id, (None, None))
+        last = i == len(fac_ids) - 1
+
+        if last:
+            if kind != FREE:
+                return None
+            steps.append({"faculty_id": fac_id, "from_class": None, "to_class": needs_cover})
+        else:
+            if kind != BUSY or teaching in touched:
+                return None
+            steps.append({"faculty_id": fac_id, "from_class": teaching, "to_class": needs_cover})
+            touched.add(teaching)
+            needs_cover = teaching
+
+    return steps
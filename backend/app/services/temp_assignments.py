@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import BulkWriteError
+
+from app.config import Config
+from app.database.mongo import db
+from app.database.transactions import run_transaction
+from app.services.change_feed import CREATED, publish_changes
+from app.services.effective_timetable import effective_timetables
+from app.services.faculty_load import count_substitutions
+from app.services.occupancy_index import occupancy_index
+from app.services.versioning import bump, TEMP_SCOPE
+
+DUPLICATE_KEY = 11000
+
+
+class SlotTakenError(ValueError):
+    """A faculty already has a temp lecture in that slot on that date."""
+
+    def __init__(self, record):
+        self.record = record
+        super().__init__(
+            f'Faculty "{record["faculty_id"]}" is already assigned on '
+            f'{record["date"]}, lecture {record["lec_no"] + 1}'
+        )
+
+
+def expiry_for(selected_date):
+    """When a temp record for selected_date ('YYYY-MM-DD') may be expired."""
+    try:
+        day = datetime.strptime(selected_date, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        day = datetime.now(timezone.utc)
+    return day + timedelta(days=Config.TEMP_RETENTION_DAYS + 1)
+
+
+def build_temp_record(fac_id, selected_date, day, lec_no, class_id):
+    """temp_faculty_timetable document for class_id, including its TTL expiry."""
+    return {
+        "faculty_id": fac_id,
+        "date": selected_date,
+        "day": day,
+        "lec_no": lec_no,
+        "class_id": class_id,
+        "expires_at": expiry_for(selected_date),
+    }
+
+
+def insert_temp_records(records, event=CREATED):
+    """
+    Reserve the slots of a batch of temp assignments, all or nothing.
+
+    The unique (faculty_id, date, lec_no) index is the reservation: a
+    faculty already holding a temp lecture in a slot makes the insert fail
+    with a duplicate key, whoever wrote first, so no re-check round trip
+    or lock is needed. The batch and its load counters go in one
+    transaction; without transactions the records inserted before the
+    conflict are removed again. Raises SlotTakenError.
+
+    On success the caches are kept in step (occupancy index overlay,
+    effective timetables of the dates, temp version counter) and the
+    records are published to the change feed as `event`, which is also
+    stored on records that are not plain assignments.
+    """
+    if not records:
+        return
+
+    if event != CREATED:
+        # Kept on the record so change streams can tell it from an assignment
+        for rec in records:
+            rec["event"] = event
+
+    def write(session):
+        db.temp_faculty_timetable.insert_many(records, ordered=True, session=session)
+        count_substitutions(records, session=session)
+
+    try:
+        run_transaction(write)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if not errors or any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+
+        inserted = [rec["_id"] for rec in records[:e.details.get("nInserted", 0)]]
+        if inserted:
+            db.temp_faculty_timetable.delete_many({"_id": {"$in": inserted}})
+        raise SlotTakenError(records[errors[0]["index"]])
+
+    for rec in records:
+        occupancy_index.add_temp(rec["faculty_id"], rec["date"], rec["day"], rec["lec_no"])
+
+    for selected_date in {rec["date"] for rec in records}:
+        effective_timetables.invalidate_date(selected_date)
+
+    bump(TEMP_SCOPE)
+    publish_changes(event, records)
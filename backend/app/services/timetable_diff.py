@@ -0,0 +1,63 @@
+from app.services.slot_codec import FREE_SLOT
+
+# ===============================
+# 🔹 DIFF ENGINE
+# ===============================
+# Slot assignments are {faculty_id: {(day_key, slot_index): class_id}},
+# as produced by timetable_writer.class_slot_assignments().
+
+
+def diff_assignments(old, new):
+    """
+    Compare a class's stored assignments with the incoming ones.
+
+    Returns (additions, removals):
+      additions: {faculty_id: {(day, idx): value}} slots to write
+      removals:  {faculty_id: {(day, idx): value}} slots to free,
+                 with the value expected to be stored there
+    """
+    additions = {}
+    removals = {}
+
+    for faculty_id, slots in new.items():
+        old_slots = old.get(faculty_id, {})
+        for key, value in slots.items():
+            if old_slots.get(key) != value:
+                additions.setdefault(faculty_id, {})[key] = value
+
+    for faculty_id, slots in old.items():
+        new_slots = new.get(faculty_id, {})
+        for key, value in slots.items():
+            if key not in new_slots:
+                removals.setdefault(faculty_id, {})[key] = value
+
+    return additions, removals
+
+
+def slot_update(stored_timetable, changes, total_slots):
+    """
+    Minimal $set document for one faculty.
+
+    changes: {(day, idx): new value}. Days whose stored array is missing or
+    shorter than total_slots are written whole (a positional $set past the
+    end would pad the array with nulls); everything else is written as
+    individual 'timetable.<day>.<idx>' paths.
+    """
+    update = {}
+    stored_timetable = stored_timetable or {}
+
+    for (day, idx), value in sorted(changes.items()):
+        stored_day = stored_timetable.get(day)
+
+        if isinstance(stored_day, list) and len(stored_day) >= total_slots:
+            update[f"timetable.{day}.{idx}"] = value
+            continue
+
+        if f"timetable.{day}" not in update:
+            day_list = stored_day if isinstance(stored_day, list) else []
+            update[f"timetable.{day}"] = (
+                day_list + [FREE_SLOT] * total_slots
+            )[:total_slots]
+        update[f"timetable.{day}"][idx] = value
+
+    return update
@@ -0,0 +1,424 @@
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+from itertools import groupby
+
+from app.config import Config
+from app.database.mongo import db
+from app.services.class_schedule import (
+    DAYS,
+    DAYS_MAP,
+    TIME_SLOT_KEYS,
+    TOTAL_SLOTS,
+    rebuild_class_schedule
+)
+from app.services.slot_codec import is_free, ref_from_doc
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+DAY_KEYS = [DAYS_MAP[day] for day in DAYS]
+DAY_KEY_TO_NAME = {key: day for day, key in DAYS_MAP.items()}
+
+CLASS_FIELDS = [
+    "date", "day", "time_slot", "lec_no", "class_id", "branch", "class", "sem",
+    "faculty", "regular_faculty", "substitute",
+]
+FACULTY_FIELDS = [
+    "date", "day", "time_slot", "lec_no", "faculty", "name", "class_id",
+    "branch", "class", "sem", "substitute",
+]
+
+FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "jsonl": ("application/x-ndjson", "jsonl"),
+    "ical": ("text/calendar", "ics"),
+}
+
+
+class ExportError(ValueError):
+    """Bad export parameters (format, dates, range)."""
+
+
+# ===============================
+# 🔹 PARAMETERS
+# ===============================
+def export_dates(date_from, date_to):
+    """
+    [(iso date, day key)] for an inclusive range, Sundays skipped, or []
+    when no range was asked for (the plain weekly timetable).
+    """
+    if not date_from and not date_to:
+        return []
+
+    try:
+        start = date.fromisoformat(date_from or date_to)
+        end = date.fromisoformat(date_to or date_from)
+    except ValueError:
+        raise ExportError("from / to must be ISO dates (YYYY-MM-DD)")
+
+    if end < start:
+        raise ExportError("to is before from")
+    if (end - start).days + 1 > Config.EXPORT_MAX_DAYS:
+        raise ExportError(f"Date range is limited to {Config.EXPORT_MAX_DAYS} days")
+
+    dates = []
+    day = start
+    while day <= end:
+        if day.weekday() < len(DAY_KEYS):
+            dates.append((day.isoformat(), DAY_KEYS[day.weekday()]))
+        day += timedelta(days=1)
+    return dates
+
+
+def class_filter(branch, sem):
+    query = {}
+    if branch:
+        query["branch"] = branch
+    if sem:
+        query["sem"] = int(sem)
+    return query
+
+
+# ===============================
+# 🔹 CURSOR MERGE
+# ===============================
+def merge_sorted(docs, docs_key, extras, extras_key):
+    """
+    Merge-join two cursors sorted ascending on their keys, yielding
+    (key, doc or None, [extra docs]). Only one group of each side is held
+    in memory at a time.
+    """
+    grouped = groupby(extras, key=lambda doc: doc[extras_key])
+    pending = next(grouped, None)
+
+    for doc in docs:
+        key = doc[docs_key]
+        while pending is not None and pending[0] < key:
+            yield pending[0], None, list(pending[1])
+            pending = next(grouped, None)
+
+        if pending is not None and pending[0] == key:
+            yield key, doc, list(pending[1])
+            pending = next(grouped, None)
+        else:
+            yield key, doc, []
+
+    while pending is not None:
+        yield pending[0], None, list(pending[1])
+        pending = next(grouped, None)
+
+
+def temp_cursor(dates, sort_field, query=None):
+    """Temp substitutions inside the export range, sorted for merging."""
+    if not dates:
+        return iter(())
+
+    query = dict(query or {})
+    query["date"] = {"$gte": dates[0][0], "$lte": dates[-1][0]}
+    return (
+        db.temp_faculty_timetable.find(
+            query,
+            {"faculty_id": 1, "class_id": 1, "date": 1, "lec_no": 1}
+        )
+        .sort([(sort_field, 1), ("date", 1), ("lec_no", 1)])
+        .batch_size(Config.EXPORT_BATCH_SIZE)
+    )
+
+
+# ===============================
+# 🔹 CLASS ENTRIES
+# ===============================
+def class_entry(ref, day_key, lec_no, faculty, selected_date=None,
+                regular_faculty=None, substitute=False):
+    return {
+        "date": selected_date,
+        "day": DAY_KEY_TO_NAME[day_key],
+        "time_slot": TIME_SLOT_KEYS[lec_no],
+        "lec_no": lec_no,
+        "class_id": ref.class_id,
+        "branch": ref.branch,
+        "class": ref.class_name,
+        "sem": ref.sem,
+        "faculty": faculty,
+        "regular_faculty": regular_faculty,
+        "substitute": substitute,
+    }
+
+
+def class_schedules(query):
+    """
+    class_timetable-shaped documents for every class matching query, in
+    _id order.
+
+    classwise_faculty drives the walk and is merge-joined with
+    class_timetable, so a class saved before schedules were materialized
+    is rebuilt from faculty timetables instead of being left out.
+    """
+    classes = (
+        db.classwise_faculty.find(query, {"sem": 1, "branch": 1, "class": 1, "allowed_faculty": 1})
+        .sort("_id", 1)
+        .batch_size(Config.EXPORT_BATCH_SIZE)
+    )
+    stored = (
+        db.class_timetable.find(query, {"sem": 1, "branch": 1, "class": 1, "schedule": 1})
+        .sort("_id", 1)
+        .batch_size(Config.EXPORT_BATCH_SIZE)
+    )
+
+    for _, class_doc, schedule_docs in merge_sorted(classes, "_id", stored, "_id"):
+        if schedule_docs:
+            yield schedule_docs[0]
+        elif class_doc is not None:
+            yield dict(class_doc, schedule=rebuild_class_schedule(class_doc))
+
+
+def class_entries(branch=None, sem=None, dates=()):
+    """
+    One entry per taught class slot, classes in _id order. Without dates
+    this is the weekly timetable; with dates every day in the range is
+    listed with temp substitutions replacing the regular faculty.
+    """
+    query = class_filter(branch, sem)
+
+    temp_query = {}
+    if query:
+        temp_query["class_id"] = {"$in": db.classwise_faculty.distinct("_id", query)}
+
+    for _, doc, temps in merge_sorted(
+        class_schedules(query), "_id", temp_cursor(dates, "class_id", temp_query), "class_id"
+    ):
+        if doc is None:
+            # Substitutions for a class that no longer exists
+            continue
+
+        ref = ref_from_doc(doc)
+        schedule = doc.get("schedule", {})
+
+        def regular(day_key, lec_no):
+            faculty = schedule.get(DAY_KEY_TO_NAME[day_key], {}).get(TIME_SLOT_KEYS[lec_no])
+            return None if not faculty or is_free(faculty) else faculty
+
+        if not dates:
+            for day_key in DAY_KEYS:
+                for lec_no in range(TOTAL_SLOTS):
+                    faculty = regular(day_key, lec_no)
+                    if faculty:
+                        yield class_entry(ref, day_key, lec_no, faculty)
+            continue
+
+        covers = {(rec["date"], rec["lec_no"]): rec["faculty_id"] for rec in temps}
+        for selected_date, day_key in dates:
+            for lec_no in range(TOTAL_SLOTS):
+                faculty = regular(day_key, lec_no)
+                cover = covers.get((selected_date, lec_no))
+                if cover:
+                    yield class_entry(
+                        ref, day_key, lec_no, cover, selected_date,
+                        regular_faculty=faculty, substitute=True
+                    )
+                elif faculty:
+                    yield class_entry(
+                        ref, day_key, lec_no, faculty, selected_date,
+                        regular_faculty=faculty
+                    )
+
+
+# ===============================
+# 🔹 FACULTY ENTRIES
+# ===============================
+def faculty_entry(fac_id, name, ref, day_key, lec_no, selected_date=None, substitute=False):
+    return {
+        "date": selected_date,
+        "day": DAY_KEY_TO_NAME[day_key],
+        "time_slot": TIME_SLOT_KEYS[lec_no],
+        "lec_no": lec_no,
+        "faculty": fac_id,
+        "name": name,
+        "class_id": ref.class_id if ref else None,
+        "branch": ref.branch if ref else None,
+        "class": ref.class_name if ref else None,
+        "sem": ref.sem if ref else None,
+        "substitute": substitute,
+    }
+
+
+def faculty_entries(branch=None, sem=None, dates=()):
+    """
+    One entry per lecture a faculty teaches, faculty in _id order. With a
+    branch / sem only lectures of those classes are listed; with dates the
+    faculty's substitutions in the range are added to their regular week.
+    """
+    query = class_filter(branch, sem)
+    refs = {
+        doc["_id"]: ref_from_doc(doc)
+        for doc in db.classwise_faculty.find(query, {"branch": 1, "class": 1, "sem": 1})
+    }
+
+    faculty_query = {}
+    temp_query = {}
+    if query:
+        class_ids = list(refs)
+        faculty_query["$or"] = [
+            {f"timetable.{day_key}": {"$in": class_ids}} for day_key in DAY_KEYS
+        ]
+        temp_query["class_id"] = {"$in": class_ids}
+
+    faculty = (
+        db.faculty_timetable.find(faculty_query, {"name": 1, "timetable": 1})
+        .sort("_id", 1)
+        .batch_size(Config.EXPORT_BATCH_SIZE)
+    )
+
+    for fac_id, doc, temps in merge_sorted(faculty, "_id", temp_cursor(dates, "faculty_id", temp_query), "faculty_id"):
+        name = doc.get("name", fac_id) if doc else fac_id
+        timetable = doc.get("timetable", {}) if doc else {}
+
+        def lectures(day_key):
+            slots = timetable.get(day_key, [])
+            slots = slots if isinstance(slots, list) else []
+            for lec_no, value in enumerate(slots[:TOTAL_SLOTS]):
+                if is_free(value) or (query and value not in refs):
+                    continue
+                yield lec_no, value
+
+        if not dates:
+            for day_key in DAY_KEYS:
+                for lec_no, class_id in lectures(day_key):
+                    yield faculty_entry(fac_id, name, refs.get(class_id), day_key, lec_no)
+            continue
+
+        covers = {(rec["date"], rec["lec_no"]): rec.get("class_id") for rec in temps}
+        for selected_date, day_key in dates:
+            regular = dict(lectures(day_key))
+            for lec_no in range(TOTAL_SLOTS):
+                if (selected_date, lec_no) in covers:
+                    class_id = covers[(selected_date, lec_no)]
+                    yield faculty_entry(
+                        fac_id, name, refs.get(class_id), day_key, lec_no,
+                        selected_date, substitute=True
+                    )
+                elif lec_no in regular:
+                    yield faculty_entry(
+                        fac_id, name, refs.get(regular[lec_no]), day_key, lec_no, selected_date
+                    )
+
+
+# ===============================
+# 🔹 FORMATS
+# ===============================
+def csv_lines(entries, fields):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+
+    writer.writeheader()
+    yield buffer.getvalue()
+
+    for entry in entries:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(entry)
+        yield buffer.getvalue()
+
+
+def jsonl_lines(entries):
+    for entry in entries:
+        yield json.dumps(entry, separators=(",", ":")) + "\n"
+
+
+def ical_text(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def ical_fold(line):
+    """RFC 5545 line folding at 75 octets."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts = []
+    while encoded:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(encoded))
+        # Never split a multi-byte character
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def slot_start(day, lec_no):
+    start = datetime.combine(day, datetime.min.time()) + timedelta(
+        hours=Config.EXPORT_DAY_START_HOUR,
+        minutes=lec_no * Config.EXPORT_SLOT_MINUTES
+    )
+    return start, start + timedelta(minutes=Config.EXPORT_SLOT_MINUTES)
+
+
+def ical_lines(entries, summary, anchor=None):
+    """
+    VEVENTs in floating local time. Dated entries become single events;
+    weekly entries recur every week from the week of anchor (default today).
+    """
+    anchor = anchor or date.today()
+    monday = anchor - timedelta(days=anchor.weekday())
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//TimeTableManagement//Export//EN\r\nCALSCALE:GREGORIAN\r\n"
+
+    for entry in entries:
+        if entry["date"]:
+            day = date.fromisoformat(entry["date"])
+        else:
+            day = monday + timedelta(days=DAYS.index(entry["day"]))
+
+        start, end = slot_start(day, entry["lec_no"])
+        uid = f"{entry['class_id']}-{entry['faculty']}-{entry['date'] or entry['day']}-{entry['lec_no']}"
+
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{uid}@timetable",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start.strftime('%Y%m%dT%H%M%S')}",
+            f"DTEND:{end.strftime('%Y%m%dT%H%M%S')}",
+            f"SUMMARY:{ical_text(summary(entry))}",
+        ]
+        if not entry["date"]:
+            lines.append("RRULE:FREQ=WEEKLY")
+        if entry["substitute"]:
+            lines.append("DESCRIPTION:Substitution")
+        lines.append("END:VEVENT")
+
+        yield "".join(ical_fold(line) for line in lines)
+
+    yield "END:VCALENDAR\r\n"
+
+
+def class_summary(entry):
+    label = f"{entry['branch']}-{entry['class']}-Sem{entry['sem']}"
+    return f"{label}: {entry['faculty']}"
+
+
+def faculty_summary(entry):
+    if entry["class_id"] is None:
+        return entry["name"]
+    return f"{entry['name']}: {entry['branch']}-{entry['class']}-Sem{entry['sem']}"
+
+
+def render(entries, file_format, kind, dates=()):
+    """Text chunks of an export; kind is "classes" or "faculties"."""
+    if file_format == "csv":
+        return csv_lines(entries, CLASS_FIELDS if kind == "classes" else FACULTY_FIELDS)
+    if file_format == "jsonl":
+        return jsonl_lines(entries)
+    summary = class_summary if kind == "classes" else faculty_summary
+    anchor = date.fromisoformat(dates[0][0]) if dates else None
+    return ical_lines(entries, summary, anchor)
@@ -0,0 +1,363 @@
+import random
+import time
+
+from app.database.mongo import db
+from app.services.class_schedule import (
+    DAYS,
+    DAYS_MAP,
+    TIME_SLOT_KEYS,
+    TOTAL_SLOTS,
+    empty_schedule,
+    make_class_id
+)
+from app.services.slot_codec import is_free
+
+# ===============================
+# 🔹 BITSETS
+# ===============================
+# A week is a 48-bit int: bit = day_index * TOTAL_SLOTS + slot_index,
+# the same layout as the occupancy index.
+
+
+def bit_for(day_idx, slot_idx):
+    return 1 << (day_idx * TOTAL_SLOTS + slot_idx)
+
+
+def day_mask(day_idx):
+    return ((1 << TOTAL_SLOTS) - 1) << (day_idx * TOTAL_SLOTS)
+
+
+def iter_bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low
+        mask ^= low
+
+
+def bit_position(bit):
+    pos = bit.bit_length() - 1
+    return pos // TOTAL_SLOTS, pos % TOTAL_SLOTS
+
+
+class GenerationError(ValueError):
+    """Invalid generator input."""
+
+
+# ===============================
+# 🔹 INPUT
+# ===============================
+def parse_requirements(classes):
+    """
+    Validate generator input and expand it into lecture units.
+
+    classes: [{"class", "allowed_faculty"?, "requirements": [
+        {"subject", "faculty": id or [ids] (default: allowed_faculty), "lectures": n}
+    ]}]
+
+    Returns [(class_name, subject, [candidate faculty], lectures)].
+    """
+    if not isinstance(classes, list) or not classes:
+        raise GenerationError("classes must be a non-empty list")
+
+    requirements = []
+    seen = set()
+
+    for entry in classes:
+        class_name = entry.get("class")
+        if not class_name:
+            raise GenerationError("Every class needs a 'class' name")
+        if class_name in seen:
+            raise GenerationError(f"Class {class_name} listed twice")
+        seen.add(class_name)
+
+        allowed = entry.get("allowed_faculty")
+
+        for req in entry.get("requirements", []):
+            subject = req.get("subject")
+            faculty = req.get("faculty")
+            lectures = req.get("lectures")
+
+            # No faculty given: any of the class's allowed faculty may teach it
+            if not faculty and allowed:
+                faculty = list(allowed)
+
+            candidates = faculty if isinstance(faculty, list) else [faculty]
+            candidates = [f for f in candidates if f]
+
+            if not subject or not candidates:
+                raise GenerationError(f"{class_name}: requirement needs subject and faculty")
+            if not isinstance(lectures, int) or lectures < 1:
+                raise GenerationError(f"{class_name}/{subject}: lectures must be a positive integer")
+            if allowed is not None:
+                outside = [f for f in candidates if f not in allowed]
+                if outside:
+                    raise GenerationError(
+                        f"{class_name}/{subject}: {', '.join(outside)} not in allowed_faculty"
+                    )
+
+            requirements.append((class_name, subject, candidates, lectures))
+
+    return requirements
+
+
+def load_existing_busy(faculty_ids, own_class_ids):
+    """
+    Faculty occupancy from stored timetables, as bitsets, with one $in query.
+    Lectures of the classes being generated are ignored (they get replaced).
+    """
+    busy = {fac_id: 0 for fac_id in faculty_ids}
+
+    for doc in db.faculty_timetable.find(
+        {"_id": {"$in": list(faculty_ids)}},
+        {"timetable": 1}
+    ):
+        mask = 0
+        timetable = doc.get("timetable", {})
+        for day_idx, day_name in enumerate(DAYS):
+            slots = timetable.get(DAYS_MAP[day_name], [])
+            if not isinstance(slots, list):
+                continue
+            for slot_idx, value in enumerate(slots[:TOTAL_SLOTS]):
+                if is_free(value) or value in own_class_ids:
+                    continue
+                mask |= bit_for(day_idx, slot_idx)
+        busy[doc["_id"]] = mask
+
+    return busy
+
+
+# ===============================
+# 🔹 SOLVER
+# ===============================
+class _Solver:
+    """
+    Greedy constraint placement over bitsets with one-level repair moves.
+
+    Units (one lecture of one subject for one class) are placed most
+    constrained first into the slot that keeps the subject spread across
+    days. When a unit has no feasible slot, the solver tries to move one
+    already-placed lecture (of the same faculty in another class, or of
+    the same class with another faculty) out of the way.
+    """
+
+    def __init__(self, units, faculty_busy, open_mask, max_per_day):
+        self.units = units
+        self.open_mask = open_mask
+        self.max_per_day = max_per_day
+
+        self.faculty_busy = dict(faculty_busy)
+        self.class_busy = {}
+        # class -> {bit: (subject, faculty)}
+        self.placed = {}
+        # (faculty, bit) -> class, for generated lectures only
+        self.owners = {}
+        # (class, subject) -> [count per day]
+        self.day_counts = {}
+
+    def _day_cap_mask(self, class_name, subject):
+        counts = self.day_counts.get((class_name, subject))
+        if not counts:
+            return self.open_mask
+        mask = self.open_mask
+        for day_idx, count in enumerate(counts):
+            if count >= self.max_per_day:
+                mask &= ~day_mask(day_idx)
+        return mask
+
+    def _feasible(self, class_name, subject, faculty):
+        return (
+            self._day_cap_mask(class_name, subject)
+            & ~self.class_busy.get(class_name, 0)
+            & ~self.faculty_busy.get(faculty, 0)
+        )
+
+    def _best_bit(self, candidates, class_name, subject):
+        counts = self.day_counts.get((class_name, subject), [0] * len(DAYS))
+        class_busy = self.class_busy.get(class_name, 0)
+
+        best = None
+        best_score = None
+        for bit in iter_bits(candidates):
+            day_idx, slot_idx = bit_position(bit)
+            day_load = bin(class_busy & day_mask(day_idx)).count("1")
+            score = (counts[day_idx], day_load, slot_idx)
+            if best_score is None or score < best_score:
+                best, best_score = bit, score
+        return best
+
+    def _set(self, bit, class_name, subject, faculty):
+        self.class_busy[class_name] = self.class_busy.get(class_name, 0) | bit
+        self.faculty_busy[faculty] = self.faculty_busy.get(faculty, 0) | bit
+        self.placed.setdefault(class_name, {})[bit] = (subject, faculty)
+        self.owners[(faculty, bit)] = class_name
+        counts = self.day_counts.setdefault((class_name, subject), [0] * len(DAYS))
+        counts[bit_position(bit)[0]] += 1
+
+    def _unset(self, bit, class_name):
+        subject, faculty = self.placed[class_name].pop(bit)
+        self.class_busy[class_name] &= ~bit
+        self.faculty_busy[faculty] &= ~bit
+        self.owners.pop((faculty, bit), None)
+        self.day_counts[(class_name, subject)][bit_position(bit)[0]] -= 1
+        return subject, faculty
+
+    def _move(self, class_name, bit):
+        """Move the lecture at (class, bit) to any other feasible slot."""
+        subject, faculty = self._unset(bit, class_name)
+        candidates = self._feasible(class_name, subject, faculty) & ~bit
+        if candidates:
+            self._set(self._best_bit(candidates, class_name, subject), class_name, subject, faculty)
+            return True
+        self._set(bit, class_name, subject, faculty)
+        return False
+
+    def _repair(self, class_name, subject, faculty):
+        base = self._day_cap_mask(class_name, subject)
+
+        # Faculty busy with one of our generated lectures elsewhere
+        blocked = base & ~self.class_busy.get(class_name, 0) & self.faculty_busy.get(faculty, 0)
+        for bit in iter_bits(blocked):
+            other = self.owners.get((faculty, bit))
+            if other is not None and self._move(other, bit):
+                self._set(bit, class_name, subject, faculty)
+                return True
+
+        # Class slot taken by another lecture the faculty could swap with
+        blocked = base & self.class_busy.get(class_name, 0) & ~self.faculty_busy.get(faculty, 0)
+        for bit in iter_bits(blocked):
+            if self._move(class_name, bit):
+                self._set(bit, class_name, subject, faculty)
+                return True
+
+        return False
+
+    def solve(self):
+        unplaced = []
+        for class_name, subject, faculty in self.units:
+            candidates = self._feasible(class_name, subject, faculty)
+            if candidates:
+                self._set(self._best_bit(candidates, class_name, subject), class_name, subject, faculty)
+            elif not self._repair(class_name, subject, faculty):
+                unplaced.append((class_name, subject, faculty))
+        return unplaced
+
+
+def pick_faculty(requirements, faculty_busy, open_mask):
+    """One faculty per requirement: the candidate with most spare capacity."""
+    demand = {}
+    chosen = []
+    for class_name, subject, candidates, lectures in requirements:
+        best = max(
+            candidates,
+            key=lambda f: (
+                bin(open_mask & ~faculty_busy.get(f, 0)).count("1") - demand.get(f, 0),
+                -candidates.index(f),
+            )
+        )
+        demand[best] = demand.get(best, 0) + lectures
+        chosen.append((class_name, subject, best, lectures))
+    return chosen, demand
+
+
+def generate_timetables(sem, branch, classes, days=None, slots_per_day=TOTAL_SLOTS,
+                        max_per_day=2, time_limit_ms=5000, seed=0):
+    """
+    Build conflict-free weekly timetables for every class of a branch/semester.
+
+    Faculty occupancy from other classes is loaded once; the solver then runs
+    entirely on in-memory bitsets. If the first, deterministic ordering leaves
+    lectures unplaced, shuffled orderings are retried until time_limit_ms and
+    the best result is kept.
+
+    Returns {"schedules": {class: schedule}, "subjects": {class: grid},
+             "unplaced": [...], "attempts": n}.
+    """
+    requirements = parse_requirements(classes)
+
+    days = days or DAYS
+    unknown = [d for d in days if d not in DAYS]
+    if unknown:
+        raise GenerationError(f"Unknown days: {', '.join(unknown)}")
+    if not isinstance(slots_per_day, int) or not 1 <= slots_per_day <= TOTAL_SLOTS:
+        raise GenerationError(f"slots_per_day must be between 1 and {TOTAL_SLOTS}")
+
+    open_mask = 0
+    for day_name in days:
+        day_idx = DAYS.index(day_name)
+        for slot_idx in range(slots_per_day):
+            open_mask |= bit_for(day_idx, slot_idx)
+
+    capacity = bin(open_mask).count("1")
+    per_class = {}
+    for class_name, _, _, lectures in requirements:
+        per_class[class_name] = per_class.get(class_name, 0) + lectures
+    over = [c for c, n in per_class.items() if n > capacity]
+    if over:
+        raise GenerationError(
+            f"More lectures than slots ({capacity}) for: {', '.join(over)}"
+        )
+
+    own_class_ids = {make_class_id(sem, branch, entry["class"]) for entry in classes}
+    all_faculty = {f for _, _, candidates, _ in requirements for f in candidates}
+    existing_busy = load_existing_busy(all_faculty, own_class_ids)
+
+    chosen, demand = pick_faculty(requirements, existing_busy, open_mask)
+
+    units = []
+    for class_name, subject, faculty, lectures in chosen:
+        units.extend([(class_name, subject, faculty)] * lectures)
+
+    # Busiest faculty and fullest classes first
+    units.sort(key=lambda u: (-demand[u[2]], -per_class[u[0]], u[0], u[1]))
+
+    # Lectures that cannot fit whatever the ordering: stop retrying once reached
+    lower_bound = sum(
+        max(0, count - bin(open_mask & ~existing_busy.get(fac_id, 0)).count("1"))
+        for fac_id, count in demand.items()
+    )
+
+    deadline = time.monotonic() + time_limit_ms / 1000.0
+    rng = random.Random(seed)
+    best_solver = None
+    best_unplaced = None
+    attempts = 0
+
+    while True:
+        attempts += 1
+        solver = _Solver(units, existing_busy, open_mask, max_per_day)
+        unplaced = solver.solve()
+
+        if best_unplaced is None or len(unplaced) < len(best_unplaced):
+            best_solver, best_unplaced = solver, unplaced
+
+        if len(best_unplaced) <= lower_bound or time.monotonic() > deadline:
+            break
+
+        # Retry with the lectures that failed first, shuffled within equal demand
+        failed = set(unplaced)
+        units = sorted(
+            units,
+            key=lambda u: (u not in failed, -demand[u[2]], rng.random())
+        )
+
+    schedules = {}
+    subjects = {}
+    for entry in classes:
+        class_name = entry["class"]
+        schedule = empty_schedule()
+        grid = empty_schedule()
+        for bit, (subject, faculty) in best_solver.placed.get(class_name, {}).items():
+            day_idx, slot_idx = bit_position(bit)
+            schedule[DAYS[day_idx]][TIME_SLOT_KEYS[slot_idx]] = faculty
+            grid[DAYS[day_idx]][TIME_SLOT_KEYS[slot_idx]] = subject
+        schedules[class_name] = schedule
+        subjects[class_name] = grid
+
+    return {
+        "schedules": schedules,
+        "subjects": subjects,
+        "unplaced": [
+            {"class": c, "subject": s, "faculty": f} for c, s, f in best_unplaced
+        ],
+        "attempts": attempts,
+    }
@@ -0,0 +1,290 @@
+import csv
+import io
+
+import click
+
+from app.config import Config
+from app.services.class_schedule import DAYS, DAYS_MAP, TIME_SLOT_KEYS, TOTAL_SLOTS
+from app.services.slot_codec import class_ref
+from app.services.timetable_writer import save_class_timetables
+
+# ===============================
+# 🔹 FILE FORMAT
+# ===============================
+# One row per taught lecture, header required, column order free:
+#
+#   sem,branch,class,day,time_slot,faculty
+#   4,CSE,D1,Monday,Time Slot 1,fac1
+#   4,CSE,D1,mon,2,fac7
+#
+# day is "Monday" or "mon"; time_slot is "Time Slot 3" or 3. An empty or
+# "free" faculty leaves the slot free. Every class that appears in the file
+# gets its whole schedule replaced: slots without a row become free.
+# XLSX files use the same columns on their first sheet (needs openpyxl).
+
+REQUIRED_COLUMNS = ["sem", "branch", "class", "day", "time_slot", "faculty"]
+
+DAY_NAMES = {**{day.lower(): day for day in DAYS}, **{key: day for day, key in DAYS_MAP.items()}}
+
+
+class TimetableImportError(ValueError):
+    """The file itself cannot be read (format, header, size)."""
+
+
+# ===============================
+# 🔹 ROW READERS
+# ===============================
+def iter_csv_rows(stream):
+    """(row number, {column: value}) for a binary CSV stream, read lazily."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        yield from rows_with_header(header, reader, first_row=2)
+    except (csv.Error, UnicodeDecodeError) as e:
+        raise TimetableImportError(f"Could not read CSV: {e}")
+    finally:
+        # Leave the caller's stream open
+        text.detach()
+
+
+def iter_xlsx_rows(stream):
+    """Same as iter_csv_rows for the first sheet of an XLSX workbook."""
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise TimetableImportError("XLSX import needs the openpyxl package")
+
+    try:
+        workbook = load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise TimetableImportError(f"Could not open workbook: {e}")
+
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        yield from rows_with_header(header, rows, first_row=2)
+    finally:
+        workbook.close()
+
+
+def rows_with_header(header, rows, first_row):
+    if not header:
+        raise TimetableImportError("File is empty")
+
+    columns = [str(name or "").strip().lower() for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise TimetableImportError(f"Missing columns: {', '.join(missing)}")
+
+    for row_no, values in enumerate(rows, start=first_row):
+        if not any(value not in (None, "") for value in values):
+            continue
+        yield row_no, {
+            name: "" if value is None else str(value).strip()
+            for name, value in zip(columns, values)
+        }
+
+
+def iter_rows(stream, file_format):
+    if file_format == "csv":
+        return iter_csv_rows(stream)
+    if file_format == "xlsx":
+        return iter_xlsx_rows(stream)
+    raise TimetableImportError("Unsupported format, use csv or xlsx")
+
+
+def format_from_filename(filename):
+    extension = (filename or "").rsplit(".", 1)[-1].lower()
+    return extension if extension in ("csv", "xlsx") else None
+
+
+# ===============================
+# 🔹 VALIDATION
+# ===============================
+def parse_slot(raw):
+    """'Time Slot 3' / '3' -> 2, or None."""
+    value = raw[len("time slot"):] if raw.lower().startswith("time slot") else raw
+    try:
+        number = int(float(value))
+    except ValueError:
+        return None
+    return number - 1 if 1 <= number <= TOTAL_SLOTS else None
+
+
+class ImportModel:
+    """
+    The whole file as class schedules plus one in-memory occupancy map,
+    (faculty, day key, slot) -> (ClassRef, row), filled while rows stream
+    in. A faculty booked twice in the file is reported on the second row.
+    """
+
+    def __init__(self, allowed_branches):
+        self.allowed_branches = allowed_branches
+        self.classes = {}       # class_id -> {"sem", "branch", "class", "schedule"}
+        self.class_slots = {}   # (class_id, day name, slot) -> row
+        self.occupancy = {}     # (faculty, day key, slot) -> (ClassRef, row)
+        self.errors = []
+        self.conflicts = []
+        self.rows = 0
+
+    def error(self, row_no, message):
+        self.errors.append({"row": row_no, "error": message})
+
+    def add(self, row_no, row):
+        self.rows += 1
+        if self.rows > Config.IMPORT_MAX_ROWS:
+            raise TimetableImportError(f"More than {Config.IMPORT_MAX_ROWS} rows")
+
+        branch = row.get("branch", "")
+        class_name = row.get("class", "")
+        faculty = row.get("faculty", "")
+        day_name = DAY_NAMES.get(row.get("day", "").lower())
+        slot = parse_slot(row.get("time_slot", ""))
+
+        try:
+            sem = int(float(row.get("sem", "")))
+        except ValueError:
+            sem = None
+
+        if sem is None or sem < 1 or sem > 8:
+            return self.error(row_no, "Invalid semester")
+        if branch not in self.allowed_branches:
+            return self.error(row_no, "Invalid branch")
+        if not class_name:
+            return self.error(row_no, "Missing class")
+        if day_name is None:
+            return self.error(row_no, f"Invalid day: {row.get('day')!r}")
+        if slot is None:
+            return self.error(row_no, f"Invalid time slot: {row.get('time_slot')!r}")
+
+        ref = class_ref(sem, branch, class_name)
+        class_id = ref.class_id
+        entry = self.classes.setdefault(class_id, {
+            "sem": sem,
+            "branch": branch,
+            "class": class_name,
+            "schedule": {day: {} for day in DAYS},
+        })
+
+        slot_key = (class_id, day_name, slot)
+        if slot_key in self.class_slots:
+            return self.error(
+                row_no,
+                f"{day_name} {TIME_SLOT_KEYS[slot]} already given on row {self.class_slots[slot_key]}"
+            )
+        self.class_slots[slot_key] = row_no
+
+        if not faculty or faculty.lower() == "free":
+            return
+
+        busy_key = (faculty, DAYS_MAP[day_name], slot)
+        if busy_key in self.occupancy:
+            other_ref, other_row = self.occupancy[busy_key]
+            self.conflicts.append({
+                "row": row_no,
+                "other_row": other_row,
+                "faculty": faculty,
+                "day": DAYS_MAP[day_name],
+                "time_slot": TIME_SLOT_KEYS[slot],
+                "existing_lecture": other_ref.slot_string(slot),
+                "new_lecture": ref.slot_string(slot),
+            })
+            return
+
+        self.occupancy[busy_key] = (ref, row_no)
+        entry["schedule"][day_name][TIME_SLOT_KEYS[slot]] = faculty
+
+    def row_for(self, conflict):
+        """Row of the file that caused a conflict reported by the writer."""
+        slot = TIME_SLOT_KEYS.index(conflict["time_slot"])
+        _, row_no = self.occupancy.get(
+            (conflict["faculty"], conflict["day"], slot), (None, None)
+        )
+        return row_no
+
+
+# ===============================
+# 🔹 IMPORT
+# ===============================
+def import_timetables(rows, allowed_branches, dry_run=False):
+    """
+    Validate every row, then store all classes with save_class_timetables
+    (one $in read of the affected faculty, one bulk_write per collection,
+    one transaction). Nothing is written if any row fails.
+
+    Returns {"rows", "classes", "class_ids", "faculty_updated",
+             "errors", "conflicts", "committed"}.
+    """
+    model = ImportModel(allowed_branches)
+    for row_no, row in rows:
+        model.add(row_no, row)
+
+    result = {
+        "rows": model.rows,
+        "classes": len(model.classes),
+        "class_ids": list(model.classes),
+        "faculty_updated": [],
+        "errors": model.errors,
+        "conflicts": model.conflicts,
+        "committed": False,
+    }
+
+    if model.errors or model.conflicts or not model.classes:
+        return result
+
+    # Clashes with classes outside the file are found against stored timetables
+    saved = save_class_timetables(list(model.classes.values()), dry_run=dry_run)
+
+    if saved["conflicts"]:
+        result["conflicts"] = [
+            dict(conflict, row=model.row_for(conflict)) for conflict in saved["conflicts"]
+        ]
+        return result
+
+    result["faculty_updated"] = saved["faculty_updated"]
+    result["committed"] = not dry_run
+    return result
+
+
+# ===============================
+# 🔹 FLASK CLI
+# ===============================
+def register_cli(app):
+    @app.cli.command("import-timetables")
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "file_format", type=click.Choice(["csv", "xlsx"]), default=None,
+                  help="File format (default: from the extension).")
+    @click.option("--dry-run", is_flag=True, help="Validate only, write nothing.")
+    def import_command(path, file_format, dry_run):
+        """Import class timetables from a CSV or XLSX file."""
+        from app.controllers.timetable_controller import ALLOWED_BRANCHES
+
+        file_format = file_format or format_from_filename(path)
+        with open(path, "rb") as stream:
+            try:
+                result = import_timetables(
+                    iter_rows(stream, file_format), ALLOWED_BRANCHES, dry_run=dry_run
+                )
+            except TimetableImportError as e:
+                raise click.ClickException(str(e))
+
+        for error in result["errors"]:
+            click.echo(f"row {error['row']}: {error['error']}", err=True)
+        for conflict in result["conflicts"]:
+            click.echo(
+                f"row {conflict['row']}: {conflict['faculty']} already teaches "
+                f"{conflict['existing_lecture']} on {conflict['day']} {conflict['time_slot']}",
+                err=True
+            )
+
+        if result["errors"] or result["conflicts"]:
+            raise click.ClickException(
+                f"{len(result['errors'])} invalid rows, {len(result['conflicts'])} conflicts"
+            )
+
+        verb = "Validated" if dry_run else "Imported"
+        click.echo(
+            f"{verb} {result['classes']} classes from {result['rows']} rows, "
+            f"{len(result['faculty_updated'])} faculty updated"
+        )
@@ -0,0 +1,602 @@
+from pymongo import UpdateOne
+
+from app.database.mongo import db
+from app.database.transactions import run_transaction
+from app.services.class_schedule import (
+    normalize_schedule,
+    rebuild_class_schedule
+)
+from app.services.timetable_diff import diff_assignments, slot_update
+from app.services.change_feed import DELETED, publish_changes
+from app.services.effective_timetable import effective_timetables
+from app.services.faculty_load import LOAD_FIELD, count_substitutions, weekly_delta, weekly_load
+from app.services.slot_codec import (
+    FREE_SLOT,
+    class_directory,
+    class_ref,
+    decode_slot,
+    is_free,
+    ref_from_doc
+)
+from app.services.occupancy_index import occupancy_index
+from app.services.versioning import (
+    bump,
+    class_scope,
+    FACULTY_SCOPE,
+    CLASSWISE_SCOPE,
+    TEMP_SCOPE
+)
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+DAYS_MAP = {
+    "Monday": "mon",
+    "Tuesday": "tue",
+    "Wednesday": "wed",
+    "Thursday": "thu",
+    "Friday": "fri",
+    "Saturday": "sat",
+}
+
+DAY_KEYS = ["mon", "tue", "wed", "thu", "fri", "sat"]
+
+TIME_SLOT_INDEX = {f"Time Slot {i + 1}": i for i in range(8)}
+
+TOTAL_SLOTS = 8
+
+
+# ===============================
+# 🔹 HELPERS
+# ===============================
+def normalize_day_slots(day_list, total_slots=TOTAL_SLOTS):
+    """Fixed-length day list, padded with free slots or trimmed."""
+    if not isinstance(day_list, list):
+        return [FREE_SLOT] * total_slots
+    return (day_list + [FREE_SLOT] * total_slots)[:total_slots]
+
+
+def normalize_faculty_timetable(timetable):
+    timetable = timetable or {}
+    return {day: normalize_day_slots(timetable.get(day)) for day in DAY_KEYS}
+
+
+def class_slot_assignments(class_id, schedule):
+    """
+    Faculty slots taken by one class schedule:
+    {faculty_id: {(day_key, slot_index): class_id}}
+    """
+    assignments = {}
+
+    for day_name, slots in schedule.items():
+        day_key = DAYS_MAP.get(day_name)
+        if not day_key:
+            continue
+
+        for time_slot, faculty in slots.items():
+            if faculty == "free":
+                continue
+
+            slot_index = TIME_SLOT_INDEX.get(time_slot)
+            if slot_index is None:
+                continue
+
+            assignments.setdefault(faculty, {})[(day_key, slot_index)] = class_id
+
+    return assignments
+
+
+def conflict(faculty_id, day, slot_index, existing, incoming, refs=None):
+    """Conflict report; the lectures are given as legacy slot strings."""
+    return {
+        "faculty": faculty_id,
+        "day": day,
+        "time_slot": f"Time Slot {slot_index + 1}",
+        "existing_lecture": decode_slot(existing, slot_index, refs),
+        "new_lecture": decode_slot(incoming, slot_index, refs),
+    }
+
+
+# ===============================
+# 🔹 SAVE PIPELINE
+# ===============================
+def load_current_schedules(class_ids):
+    """
+    Stored schedules for the given classes: {class_id: schedule}.
+    Classes saved before schedules were materialized are rebuilt from
+    faculty timetables; unknown classes are simply absent.
+    """
+    current = {
+        doc["_id"]: doc.get("schedule", {})
+        for doc in db.class_timetable.find(
+            {"_id": {"$in": class_ids}},
+            {"schedule": 1}
+        )
+    }
+
+    missing = [class_id for class_id in class_ids if class_id not in current]
+    if missing:
+        for class_doc in db.classwise_faculty.find({"_id": {"$in": missing}}):
+            current[class_doc["_id"]] = rebuild_class_schedule(class_doc)
+
+    return current
+
+
+def save_class_timetables(classes, dry_run=False):
+    """
+    Validate and store one or more class schedules in one pass.
+
+    classes: [{"sem", "branch", "class", "schedule"}]
+    dry_run: run every check but write nothing
+
+    Each incoming schedule is diffed against the class's stored schedule, so
+    only slots that were added, moved or removed are touched. All affected
+    faculty are read with a single $in query and every conflict (against
+    stored timetables and between the given classes) is collected before
+    anything is written. Without conflicts, faculty slots are written as
+    targeted 'timetable.<day>.<idx>' $set paths, and classwise_faculty,
+    faculty_timetable and class_timetable get one bulk_write each inside a
+    transaction.
+
+    Returns {"class_ids", "faculty_updated", "conflicts"}.
+    """
+    class_refs = [
+        class_ref(entry["sem"], entry["branch"], entry["class"])
+        for entry in classes
+    ]
+    class_ids = [ref.class_id for ref in class_refs]
+    # Incoming classes may not be stored yet; conflict reports name them from here
+    refs = {ref.class_id: ref for ref in class_refs}
+    current_schedules = load_current_schedules(class_ids)
+
+    class_ops = []
+    schedule_ops = []
+
+    # faculty_id -> {(day, idx): value}, merged across all classes
+    additions = {}
+    removals = {}
+    conflicts = []
+
+    for entry, class_id in zip(classes, class_ids):
+        sem = entry["sem"]
+        branch = entry["branch"]
+        class_name = entry["class"]
+        schedule = entry["schedule"]
+
+        allowed_faculty = set()
+        for day in schedule.values():
+            for faculty in day.values():
+                if faculty != "free":
+                    allowed_faculty.add(faculty)
+
+        class_ops.append(UpdateOne(
+            {"_id": class_id},
+            {
+                "$set": {
+                    "sem": sem,
+                    "branch": branch,
+                    "class": class_name,
+                    "allowed_faculty": list(allowed_faculty)
+                }
+            },
+            upsert=True
+        ))
+
+        schedule_ops.append(UpdateOne(
+            {"_id": class_id},
+            {
+                "$set": {
+                    "sem": sem,
+                    "branch": branch,
+                    "class": class_name,
+                    "schedule": normalize_schedule(schedule)
+                }
+            },
+            upsert=True
+        ))
+
+        class_added, class_removed = diff_assignments(
+            class_slot_assignments(class_id, current_schedules.get(class_id, {})),
+            class_slot_assignments(class_id, schedule)
+        )
+
+        for faculty_id, slots in class_removed.items():
+            removals.setdefault(faculty_id, {}).update(slots)
+
+        for faculty_id, slots in class_added.items():
+            merged = additions.setdefault(faculty_id, {})
+            for key, value in slots.items():
+                if key in merged and merged[key] != value:
+                    conflicts.append(conflict(faculty_id, key[0], key[1], merged[key], value, refs))
+                    continue
+                merged[key] = value
+
+    # -------------------------------
+    # One read for every affected faculty
+    # -------------------------------
+    affected = list(dict.fromkeys(list(additions) + list(removals)))
+    existing_docs = {
+        doc["_id"]: doc
+        for doc in db.faculty_timetable.find(
+            {"_id": {"$in": affected}},
+            {"timetable": 1}
+        )
+    }
+
+    faculty_ops = []
+    faculty_tables = {}
+
+    for faculty_id in affected:
+        doc = existing_docs.get(faculty_id)
+        stored_tt = doc.get("timetable", {}) if doc else {}
+        before = normalize_faculty_timetable(stored_tt)
+        timetable = normalize_faculty_timetable(stored_tt)
+        touched = set()
+
+        # Free this class's old slots first so moves within the batch don't clash
+        for (day, idx), old_value in removals.get(faculty_id, {}).items():
+            if timetable[day][idx] == old_value:
+                timetable[day][idx] = FREE_SLOT
+                touched.add((day, idx))
+
+        for (day, idx), value in additions.get(faculty_id, {}).items():
+            current = timetable[day][idx]
+            if not is_free(current) and current != value:
+                conflicts.append(conflict(faculty_id, day, idx, current, value, refs))
+                continue
+            timetable[day][idx] = value
+            touched.add((day, idx))
+
+        changes = {
+            (day, idx): timetable[day][idx]
+            for day, idx in touched
+            if doc is None or timetable[day][idx] != before[day][idx]
+        }
+
+        if not changes:
+            continue
+
+        faculty_tables[faculty_id] = timetable
+
+        if doc is None:
+            faculty_ops.append(UpdateOne(
+                {"_id": faculty_id},
+                {
+                    "$set": {
+                        "timetable": timetable,
+                        f"{LOAD_FIELD}.weekly": weekly_load(timetable)
+                    },
+                    "$setOnInsert": {"name": faculty_id}
+                },
+                upsert=True
+            ))
+        else:
+            update = {"$set": slot_update(stored_tt, changes, TOTAL_SLOTS)}
+            delta = weekly_delta(
+                [before[day][idx] for day, idx in changes],
+                list(changes.values())
+            )
+            if delta:
+                update["$inc"] = {f"{LOAD_FIELD}.weekly": delta}
+            faculty_ops.append(UpdateOne({"_id": faculty_id}, update))
+
+    if conflicts:
+        return {"class_ids": class_ids, "faculty_updated": [], "conflicts": conflicts}
+
+    if dry_run:
+        return {"class_ids": class_ids, "faculty_updated": list(faculty_tables), "conflicts": []}
+
+    # -------------------------------
+    # Commit everything together
+    # -------------------------------
+    def write(session):
+        if class_ops:
+            db.classwise_faculty.bulk_write(class_ops, ordered=False, session=session)
+        if faculty_ops:
+            db.faculty_timetable.bulk_write(faculty_ops, ordered=False, session=session)
+        if schedule_ops:
+            db.class_timetable.bulk_write(schedule_ops, ordered=False, session=session)
+        bump(
+            CLASSWISE_SCOPE,
+            FACULTY_SCOPE,
+            *[class_scope(class_id) for class_id in class_ids],
+            session=session
+        )
+
+    run_transaction(write)
+
+    for faculty_id, timetable in faculty_tables.items():
+        occupancy_index.set_timetable(faculty_id, timetable)
+    effective_timetables.clear()
+
+    return {
+        "class_ids": class_ids,
+        "faculty_updated": list(faculty_tables),
+        "conflicts": [],
+    }
+
+
+# ===============================
+# 🔹 DELETE PIPELINE
+# ===============================
+def delete_class_timetables(class_docs):
+    """
+    Remove one or more classes and everything that points at them.
+
+    Affected faculty (allowed or scheduled) are read with one $in query,
+    their slots are freed with positional 'timetable.<day>.<idx>' updates
+    in a single bulk_write, the classes' temp substitutions are purged with
+    one delete_many, and the classwise_faculty / class_timetable documents
+    are removed, all inside one transaction.
+
+    Returns {"class_ids", "faculty_updated", "temp_deleted"}.
+    """
+    class_ids = [doc["_id"] for doc in class_docs]
+    removed = set(class_ids)
+
+    faculty_ids = [
+        faculty_id
+        for doc in class_docs
+        for faculty_id in doc.get("allowed_faculty", [])
+    ]
+    # allowed_faculty can be edited on its own; the stored schedules name
+    # whoever actually teaches the classes
+    for schedule_doc in db.class_timetable.find({"_id": {"$in": class_ids}}, {"schedule": 1}):
+        faculty_ids.extend(class_slot_assignments(schedule_doc["_id"], schedule_doc.get("schedule", {})))
+    faculty_ids = list(dict.fromkeys(faculty_ids))
+
+    faculty_ops = []
+    freed = {}
+
+    for faculty_doc in db.faculty_timetable.find(
+        {"_id": {"$in": faculty_ids}},
+        {"timetable": 1}
+    ):
+        timetable = faculty_doc.get("timetable", {})
+        update = {}
+
+        for day, slots in timetable.items():
+            if not isinstance(slots, list):
+                continue
+            for i, value in enumerate(slots):
+                if value in removed:
+                    update[f"timetable.{day}.{i}"] = FREE_SLOT
+                    slots[i] = FREE_SLOT
+
+        if update:
+            faculty_ops.append(UpdateOne(
+                {"_id": faculty_doc["_id"]},
+                {"$set": update, "$inc": {f"{LOAD_FIELD}.weekly": -len(update)}}
+            ))
+            freed[faculty_doc["_id"]] = timetable
+
+    temp_filter = {"class_id": {"$in": class_ids}}
+
+    def write(session):
+        if faculty_ops:
+            db.faculty_timetable.bulk_write(faculty_ops, ordered=False, session=session)
+        purged = list(db.temp_faculty_timetable.find(
+            temp_filter,
+            {"faculty_id": 1, "date": 1, "day": 1, "lec_no": 1, "class_id": 1},
+            session=session
+        ))
+        temp_result = db.temp_faculty_timetable.delete_many(temp_filter, session=session)
+        count_substitutions(purged, sign=-1, session=session)
+        db.classwise_faculty.delete_many({"_id": {"$in": class_ids}}, session=session)
+        db.class_timetable.delete_many({"_id": {"$in": class_ids}}, session=session)
+        bump(
+            CLASSWISE_SCOPE,
+            FACULTY_SCOPE,
+            TEMP_SCOPE,
+            *[class_scope(class_id) for class_id in class_ids],
+            session=session
+        )
+        return temp_result.deleted_count, purged
+
+    temp_deleted, purged = run_transaction(write) if class_ids else (0, [])
+
+    class_directory.forget(class_ids)
+    for faculty_id, timetable in freed.items():
+        occupancy_index.set_timetable(faculty_id, timetable)
+    if temp_deleted:
+        occupancy_index.invalidate_dates()
+    effective_timetables.clear()
+    publish_changes(DELETED, purged, refs={doc["_id"]: ref_from_doc(doc) for doc in class_docs})
+
+    return {
+        "class_ids": class_ids,
+        "faculty_updated": list(freed),
+        "temp_deleted": temp_deleted,
+    }
+
+
+# ===============================
+# 🔹 FACULTY PIPELINE
+# ===============================
+DAY_NAMES = {day_key: day_name for day_name, day_key in DAYS_MAP.items()}
+
+
+def faculty_cell_changes(faculty_id, before, after):
+    """
+    Class schedule cells touched by a faculty timetable change:
+    {class_id: {(day_name, time_slot): faculty_id | "free"}}
+    """
+    before = normalize_faculty_timetable(before)
+    after = normalize_faculty_timetable(after)
+    changes = {}
+
+    for day_key in DAY_KEYS:
+        for idx in range(TOTAL_SLOTS):
+            old_value = before[day_key][idx]
+            new_value = after[day_key][idx]
+            if old_value == new_value:
+                continue
+            cell = (DAY_NAMES[day_key], f"Time Slot {idx + 1}")
+            if not is_free(old_value):
+                changes.setdefault(old_value, {})[cell] = "free"
+            if not is_free(new_value):
+                changes.setdefault(new_value, {})[cell] = faculty_id
+
+    return changes
+
+
+def apply_faculty_changes(faculty_id, changes):
+    """
+    Class schedules after a faculty's cell changes.
+
+    A cell is only freed while it still names this faculty, and a cell
+    another faculty already teaches is reported as a conflict. Unknown
+    classes are skipped. Returns ({class_id: schedule}, conflicts).
+    """
+    current = load_current_schedules(list(changes))
+    schedules = {}
+    conflicts = []
+
+    for class_id, cells in changes.items():
+        if class_id not in current:
+            continue
+        schedule = normalize_schedule(current[class_id])
+        touched = False
+
+        for (day_name, time_slot), value in sorted(cells.items()):
+            existing = schedule[day_name][time_slot]
+            if value == "free":
+                if existing == faculty_id:
+                    schedule[day_name][time_slot] = "free"
+                    touched = True
+                continue
+            if existing not in ("free", faculty_id):
+                conflicts.append({
+                    "class_id": class_id,
+                    "day": day_name,
+                    "time_slot": time_slot,
+                    "existing_faculty": existing,
+                    "new_faculty": faculty_id,
+                })
+                continue
+            if existing != value:
+                schedule[day_name][time_slot] = value
+                touched = True
+
+        if touched:
+            schedules[class_id] = schedule
+
+    return schedules, conflicts
+
+
+def schedule_ops_for(schedules):
+    """class_timetable upserts; documents missing so far get their class fields."""
+    refs = class_directory.refs(list(schedules))
+    ops = []
+    for class_id, schedule in schedules.items():
+        fields = {"schedule": schedule}
+        ref = refs.get(class_id)
+        if ref:
+            fields.update({"sem": ref.sem, "branch": ref.branch, "class": ref.class_name})
+        ops.append(UpdateOne({"_id": class_id}, {"$set": fields}, upsert=True))
+    return ops
+
+
+def save_faculty_timetable(faculty_doc, fields, timetable=None):
+    """
+    Update one faculty and keep the classes they teach in step.
+
+    faculty_doc: the stored faculty_timetable document
+    fields: other $set fields (name, ...)
+    timetable: new stored timetable, or None to leave it unchanged
+
+    Every class cell the faculty gains or loses is rewritten in that
+    class's class_timetable schedule, newly taught classes get the faculty
+    in allowed_faculty, and the faculty, classwise and class scopes are
+    bumped together with the writes in one transaction. A cell another
+    faculty already teaches is a conflict and nothing is written.
+
+    Returns {"modified", "class_ids", "conflicts"}.
+    """
+    faculty_id = faculty_doc["_id"]
+    update = dict(fields)
+    schedules = {}
+    gained = []
+
+    if timetable is not None:
+        changes = faculty_cell_changes(faculty_id, faculty_doc.get("timetable"), timetable)
+        schedules, conflicts = apply_faculty_changes(faculty_id, changes)
+        if conflicts:
+            return {"modified": False, "class_ids": [], "conflicts": conflicts}
+
+        update["timetable"] = timetable
+        update[f"{LOAD_FIELD}.weekly"] = weekly_load(timetable)
+        gained = [
+            class_id for class_id, cells in changes.items()
+            if faculty_id in cells.values()
+        ]
+
+    class_ids = list(schedules)
+
+    def write(session):
+        result = db.faculty_timetable.update_one(
+            {"_id": faculty_id}, {"$set": update}, session=session
+        )
+        if gained:
+            db.classwise_faculty.update_many(
+                {"_id": {"$in": gained}},
+                {"$addToSet": {"allowed_faculty": faculty_id}},
+                session=session
+            )
+        if schedules:
+            db.class_timetable.bulk_write(
+                schedule_ops_for(schedules), ordered=False, session=session
+            )
+        scopes = [class_scope(class_id) for class_id in class_ids]
+        if gained:
+            scopes.append(CLASSWISE_SCOPE)
+        if result.modified_count > 0 or scopes:
+            bump(FACULTY_SCOPE, *scopes, session=session)
+        return result.modified_count > 0
+
+    modified = run_transaction(write) if update else False
+
+    occupancy_index.drop_faculty(faculty_id)
+    effective_timetables.clear()
+
+    return {"modified": modified, "class_ids": class_ids, "conflicts": []}
+
+
+def delete_faculty_timetable(faculty_doc):
+    """
+    Remove one faculty: every class cell they teach becomes "free" in
+    class_timetable, they leave allowed_faculty, and the faculty, classwise
+    and class scopes are bumped, all in one transaction.
+
+    Returns {"deleted", "class_ids"}.
+    """
+    faculty_id = faculty_doc["_id"]
+    changes = faculty_cell_changes(faculty_id, faculty_doc.get("timetable"), {})
+    schedules, _ = apply_faculty_changes(faculty_id, changes)
+    class_ids = list(schedules)
+
+    def write(session):
+        result = db.faculty_timetable.delete_one({"_id": faculty_id}, session=session)
+        db.classwise_faculty.update_many(
+            {"allowed_faculty": faculty_id},
+            {"$pull": {"allowed_faculty": faculty_id}},
+            session=session
+        )
+        if schedules:
+            db.class_timetable.bulk_write(
+                schedule_ops_for(schedules), ordered=False, session=session
+            )
+        bump(
+            FACULTY_SCOPE,
+            CLASSWISE_SCOPE,
+            *[class_scope(class_id) for class_id in class_ids],
+            session=session
+        )
+        return result.deleted_count > 0
+
+    deleted = run_transaction(write)
+
+    occupancy_index.drop_faculty(faculty_id)
+    effective_timetables.clear()
+
+    return {"deleted": deleted, "class_ids": class_ids}
@@ -0,0 +1,97 @@
+import hashlib
+from functools import wraps
+
+from flask import request, make_response, Response
+from pymongo import UpdateOne
+
+from app.database.mongo import db
+
+# ===============================
+# 🔹 CONSTANTS
+# ===============================
+COLLECTION_NAME = "collection_versions"
+
+FACULTY_SCOPE = "faculty_timetable"
+CLASSWISE_SCOPE = "classwise_faculty"
+TEMP_SCOPE = "temp_faculty_timetable"
+
+
+def class_scope(class_id):
+    """Per-class counter, bumped whenever that class's schedule changes."""
+    return f"class:{class_id}"
+
+
+# ===============================
+# 🔹 COUNTERS
+# ===============================
+def bump(*scopes, session=None):
+    """Increment version counters; every write controller calls this."""
+    scopes = list(dict.fromkeys(scopes))
+    if not scopes:
+        return
+
+    db[COLLECTION_NAME].bulk_write(
+        [
+            UpdateOne({"_id": scope}, {"$inc": {"version": 1}}, upsert=True)
+            for scope in scopes
+        ],
+        ordered=False,
+        session=session
+    )
+
+
+def get_versions(scopes):
+    """{scope: version} with one query; unknown scopes are 0."""
+    versions = {scope: 0 for scope in scopes}
+    for doc in db[COLLECTION_NAME].find({"_id": {"$in": list(scopes)}}):
+        versions[doc["_id"]] = doc.get("version", 0)
+    return versions
+
+
+def make_etag(scopes, variant=""):
+    """Strong ETag for the given counters plus a request variant (path/query)."""
+    versions = get_versions(scopes)
+    raw = ";".join(f"{scope}={versions[scope]}" for scope in scopes) + "|" + variant
+    return hashlib.sha1(raw.encode()).hexdigest()[:24]
+
+
+# ===============================
+# 🔹 CONDITIONAL GET
+# ===============================
+def versioned(scopes_for, variant_for=None):
+    """
+    Decorator for GET views: answer If-None-Match with 304 straight from the
+    version counters, and tag successful responses with a strong ETag.
+
+    scopes_for(*view_args, **view_kwargs) returns the counters the response
+    depends on; an empty list disables the check for that request.
+    variant_for(*view_args, **view_kwargs), if given, adds what else the
+    response depends on beyond the counters and the URL (e.g. today's date).
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            scopes = scopes_for(*args, **kwargs)
+            if not scopes:
+                return view(*args, **kwargs)
+
+            # Read versions before building the body, so a concurrent write
+            # can only make the tag older than the data, never newer
+            variant = request.full_path
+            if variant_for is not None:
+                variant += "|" + variant_for(*args, **kwargs)
+            etag = make_etag(scopes, variant)
+
+            if request.if_none_match.contains(etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                response.set_etag(etag)
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,25 @@
+"""
+ASGI entry point, e.g.:
+
+    ASYNC_MODE=true uvicorn asgi:application --workers 4
+
+Flask views still run synchronously, on a thread pool of
+ASGI_WORKER_THREADS threads per process; with ASYNC_MODE on, their
+independent Mongo lookups run concurrently on the async driver.
+"""
+import sys
+import os
+from dotenv import load_dotenv
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+load_dotenv()  # MUST be before create_app
+
+from a2wsgi import WSGIMiddleware
+
+from app import create_app
+from app.config import Config
+
+app = create_app()
+
+application = WSGIMiddleware(app, workers=Config.ASGI_WORKER_THREADS)
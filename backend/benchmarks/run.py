@@ -0,0 +1,377 @@
+"""
+Endpoint benchmark harness.
+
+Loads a synthetic institute (benchmarks/synthetic.py) into a dedicated
+database, drives the Flask endpoints through the test client and writes
+p50/p95 latency and Mongo command counts per endpoint to a JSON file.
+
+Run from backend/:
+
+    python -m benchmarks.run --mongo-uri mongodb://localhost:27017
+    python -m benchmarks.run --mongomock          # pip install mongomock
+
+The target database (--db, default "timetable_benchmark") is wiped first.
+Compare two result files with any JSON diff; every run records its
+arguments, data sizes and git commit.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from pymongo import monitoring
+
+DEFAULT_ENDPOINTS = [
+    "fetch_timetable",
+    "get_rearrange_options",
+    "get_available_faculty",
+    "save_timetable",
+    "fetch_all_changes",
+    "get_all_faculties",
+]
+
+
+# ===============================
+# 🔹 MONGO COMMAND COUNTER
+# ===============================
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands per endpoint currently being benchmarked."""
+
+    def __init__(self):
+        self.endpoint = None
+        self.counts = {}
+        self.durations = {}
+
+    def started(self, event):
+        if self.endpoint is None:
+            return
+        per_endpoint = self.counts.setdefault(self.endpoint, {})
+        per_endpoint[event.command_name] = per_endpoint.get(event.command_name, 0) + 1
+
+    def succeeded(self, event):
+        if self.endpoint is not None:
+            self.durations[self.endpoint] = (
+                self.durations.get(self.endpoint, 0) + event.duration_micros
+            )
+
+    def failed(self, event):
+        self.succeeded(event)
+
+
+# ===============================
+# 🔹 REQUEST BUILDERS
+# ===============================
+def next_date_for(day_idx):
+    """Next calendar date (today included) falling on day_idx (0 = Monday)."""
+    today = date.today()
+    return (today + timedelta(days=(day_idx - today.weekday()) % 7)).isoformat()
+
+
+def random_lecture(rng, institute):
+    """A random taught slot: (class doc, day index, lec_no)."""
+    from app.services.class_schedule import DAYS, TIME_SLOT_KEYS
+
+    while True:
+        doc = rng.choice(institute["class_timetable"])
+        day_idx = rng.randrange(len(DAYS))
+        lec_no = rng.randrange(len(TIME_SLOT_KEYS))
+        if doc["schedule"][DAYS[day_idx]][TIME_SLOT_KEYS[lec_no]] != "free":
+            return doc, day_idx, lec_no
+
+
+def call_fetch_timetable(client, rng, institute, state):
+    doc = rng.choice(institute["class_timetable"])
+    return client.get(
+        "/api/fetchtimetable",
+        query_string={"sem": doc["sem"], "branch": doc["branch"], "class": doc["class"]}
+    )
+
+
+def call_get_rearrange_options(client, rng, institute, state):
+    from app.services.class_schedule import DAYS, DAYS_MAP
+
+    doc, day_idx, lec_no = random_lecture(rng, institute)
+    return client.post("/api/get-rearrange-options", json={
+        "date": next_date_for(day_idx),
+        "day": DAYS_MAP[DAYS[day_idx]],
+        "class": doc["class"],
+        "sem": doc["sem"],
+        "branch": doc["branch"],
+        "lec_no": lec_no,
+    })
+
+
+def call_get_available_faculty(client, rng, institute, state):
+    from app.services.class_schedule import DAYS, DAYS_MAP
+
+    doc, day_idx, lec_no = random_lecture(rng, institute)
+    return client.post("/api/get-available-faculty", json={
+        "day": DAYS_MAP[DAYS[day_idx]],
+        "class": doc["class"],
+        "sem": doc["sem"],
+        "branch": doc["branch"],
+        "lec_no": lec_no,
+    })
+
+
+def call_save_timetable(client, rng, institute, state):
+    """Alternately free and restore one lecture, so every save is a real change."""
+    from app.services.class_schedule import DAYS, TIME_SLOT_KEYS
+
+    pending = state.get("restore")
+    if pending:
+        doc, schedule = pending
+        state["restore"] = None
+    else:
+        doc, day_idx, lec_no = random_lecture(rng, institute)
+        schedule = json.loads(json.dumps(doc["schedule"]))
+        schedule[DAYS[day_idx]][TIME_SLOT_KEYS[lec_no]] = "free"
+        state["restore"] = (doc, doc["schedule"])
+
+    return client.post("/api/timetable", data={
+        "sem": doc["sem"],
+        "branch": doc["branch"],
+        "class": doc["class"],
+        "schedule": json.dumps(schedule),
+    })
+
+
+def call_fetch_all_changes(client, rng, institute, state):
+    today = date.today()
+    return client.get("/api/fetch-all-changes", query_string={
+        "from": today.isoformat(),
+        "to": (today + timedelta(days=7)).isoformat(),
+    })
+
+
+def call_get_all_faculties(client, rng, institute, state):
+    return client.get("/api/faculties")
+
+
+CALLS = {
+    "fetch_timetable": call_fetch_timetable,
+    "get_rearrange_options": call_get_rearrange_options,
+    "get_available_faculty": call_get_available_faculty,
+    "save_timetable": call_save_timetable,
+    "fetch_all_changes": call_fetch_all_changes,
+    "get_all_faculties": call_get_all_faculties,
+}
+
+
+# ===============================
+# 🔹 STATS
+# ===============================
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(latencies_ms, statuses, command_counts, command_micros, calls):
+    latencies_ms = sorted(latencies_ms)
+    summary = {
+        "calls": calls,
+        "p50_ms": round(percentile(latencies_ms, 50), 3),
+        "p95_ms": round(percentile(latencies_ms, 95), 3),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3),
+        "max_ms": round(latencies_ms[-1], 3),
+        "status_codes": statuses,
+    }
+
+    if command_counts is None:
+        summary["mongo_ops"] = None
+    else:
+        total = sum(command_counts.values())
+        summary["mongo_ops"] = {
+            "total": total,
+            "per_call": round(total / calls, 2),
+            "by_command": {
+                name: round(count / calls, 2)
+                for name, count in sorted(command_counts.items())
+            },
+            "server_ms_per_call": round(command_micros / 1000.0 / calls, 3),
+        }
+
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except Exception:
+        return None
+
+
+# ===============================
+# 🔹 MAIN
+# ===============================
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the timetable API")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--db", default="timetable_benchmark")
+    parser.add_argument("--mongomock", action="store_true",
+                        help="use an in-memory mongomock client (no op counts)")
+    parser.add_argument("--faculty", type=int, default=200)
+    parser.add_argument("--classes-per-sem", type=int, default=4)
+    parser.add_argument("--semesters", type=int, default=8)
+    parser.add_argument("--temp-changes", type=int, default=500)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--cold", action="store_true",
+                        help="clear the in-process occupancy index before every call")
+    parser.add_argument("--endpoints", default=",".join(DEFAULT_ENDPOINTS))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None,
+                        help="result file (default benchmarks/results/<timestamp>.json)")
+    return parser.parse_args(argv)
+
+
+def patch_mongomock_bulk(mongomock):
+    """
+    pymongo >= 4.11 passes sort= to bulk update builders, which mongomock
+    4.x does not accept yet; it is always None for our UpdateOne calls.
+    """
+    from mongomock.collection import BulkOperationBuilder
+
+    add_update = BulkOperationBuilder.add_update
+    if getattr(add_update, "_ignores_sort", False):
+        return
+
+    def patched(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    patched._ignores_sort = True
+    BulkOperationBuilder.add_update = patched
+
+
+def create_benchmark_app(args):
+    """create_app() against the benchmark database, optionally on mongomock."""
+    os.environ["MONGO_URI"] = args.mongo_uri
+    os.environ["MONGO_DB_NAME"] = args.db
+
+    import app as app_package
+    from app.database import mongo
+
+    if args.mongomock:
+        import mongomock
+        from app.database import transactions
+
+        patch_mongomock_bulk(mongomock)
+        mongo.MongoClient = mongomock.MongoClient
+        # No validators, TTL pipelines or sessions in mongomock
+        app_package.ensure_schema = lambda db: None
+        transactions._transactions_supported = False
+
+    return app_package.create_app()
+
+
+def main(argv=None):
+    args = parse_args(argv if argv is not None else sys.argv[1:])
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in CALLS]
+    if unknown:
+        sys.exit(f"Unknown endpoints: {', '.join(unknown)}")
+
+    counter = None
+    if not args.mongomock:
+        counter = CommandCounter()
+        monitoring.register(counter)
+
+    flask_app = create_benchmark_app(args)
+
+    # Imported after create_app so module-level `db` bindings are set
+    from app.database.mongo import db
+    from app.services.occupancy_index import occupancy_index
+    from benchmarks.synthetic import build_institute, load_institute
+
+    institute = build_institute(
+        faculty=args.faculty,
+        classes_per_sem=args.classes_per_sem,
+        semesters=args.semesters,
+        temp_changes=args.temp_changes,
+        seed=args.seed
+    )
+    load_institute(db, institute)
+    occupancy_index.clear()
+
+    client = flask_app.test_client()
+    results = {}
+
+    for name in endpoints:
+        call = CALLS[name]
+        rng = random.Random(f"{args.seed}:{name}")
+        state = {}
+
+        for _ in range(args.warmup):
+            call(client, rng, institute, state)
+
+        latencies = []
+        statuses = {}
+        if counter:
+            counter.counts.pop(name, None)
+            counter.durations.pop(name, None)
+
+        for _ in range(args.iterations):
+            if args.cold:
+                occupancy_index.clear()
+
+            if counter:
+                counter.endpoint = name
+            started = time.perf_counter()
+            response = call(client, rng, institute, state)
+            elapsed = (time.perf_counter() - started) * 1000.0
+            if counter:
+                counter.endpoint = None
+
+            latencies.append(elapsed)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+        results[name] = summarize(
+            latencies,
+            statuses,
+            counter.counts.get(name, {}) if counter else None,
+            counter.durations.get(name, 0) if counter else 0,
+            args.iterations
+        )
+        print(
+            f"{name:24s} p50 {results[name]['p50_ms']:8.2f} ms  "
+            f"p95 {results[name]['p95_ms']:8.2f} ms  "
+            f"ops/call {results[name]['mongo_ops']['per_call'] if counter else 'n/a'}"
+        )
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "backend": "mongomock" if args.mongomock else "mongod",
+        "args": vars(args),
+        "data": {
+            "faculty": len(institute["faculty"]),
+            "classes": len(institute["classwise"]),
+            "temp_changes": len(institute["temp"]),
+        },
+        "endpoints": results,
+    }
+
+    out = args.out or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "results",
+        datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print("Results written to", out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Synthetic institute generator for the benchmark harness.
+
+Builds consistent faculty_timetable / classwise_faculty / class_timetable /
+temp_faculty_timetable documents from a seed, so two runs with the same
+arguments load exactly the same data.
+"""
+import random
+from datetime import date, timedelta
+
+from app.controllers.timetable_controller import ALLOWED_BRANCHES
+from app.services.class_schedule import (
+    DAYS,
+    DAYS_MAP,
+    TIME_SLOT_KEYS,
+    TOTAL_SLOTS,
+    empty_schedule,
+    make_class_id
+)
+from app.services.slot_codec import FREE_SLOT, is_free
+from app.services.temp_assignments import build_temp_record
+
+COLLECTIONS = [
+    "faculty_timetable",
+    "classwise_faculty",
+    "class_timetable",
+    "temp_faculty_timetable",
+    "collection_versions",
+]
+
+DAY_KEYS = [DAYS_MAP[day] for day in DAYS]
+
+
+def build_institute(faculty=200, classes_per_sem=4, semesters=8, temp_changes=500,
+                    allowed_per_class=8, fill=0.75, seed=42):
+    """
+    Returns {"faculty": [...], "classwise": [...], "class_timetable": [...],
+             "temp": [...], "classes": [(sem, branch, class_name)]}.
+
+    Every class gets allowed_per_class faculty and roughly `fill` of its
+    weekly slots taught; a slot is only given to a faculty who is free then,
+    so the result never contains clashes.
+    """
+    rng = random.Random(seed)
+
+    faculty_ids = [f"F{i:04d}" for i in range(1, faculty + 1)]
+    timetables = {
+        fac_id: {day: [FREE_SLOT] * TOTAL_SLOTS for day in DAY_KEYS}
+        for fac_id in faculty_ids
+    }
+
+    classwise = []
+    class_tables = []
+    classes = []
+
+    for sem in range(1, semesters + 1):
+        for branch in ALLOWED_BRANCHES:
+            for n in range(1, classes_per_sem + 1):
+                class_name = f"D{n}"
+                class_id = make_class_id(sem, branch, class_name)
+                allowed = rng.sample(faculty_ids, min(allowed_per_class, faculty))
+                schedule = empty_schedule()
+
+                for day_name, day_key in zip(DAYS, DAY_KEYS):
+                    for idx, time_slot in enumerate(TIME_SLOT_KEYS):
+                        if rng.random() > fill:
+                            continue
+                        free = [f for f in allowed if is_free(timetables[f][day_key][idx])]
+                        if not free:
+                            continue
+                        fac_id = rng.choice(free)
+                        schedule[day_name][time_slot] = fac_id
+                        timetables[fac_id][day_key][idx] = class_id
+
+                classwise.append({
+                    "_id": class_id,
+                    "class": class_name,
+                    "sem": sem,
+                    "branch": branch,
+                    "allowed_faculty": allowed,
+                })
+                class_tables.append({
+                    "_id": class_id,
+                    "sem": sem,
+                    "branch": branch,
+                    "class": class_name,
+                    "schedule": schedule,
+                })
+                classes.append((sem, branch, class_name))
+
+    # Temp substitutions over the next two weeks, each on a free faculty slot
+    temp = []
+    taken = set()
+    start = date.today()
+    attempts = 0
+    while len(temp) < temp_changes and attempts < temp_changes * 20:
+        attempts += 1
+        day_offset = rng.randrange(14)
+        selected = start + timedelta(days=day_offset)
+        if selected.weekday() > 5:
+            continue
+        day_key = DAY_KEYS[selected.weekday()]
+        idx = rng.randrange(TOTAL_SLOTS)
+        fac_id = rng.choice(faculty_ids)
+        key = (fac_id, selected.isoformat(), idx)
+        if key in taken or not is_free(timetables[fac_id][day_key][idx]):
+            continue
+        sem, branch, class_name = rng.choice(classes)
+        taken.add(key)
+        temp.append(build_temp_record(
+            fac_id,
+            selected.isoformat(),
+            day_key,
+            idx,
+            make_class_id(sem, branch, class_name)
+        ))
+
+    return {
+        "faculty": [
+            {"_id": fac_id, "name": f"Faculty {fac_id}", "timetable": timetables[fac_id]}
+            for fac_id in faculty_ids
+        ],
+        "classwise": classwise,
+        "class_timetable": class_tables,
+        "temp": temp,
+        "classes": classes,
+    }
+
+
+def load_institute(db, institute):
+    """Replace the benchmark database contents with a synthetic institute."""
+    for name in COLLECTIONS:
+        db[name].delete_many({})
+
+    db.faculty_timetable.insert_many(institute["faculty"])
+    db.classwise_faculty.insert_many(institute["classwise"])
+    db.class_timetable.insert_many(institute["class_timetable"])
+    if institute["temp"]:
+        db.temp_faculty_timetable.insert_many(institute["temp"])
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import pytest
+
+# Run from anywhere: the tests import the "app" package from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TEST_DB_NAME = "timetable_test"
+
+
+def reset_caches():
+    from app.services.effective_timetable import effective_timetables
+    from app.services.occupancy_index import occupancy_index
+    from app.services.slot_codec import class_directory
+
+    occupancy_index.clear()
+    class_directory.clear()
+    effective_timetables.clear()
+
+
+@pytest.fixture
+def mongo_db(monkeypatch):
+    """
+    A fresh in-memory database behind app.database.mongo.db (needs
+    mongomock). Transactions are off, as on a standalone mongod.
+    """
+    mongomock = pytest.importorskip("mongomock")
+    from app.database import mongo, transactions
+    from benchmarks.run import patch_mongomock_bulk
+
+    patch_mongomock_bulk(mongomock)
+    client = mongomock.MongoClient()
+
+    monkeypatch.setattr(mongo.connection_manager, "_client", client)
+    monkeypatch.setattr(mongo.connection_manager, "_pid", os.getpid())
+    monkeypatch.setattr(mongo.connection_manager, "_db_name", TEST_DB_NAME)
+    monkeypatch.setattr(transactions, "_transactions_supported", False)
+
+    reset_caches()
+    yield client[TEST_DB_NAME]
+    reset_caches()
+
+
+@pytest.fixture
+def client(mongo_db, monkeypatch):
+    """Flask test client on mongo_db; schema migrations are skipped."""
+    import app as app_package
+    from app.database import mongo
+
+    monkeypatch.setattr(app_package, "ensure_schema", lambda db: None)
+    flask_app = app_package.create_app()
+    # init_mongo re-read Config; point the manager back at mongomock
+    monkeypatch.setattr(mongo.connection_manager, "_db_name", TEST_DB_NAME)
+    return flask_app.test_client()
@@ -0,0 +1,123 @@
+import pytest
+
+from app.services import absence_cover
+from app.services.absence_cover import AbsenceError, _MinCostFlow, absence_dates, plan_absence_cover
+
+MONDAY = "2026-10-19"
+
+
+def test_min_cost_flow_takes_cheapest_paths():
+    graph = _MinCostFlow()
+    source, a, b, sink = (graph.node() for _ in range(4))
+    graph.add_edge(source, a, 1, 0)
+    graph.add_edge(source, b, 1, 0)
+    cheap = graph.add_edge(a, sink, 1, 1)
+    dear = graph.add_edge(a, sink, 1, 5)
+    graph.add_edge(b, sink, 1, 2)
+
+    assert graph.flow(source, sink) == (2, 3)
+    assert graph.used(cheap)
+    assert not graph.used(dear)
+
+
+def test_min_cost_flow_reroutes_for_maximum_flow():
+    # Greedy would send x -> p and leave y stranded; the flow reroutes x to q
+    graph = _MinCostFlow()
+    source, x, y, p, q, sink = (graph.node() for _ in range(6))
+    graph.add_edge(source, x, 1, 0)
+    graph.add_edge(source, y, 1, 0)
+    xp = graph.add_edge(x, p, 1, 0)
+    xq = graph.add_edge(x, q, 1, 3)
+    yp = graph.add_edge(y, p, 1, 1)
+    graph.add_edge(p, sink, 1, 0)
+    graph.add_edge(q, sink, 1, 0)
+
+    assert graph.flow(source, sink) == (2, 4)
+    assert graph.used(xq) and graph.used(yp)
+    assert not graph.used(xp)
+
+
+def test_absence_dates_skips_sundays():
+    assert absence_dates("2026-10-24", "2026-10-26") == [
+        ("2026-10-24", "sat"),
+        ("2026-10-26", "mon"),
+    ]
+    assert absence_dates(MONDAY, None) == [(MONDAY, "mon")]
+
+
+@pytest.mark.parametrize("date_from, date_to", [
+    ("19-10-2026", None),
+    ("2026-10-20", MONDAY),
+    (MONDAY, "2027-10-19"),
+])
+def test_absence_dates_rejects(date_from, date_to):
+    with pytest.raises(AbsenceError):
+        absence_dates(date_from, date_to)
+
+
+def use_snapshot(monkeypatch, faculty, temps=()):
+    absent = {"_id": "f0", "name": "Absent", "timetable": {"mon": ["c1", "c1", "c1"]}}
+    classes = {"c1": {
+        "_id": "c1", "branch": "CSE", "class": "D1", "sem": 4,
+        "allowed_faculty": ["f0"] + list(faculty),
+    }}
+    monkeypatch.setattr(
+        absence_cover, "load_snapshot",
+        lambda faculty_id, dates: (absent, classes, faculty, list(temps))
+    )
+
+
+def free_faculty(*fac_ids):
+    return {fac_id: {"_id": fac_id, "timetable": {"mon": [None] * 8}} for fac_id in fac_ids}
+
+
+def test_plan_spreads_covers(monkeypatch):
+    use_snapshot(monkeypatch, free_faculty("f1", "f2"))
+    plan = plan_absence_cover("f0", MONDAY, max_per_day=2)
+
+    assert plan["lectures"] == 3
+    assert plan["uncovered"] == []
+    covers = [item["faculty_id"] for item in plan["assignments"]]
+    assert sorted(covers.count(f) for f in ("f1", "f2")) == [1, 2]
+    assert plan["assignments"][0]["assigned_to"] == "CSE-D1-Sem4-Time Slot 1"
+
+
+def test_plan_respects_max_per_day_and_busy_slots(monkeypatch):
+    faculty = free_faculty("f1")
+    faculty["f1"]["timetable"]["mon"][1] = "c2"
+    use_snapshot(monkeypatch, faculty)
+    plan = plan_absence_cover("f0", MONDAY, max_per_day=1)
+
+    assert len(plan["assignments"]) == 1
+    assert plan["assignments"][0]["lec_no"] in (0, 2)
+    assert 1 in [item["lec_no"] for item in plan["uncovered"]]
+    assert len(plan["uncovered"]) == 2
+
+
+def test_plan_skips_covered_lectures(monkeypatch):
+    temps = [
+        {"faculty_id": "f2", "class_id": "c1", "date": MONDAY, "lec_no": 0},
+        {"faculty_id": "f1", "class_id": "c9", "date": MONDAY, "lec_no": 1},
+    ]
+    use_snapshot(monkeypatch, free_faculty("f1", "f2"), temps)
+    plan = plan_absence_cover("f0", MONDAY, max_per_day=2)
+
+    assert [item["lec_no"] for item in plan["already_covered"]] == [0]
+    assigned = {item["lec_no"]: item["faculty_id"] for item in plan["assignments"]}
+    # f1 is taken in lecture 1 by another temp record
+    assert assigned[1] == "f2"
+    assert set(assigned) == {1, 2}
+
+
+def test_plan_rejects_max_per_day_below_one():
+    with pytest.raises(AbsenceError):
+        plan_absence_cover("f0", MONDAY, max_per_day=0)
+
+
+@pytest.mark.parametrize("commit", ["false", 0, None])
+def test_route_rejects_non_boolean_commit(client, commit):
+    response = client.post(
+        "/api/absence", json={"faculty_id": "f0", "from": MONDAY, "commit": commit}
+    )
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "commit must be true or false"
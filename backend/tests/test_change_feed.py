@@ -0,0 +1,172 @@
+import time
+
+import pytest
+
+from app.services import change_feed as change_feed_module
+from app.services.change_feed import (
+    CREATED,
+    DELETED,
+    REARRANGED,
+    RESET,
+    ChangeFeed,
+    StreamLimit,
+    event_from_change,
+    matches,
+    sse_message
+)
+from app.services.slot_codec import class_directory, class_ref
+
+D1 = class_ref(4, "CSE", "D1")
+
+
+@pytest.fixture(autouse=True)
+def fresh_directory(monkeypatch):
+    # Every ref the tests need is passed in; keep the directory from reloading
+    monkeypatch.setattr(class_directory, "_loaded_at", time.monotonic())
+
+
+def record(n):
+    return {"_id": f"t{n}", "faculty_id": "f1", "date": "2026-10-19", "day": "mon",
+            "lec_no": n % 8, "class_id": D1.class_id}
+
+
+def publish(feed, *numbers):
+    feed.publish(CREATED, [record(n) for n in numbers], {D1.class_id: D1})
+
+
+def test_event_ids():
+    feed = ChangeFeed(size=4)
+    assert feed.parse_event_id(feed.event_id(7)) == 7
+    assert feed.parse_event_id("deadbeef-7") is None
+    assert feed.parse_event_id(f"{feed.epoch}-x") is None
+    assert feed.parse_event_id(None) is None
+
+
+def test_publish_builds_events():
+    feed = ChangeFeed(size=4)
+    publish(feed, 2)
+    events, gap = feed.since(0)
+
+    assert not gap
+    assert events == [(1, {
+        "type": CREATED, "id": "t2", "faculty": "f1", "date": "2026-10-19",
+        "day": "mon", "lec_no": 2, "class_id": D1.class_id,
+        "assigned_to": "CSE-D1-Sem4-Time Slot 3",
+        "branch": "CSE", "class": "D1", "sem": 4,
+    })]
+    assert feed.last_seq == 1
+
+
+def test_since_returns_only_newer_events():
+    feed = ChangeFeed(size=4)
+    publish(feed, 1, 2, 3)
+    events, gap = feed.since(1)
+    assert [seq for seq, _ in events] == [2, 3]
+    assert not gap
+    assert feed.since(3) == ([], False)
+
+
+def test_since_reports_gap_after_overflow():
+    feed = ChangeFeed(size=2)
+    publish(feed, 1, 2, 3, 4)
+
+    events, gap = feed.since(1)
+    assert gap
+    assert [seq for seq, _ in events] == [3, 4]
+    # Right before the oldest buffered event nothing was dropped
+    assert feed.since(2)[1] is False
+
+
+def test_publish_reset():
+    feed = ChangeFeed(size=4)
+    feed.publish_reset()
+    assert feed.since(0) == ([(1, {"type": RESET})], False)
+
+
+def test_wait():
+    feed = ChangeFeed(size=4)
+    assert not feed.wait(0, 0.01)
+    feed.publish_reset()
+    assert feed.wait(0, 0.01)
+
+
+def test_matches():
+    event = {"faculty": "f1", "branch": "CSE", "class": "D1", "sem": 4}
+    assert matches(event, {"sem": "4", "branch": "CSE"})
+    assert matches(event, {"faculty": "", "class": None})
+    assert not matches(event, {"faculty": "f2"})
+
+
+def test_sse_message():
+    assert sse_message({"type": RESET}, "e-1") == 'id: e-1\ndata: {"type":"reset"}\n\n'
+
+
+def test_stream_changes_sends_buffered_events_then_resets_on_gap(monkeypatch):
+    feed = ChangeFeed(size=2)
+    monkeypatch.setattr(change_feed_module, "change_feed", feed)
+    monkeypatch.setattr(change_feed_module, "delivery_guaranteed", lambda: True)
+    monkeypatch.setattr(change_feed_module.Config, "CHANGE_FEED_STREAM_SECONDS", 0.05)
+    monkeypatch.setattr(change_feed_module.Config, "CHANGE_FEED_HEARTBEAT", 0.01)
+    publish(feed, 1, 2, 3)
+
+    chunks = list(change_feed_module.stream_changes(feed.event_id(0), {}))
+
+    assert chunks[0].startswith("retry:")
+    assert chunks[1] == sse_message({"type": RESET}, feed.event_id(1))
+    assert '"id":"t2"' in chunks[2] and '"id":"t3"' in chunks[3]
+
+
+def test_stream_limit():
+    limit = StreamLimit(size=1)
+    held = limit.open(iter(["a"]))
+    assert limit.open(iter([])) is None
+    assert list(held) == ["a"]
+    # Exhausting the stream gives the slot back, once
+    held.close()
+    assert limit.open_count == 0
+    assert limit.open(iter([])) is not None
+
+
+def test_event_from_change():
+    rec = record(1)
+    assert event_from_change({"operationType": "insert", "fullDocument": rec}) == (CREATED, rec)
+
+    rearranged = dict(rec, event=REARRANGED)
+    assert event_from_change({"operationType": "insert", "fullDocument": rearranged})[0] == REARRANGED
+
+    assert event_from_change({
+        "operationType": "delete", "fullDocumentBeforeChange": rec, "documentKey": {"_id": "t1"},
+    }) == (DELETED, rec)
+    assert event_from_change({
+        "operationType": "delete", "documentKey": {"_id": "t1"},
+    }) == (DELETED, {"_id": "t1"})
+
+
+def test_deletes_without_pre_image_skip_filters(monkeypatch):
+    feed = ChangeFeed(size=8)
+    monkeypatch.setattr(change_feed_module, "change_feed", feed)
+    monkeypatch.setattr(change_feed_module, "delivery_guaranteed", lambda: True)
+    monkeypatch.setattr(change_feed_module.Config, "CHANGE_FEED_STREAM_SECONDS", 0.05)
+    monkeypatch.setattr(change_feed_module.Config, "CHANGE_FEED_HEARTBEAT", 0.01)
+
+    publish(feed, 1)
+    feed.publish(DELETED, [{"_id": "t1"}])
+    feed.publish(DELETED, [record(2)], {D1.class_id: D1})
+
+    chunks = list(change_feed_module.stream_changes(feed.event_id(0), {"branch": "ECE"}))
+    data = [chunk for chunk in chunks if chunk.startswith("id:")]
+    assert len(data) == 1
+    assert '"type":"deleted","id":"t1"' in data[0]
+
+
+def test_rearranged_records_keep_their_event(mongo_db):
+    from app.services.temp_assignments import build_temp_record, insert_temp_records
+
+    insert_temp_records([build_temp_record("f1", "2026-10-19", "mon", 0, D1.class_id)])
+    insert_temp_records(
+        [build_temp_record("f2", "2026-10-19", "mon", 1, D1.class_id)], event=REARRANGED
+    )
+
+    stored = {rec["faculty_id"]: rec for rec in mongo_db.temp_faculty_timetable.find()}
+    assert "event" not in stored["f1"]
+    assert event_from_change({"operationType": "insert", "fullDocument": stored["f2"]})[0] == REARRANGED
@@ -0,0 +1,67 @@
+from app.services.class_schedule import empty_schedule
+from app.services.temp_assignments import build_temp_record, insert_temp_records
+from app.services.timetable_writer import save_class_timetables
+
+D1 = "sem4_cse_d1"
+MONDAY = "2026-10-19"
+CLASS_URL = f"/api/effective-timetable?date={MONDAY}&sem=4&branch=CSE&class=D1"
+
+
+def setup_d1(mongo_db):
+    schedule = empty_schedule()
+    schedule["Monday"]["Time Slot 1"] = "f1"
+    schedule["Monday"]["Time Slot 2"] = "f2"
+    save_class_timetables([{"sem": 4, "branch": "CSE", "class": "D1", "schedule": schedule}])
+    # Created empty: a short stored array
+    mongo_db.faculty_timetable.insert_many([
+        {"_id": "f3", "name": "F3", "timetable": {"mon": [None]}},
+        {"_id": "f4", "name": "F4", "timetable": {}},
+    ])
+
+
+def cover(fac_id, lec_no):
+    insert_temp_records([build_temp_record(fac_id, MONDAY, "mon", lec_no, D1)])
+
+
+def test_class_view_follows_substitutions(client, mongo_db):
+    setup_d1(mongo_db)
+
+    view = client.get(CLASS_URL).get_json()
+    assert view["day"] == "Monday"
+    assert view["schedule"]["Time Slot 1"] == "f1"
+    assert view["substitutions"] == []
+
+    # Cached views are dropped when a temp record for the date is written
+    cover("f3", 0)
+    cover("f4", 0)
+    view = client.get(CLASS_URL).get_json()
+    assert view["schedule"]["Time Slot 1"] == "f4"
+    assert view["schedule"]["Time Slot 2"] == "f2"
+    assert [(s["faculty"], s["regular_faculty"]) for s in view["substitutions"]] == [
+        ("f3", "f1"), ("f4", "f1"),
+    ]
+
+
+def test_faculty_views(client, mongo_db):
+    setup_d1(mongo_db)
+    cover("f3", 0)
+
+    regular = client.get(f"/api/effective-timetable?date={MONDAY}&faculty=f1").get_json()
+    assert regular["timetable"][0] == "free"
+    assert regular["covered"][0]["covered_by"] == "f3"
+
+    substitute = client.get(f"/api/effective-timetable?date={MONDAY}&faculty=f3").get_json()
+    assert len(substitute["timetable"]) == 8
+    assert substitute["timetable"][0] == "CSE-D1-Sem4-Time Slot 1"
+    assert substitute["substitutions"][0]["class_id"] == D1
+
+
+def test_sunday_and_bad_requests(client, mongo_db):
+    setup_d1(mongo_db)
+
+    sunday = client.get("/api/effective-timetable?date=2026-10-18&faculty=f1").get_json()
+    assert sunday["day"] is None and sunday["timetable"] == []
+
+    assert client.get("/api/effective-timetable?date=19-10-2026&faculty=f1").status_code == 400
+    assert client.get(f"/api/effective-timetable?date={MONDAY}&faculty=nobody").status_code == 404
+    assert client.get(f"/api/effective-timetable?date={MONDAY}&sem=x&branch=CSE&class=D1").status_code == 400
@@ -0,0 +1,71 @@
+from datetime import date, timedelta
+
+from app.config import Config
+from app.services.faculty_load import (
+    count_substitutions,
+    load_score,
+    rank_by_load,
+    recent_substitutions,
+    recount_loads,
+    weekly_delta,
+    weekly_load
+)
+
+TODAY = date.today()
+
+
+def day(offset):
+    return (TODAY + timedelta(days=offset)).isoformat()
+
+
+def record(fac_id, offset):
+    return {"faculty_id": fac_id, "date": day(offset)}
+
+
+def test_weekly_load_and_delta():
+    assert weekly_load({"mon": ["c1", None, "free"], "tue": ["c2"], "x": "bad"}) == 2
+    assert weekly_delta([None, "c1"], ["c1", "c2"]) == 1
+
+
+def test_scores_only_count_the_window():
+    old = day(-Config.LOAD_WINDOW_DAYS - 1)
+    load = {"weekly": 4, "subs": {old: 5, day(0): 1, day(3): 1}}
+    assert recent_substitutions(load) == 2
+    assert load_score(load) == 2 * Config.LOAD_SUBSTITUTION_WEIGHT + 4
+    assert load_score(None) == 0
+
+
+def test_rank_by_load_keeps_order_on_ties():
+    loads = {"f1": {"weekly": 5}, "f2": {"weekly": 1}, "f3": {"weekly": 1}}
+    assert rank_by_load(["f1", "f3", "f2"], loads) == ["f3", "f2", "f1"]
+
+
+def test_count_substitutions_prunes_buckets(mongo_db):
+    stale = day(-Config.LOAD_WINDOW_DAYS - 5)
+    mongo_db.faculty_timetable.insert_many([
+        {"_id": "f1", "load": {"weekly": 2, "subs": {stale: 3, day(0): 1}}},
+        {"_id": "f2", "timetable": {}},
+    ])
+
+    count_substitutions([record("f1", 1), record("f2", 0), record("f2", 0)])
+    assert mongo_db.faculty_timetable.find_one({"_id": "f1"})["load"] == {
+        "weekly": 2, "subs": {day(0): 1, day(1): 1},
+    }
+    assert mongo_db.faculty_timetable.find_one({"_id": "f2"})["load"]["subs"] == {day(0): 2}
+
+    # Buckets that drop to zero go; removing an out-of-window record leaves nothing behind
+    count_substitutions([record("f1", 0), record("f1", -Config.LOAD_WINDOW_DAYS - 1)], sign=-1)
+    assert mongo_db.faculty_timetable.find_one({"_id": "f1"})["load"]["subs"] == {day(1): 1}
+
+
+def test_recount_loads(mongo_db):
+    mongo_db.faculty_timetable.insert_one({
+        "_id": "f1", "timetable": {"mon": ["c1", None, "c2"]},
+        "load": {"weekly": 9, "subs": {day(-1): 7}},
+    })
+    mongo_db.temp_faculty_timetable.insert_many([record("f1", 0), record("f1", 0), record("f1", 2)])
+
+    recount_loads()
+    assert mongo_db.faculty_timetable.find_one({"_id": "f1"})["load"] == {
+        "weekly": 2, "subs": {day(0): 2, day(2): 1},
+    }
@@ -0,0 +1,101 @@
+from datetime import date, timedelta
+
+import pytest
+
+from app.controllers import fetch_all_changes as controller
+from app.services.temp_assignments import build_temp_record
+
+TODAY = date(2026, 10, 19)
+
+
+class FrozenDate(date):
+    today_value = TODAY
+
+    @classmethod
+    def today(cls):
+        return cls.today_value
+
+
+@pytest.fixture
+def changes(client, mongo_db, monkeypatch):
+    monkeypatch.setattr(controller, "date", FrozenDate)
+    mongo_db.classwise_faculty.insert_many([
+        {"_id": "sem4_cse_d1", "sem": 4, "branch": "CSE", "class": "D1"},
+        {"_id": "sem6_ds_d1", "sem": 6, "branch": "DS", "class": "D1"},
+    ])
+
+    def at(days, fac_id, class_id, lec_no=0):
+        day = TODAY + timedelta(days=days)
+        return build_temp_record(fac_id, day.isoformat(), "mon", lec_no, class_id)
+
+    mongo_db.temp_faculty_timetable.insert_many([
+        at(0, "f1", "sem4_cse_d1", 0),
+        at(0, "f2", "sem6_ds_d1", 1),
+        at(-30, "f1", "sem4_cse_d1", 2),
+        at(30, "f3", "sem6_ds_d1", 3),
+    ])
+    return client
+
+
+def get(client, query="", **headers):
+    return client.get(f"/api/fetch-all-changes{query}", headers=headers)
+
+
+def test_grouped_view_defaults_to_a_window_around_today(changes):
+    body = get(changes).get_json()
+
+    assert body["total_changes"] == 2
+    assert (body["from"], body["to"]) == ("2026-10-12", "2026-10-26")
+    assert body["truncated"] is False
+    items = body["changes"]["Monday"]["Time Slot 1"]
+    assert items == [{"faculty": "f1", "date": "2026-10-19", "lec_no": 0,
+                      "assigned_to": "CSE-D1-Sem4-Time Slot 1"}]
+
+
+def test_explicit_range_and_filters(changes):
+    assert get(changes, "?from=2026-10-01").get_json()["total_changes"] == 3
+    assert get(changes, "?from=2026-01-01&to=2026-12-31").get_json()["total_changes"] == 4
+    assert get(changes, "?from=2026-01-01&to=2026-12-31&branch=DS").get_json()["total_changes"] == 2
+    assert get(changes, "?from=2026-01-01&to=2026-12-31&class=D1&sem=4").get_json()["total_changes"] == 2
+    assert get(changes, "?from=2026-01-01&to=2026-12-31&faculty=f3").get_json()["total_changes"] == 1
+
+
+@pytest.mark.parametrize("query", [
+    "?from=19-10-2026",
+    "?to=2026-13-01",
+    "?from=2026-10-20&to=2026-10-19",
+    "?sem=four",
+])
+def test_bad_filters(changes, query):
+    assert get(changes, query).status_code == 400
+
+
+def test_list_mode_pages_newest_first(changes):
+    first = get(changes, "?mode=list&limit=3").get_json()
+    assert first["count"] == 3
+    assert [item["faculty"] for item in first["changes"]] == ["f3", "f1", "f2"]
+
+    rest = get(changes, f"?mode=list&limit=3&cursor={first['next_cursor']}").get_json()
+    assert [item["faculty"] for item in rest["changes"]] == ["f1"]
+    assert rest["next_cursor"] is None
+
+
+def test_etag_follows_the_default_window(changes, monkeypatch):
+    etag = get(changes).headers["ETag"]
+    assert get(changes, **{"If-None-Match": etag}).status_code == 304
+
+    # Next day: same counters, different window
+    monkeypatch.setattr(FrozenDate, "today_value", TODAY + timedelta(days=1))
+    response = get(changes, **{"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.get_json()["from"] == "2026-10-13"
+
+
+def test_delete_temp_change(changes, mongo_db):
+    payload = {"faculty_id": "f1", "date": "2026-10-19", "day": "mon", "lec_no": 0,
+               "assigned_to": "CSE-D1-Sem4-Time Slot 1"}
+
+    response = changes.delete("/api/delete-temp-change", json=payload)
+    assert response.status_code == 200
+    assert mongo_db.temp_faculty_timetable.count_documents({"faculty_id": "f1"}) == 1
+    assert changes.delete("/api/delete-temp-change", json=payload).status_code == 404
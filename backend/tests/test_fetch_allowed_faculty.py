@@ -0,0 +1,30 @@
+from app.controllers.fetch_allowed_faculty import delete_allowed_faculty
+from app.services.class_schedule import empty_schedule
+from app.services.temp_assignments import build_temp_record
+from app.services.timetable_writer import save_class_timetables
+from app.services.versioning import class_scope, get_versions
+
+D1 = "sem4_cse_d1"
+
+
+def test_delete_allowed_faculty_removes_the_class(client, mongo_db):
+    schedule = empty_schedule()
+    schedule["Monday"]["Time Slot 1"] = "f1"
+    save_class_timetables([{"sem": 4, "branch": "CSE", "class": "D1", "schedule": schedule}])
+    mongo_db.temp_faculty_timetable.insert_one(build_temp_record("f2", "2026-10-19", "mon", 0, D1))
+    version = get_versions([class_scope(D1)])[class_scope(D1)]
+
+    payload = {"sem": 4, "branch": "CSE", "class": "D1"}
+    with client.application.test_request_context(json=payload):
+        response, status = delete_allowed_faculty()
+    assert status == 200
+    assert response.get_json()["temp_deleted"] == 1
+
+    assert mongo_db.class_timetable.find_one({"_id": D1}) is None
+    assert mongo_db.faculty_timetable.find_one({"_id": "f1"})["timetable"]["mon"][0] is None
+    assert mongo_db.temp_faculty_timetable.count_documents({}) == 0
+    assert get_versions([class_scope(D1)])[class_scope(D1)] > version
+    assert client.get("/api/fetchtimetable?sem=4&branch=CSE&class=D1").status_code == 404
+
+    with client.application.test_request_context(json=payload):
+        assert delete_allowed_faculty()[1] == 404
@@ -0,0 +1,105 @@
+import threading
+import time
+
+import pytest
+
+from app.config import Config
+from app.database import migrations
+from app.database.migrations import (
+    MIGRATIONS_COLLECTION,
+    MigrationLeaseLost,
+    acquire_lock,
+    current_version,
+    lock_holder,
+    migrate,
+    release_lock,
+    renew_lock
+)
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Three recording steps in place of the real ones."""
+    applied = []
+    monkeypatch.setattr(migrations, "MIGRATIONS", [
+        (n, f"step {n}", lambda db, n=n: applied.append(n)) for n in (1, 2, 3)
+    ])
+    monkeypatch.setattr(Config, "MIGRATION_LOCK_SECONDS", 1)
+    return applied
+
+
+def test_migrate_applies_pending_steps_once(mongo_db, steps):
+    assert migrate(mongo_db, target=2) == 2
+    assert migrate(mongo_db, target=3) == 3
+    assert migrate(mongo_db, target=3) == 3
+
+    assert steps == [1, 2, 3]
+    doc = mongo_db[MIGRATIONS_COLLECTION].find_one({"_id": "schema"})
+    assert [entry["version"] for entry in doc["applied"]] == [1, 2, 3]
+    assert lock_holder(mongo_db) is None
+
+
+def test_lock_is_exclusive_until_released(mongo_db):
+    assert acquire_lock(mongo_db, "a", 60)
+    assert not acquire_lock(mongo_db, "b", 60)
+    assert renew_lock(mongo_db, "a", 60)
+    assert not renew_lock(mongo_db, "b", 60)
+    release_lock(mongo_db, "a")
+    assert acquire_lock(mongo_db, "b", 60)
+
+
+def test_expired_lease_is_taken_over(mongo_db):
+    assert acquire_lock(mongo_db, "a", -1)
+    assert acquire_lock(mongo_db, "b", 60)
+    assert lock_holder(mongo_db)[0] == "b"
+
+
+def test_stolen_lease_aborts_before_recording(mongo_db, monkeypatch):
+    def steal(db):
+        db[MIGRATIONS_COLLECTION].update_one({"_id": "lock"}, {"$set": {"owner": "thief"}})
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", [(1, "steal", steal)])
+
+    with pytest.raises(MigrationLeaseLost):
+        migrate(mongo_db, target=1)
+    assert current_version(mongo_db) == 0
+
+
+def test_waiter_outlasts_a_long_migration(mongo_db, steps):
+    # The holder renews its 1s lease for well over twice its length
+    assert acquire_lock(mongo_db, "holder", 1)
+
+    def hold():
+        for _ in range(10):
+            time.sleep(0.3)
+            renew_lock(mongo_db, "holder", 1)
+        mongo_db[MIGRATIONS_COLLECTION].update_one(
+            {"_id": "schema"}, {"$set": {"version": 3}}, upsert=True
+        )
+        release_lock(mongo_db, "holder")
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    try:
+        assert migrate(mongo_db, target=3) == 3
+    finally:
+        thread.join()
+    assert steps == []
+
+
+def test_waiter_fails_on_a_stale_lease(mongo_db, steps):
+    # Held but never renewed (e.g. a clock far ahead on the holder)
+    assert acquire_lock(mongo_db, "holder", 3600)
+
+    with pytest.raises(RuntimeError, match="stale"):
+        migrate(mongo_db, target=3)
+    assert steps == []
+
+
+def test_ensure_schema_without_auto_migrate(mongo_db, steps, monkeypatch, caplog):
+    monkeypatch.setattr(Config, "AUTO_MIGRATE", False)
+    monkeypatch.setattr(migrations, "LATEST_VERSION", 3)
+
+    assert migrations.ensure_schema(mongo_db) == 0
+    assert steps == []
+    assert "run `flask migrate`" in caplog.text
@@ -0,0 +1,97 @@
+import time
+
+from app.services.occupancy_index import OccupancyIndex, slot_bit, timetable_masks
+
+
+def test_slot_bit_layout():
+    assert slot_bit("mon", 0) == 1
+    assert slot_bit("mon", 7) == 1 << 7
+    assert slot_bit("tue", 0) == 1 << 8
+    assert slot_bit("sat", 7) == 1 << 47
+
+
+def test_slot_bit_out_of_range():
+    assert slot_bit("sun", 0) == 0
+    assert slot_bit("mon", 8) == 0
+    assert slot_bit("mon", -1) == 0
+    assert slot_bit("mon", "1") == 0
+
+
+def test_timetable_masks():
+    valid, busy = timetable_masks({
+        "mon": [None, "sem4_cse_d1", "free"],
+        "tue": "not a list",
+        "sun": ["sem4_cse_d1"],
+    })
+    assert valid == 0b111
+    assert busy == 0b010
+
+
+def test_timetable_masks_empty():
+    assert timetable_masks(None) == (0, 0)
+
+
+def make_index(timetables):
+    index = OccupancyIndex(ttl=3600)
+    for fac_id, timetable in timetables.items():
+        index.set_timetable(fac_id, timetable)
+    return index
+
+
+def test_slot_values_from_set_timetable():
+    index = make_index({
+        "fac1": {"mon": ["sem4_cse_d1", None]},
+        "fac2": {"mon": [None]},
+    })
+    assert index.slot_values(["fac1", "fac2"], "mon", 0) == {"fac1": "sem4_cse_d1", "fac2": None}
+    # Short arrays leave the slot out instead of calling it free
+    assert index.slot_values(["fac1", "fac2"], "mon", 1) == {"fac1": None}
+    assert index.slot_value("fac1", "mon", 0) == "sem4_cse_d1"
+    assert index.slot_value("fac2", "mon", 0) is None
+
+
+def cache_date(index, selected_date):
+    # An empty overlay, as if the date had been loaded with no temp records
+    index._temp[selected_date] = {"masks": {}, "loaded_at": time.monotonic()}
+
+
+def test_temp_overlay_masks_free_slot():
+    index = make_index({"fac1": {"mon": [None, None]}, "fac2": {"mon": [None, None]}})
+    cache_date(index, "2026-10-19")
+    cache_date(index, "2026-10-26")
+
+    assert index.free_faculty(["fac2", "fac1"], "mon", 1, "2026-10-19") == ["fac2", "fac1"]
+    index.add_temp("fac1", "2026-10-19", "mon", 1)
+    assert index.free_faculty(["fac2", "fac1"], "mon", 1, "2026-10-19") == ["fac2"]
+    assert index.is_free("fac1", "mon", 0, "2026-10-19")
+    # Other dates are untouched
+    assert index.is_free("fac1", "mon", 1, "2026-10-26")
+
+
+def test_busy_and_missing_slots_are_not_free():
+    index = make_index({"fac1": {"mon": ["sem4_cse_d1"]}})
+    cache_date(index, "2026-10-19")
+    assert not index.is_free("fac1", "mon", 0, "2026-10-19")
+    assert not index.is_free("fac1", "mon", 1, "2026-10-19")
+    assert index.free_faculty(["fac1"], "sun", 0, "2026-10-19") == []
+
+
+def test_add_temp_ignores_uncached_date():
+    index = make_index({"fac1": {"mon": [None]}})
+    index.add_temp("fac1", "2026-10-19", "mon", 0)
+    assert "2026-10-19" not in index._temp
+
+
+def test_set_timetable_keeps_info_and_renames():
+    index = make_index({"fac1": {"mon": [None]}})
+    assert index.faculty_info("fac1") == {"name": "fac1", "department": "N/A"}
+    index.set_timetable("fac1", {"mon": ["sem4_cse_d1"]}, name="Dr. A")
+    assert index.faculty_info("fac1")["name"] == "Dr. A"
+    assert index.slot_value("fac1", "mon", 0) == "sem4_cse_d1"
+
+
+def test_unknown_faculty_is_never_free():
+    index = make_index({"fac1": None})
+    cache_date(index, "2026-10-19")
+    assert not index.is_free("fac1", "mon", 0, "2026-10-19")
+    assert index.slot_values(["fac1"], "mon", 0) == {}
@@ -0,0 +1,65 @@
+import pytest
+
+from app.services.slot_codec import (
+    FREE_SLOT,
+    LEGACY_FREE,
+    class_ref,
+    decode_slot,
+    encode_legacy_slot,
+    encode_legacy_timetable,
+    is_free,
+    parse_legacy_slot
+)
+
+D1 = class_ref(4, "CSE(AIML)", "D1")
+
+
+def test_class_ref():
+    assert D1.class_id == "sem4_cseaiml_d1"
+    assert D1.label == "CSE(AIML)-D1-Sem4"
+    assert D1.slot_string(2) == "CSE(AIML)-D1-Sem4-Time Slot 3"
+
+
+def test_is_free():
+    assert is_free(FREE_SLOT)
+    assert is_free(LEGACY_FREE)
+    assert not is_free("sem4_cseaiml_d1")
+
+
+def test_decode_slot():
+    refs = {D1.class_id: D1}
+    assert decode_slot(None, 0, refs) == "free"
+    assert decode_slot("free", 0, refs) == "free"
+    assert decode_slot(D1.class_id, 0, refs) == "CSE(AIML)-D1-Sem4-Time Slot 1"
+
+
+def test_parse_legacy_slot():
+    ref, lec_no = parse_legacy_slot("CSE(AIML)-D1-Sem4-Time Slot 8")
+    assert ref == D1
+    assert lec_no == 7
+    assert parse_legacy_slot("CSE-D1") is None
+    assert parse_legacy_slot(None) is None
+
+
+def test_encode_legacy_slot():
+    assert encode_legacy_slot(None) is FREE_SLOT
+    assert encode_legacy_slot("free") is FREE_SLOT
+    assert encode_legacy_slot("CSE(AIML)-D1-Sem4-Time Slot 3") == D1.class_id
+
+
+def test_encode_legacy_slot_rejects_garbage():
+    with pytest.raises(ValueError):
+        encode_legacy_slot("Monday")
+
+
+def test_round_trip():
+    refs = {D1.class_id: D1}
+    for lec_no in range(8):
+        legacy = decode_slot(D1.class_id, lec_no, refs)
+        assert encode_legacy_slot(legacy) == D1.class_id
+
+
+def test_encode_legacy_timetable():
+    assert encode_legacy_timetable({
+        "mon": ["free", "CSE(AIML)-D1-Sem4-Time Slot 2"],
+    }) == {"mon": [None, D1.class_id]}
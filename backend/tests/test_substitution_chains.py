@@ -0,0 +1,86 @@
+from app.config import Config
+from app.services.slot_codec import class_ref
+from app.services.substitution_chains import (
+    BUSY,
+    FIXED,
+    FREE,
+    SlotSnapshot,
+    chain_cost,
+    find_chains,
+    validate_chain
+)
+
+
+def make_snapshot(loads=None):
+    # A needs a cover. f1 teaches B now, f6 teaches C, which f7 could take.
+    classes = {label: class_ref(4, "CSE", label) for label in ["A", "B", "C"]}
+    allowed = {
+        "A": ["f0", "f1", "f2", "f6"],
+        "B": ["f3", "f4", "f5"],
+        "C": ["f7"],
+    }
+    state = {
+        "f0": (FREE, None),
+        "f1": (BUSY, "B"),
+        "f2": (FIXED, "B"),
+        "f3": (FREE, None),
+        "f4": (FREE, None),
+        "f5": (BUSY, "A"),
+        "f6": (BUSY, "C"),
+        "f7": (FREE, None),
+    }
+    return SlotSnapshot(
+        "2026-10-19", "mon", 2, classes, allowed, state, {}, loads=loads
+    )
+
+
+def faculty_of(chain):
+    return [step["faculty_id"] for step in chain]
+
+
+def test_find_chains():
+    chains, timed_out = find_chains(make_snapshot(), "A", max_depth=3, time_budget_ms=1000, limit=10)
+
+    assert not timed_out
+    # Direct replacements (f0) are not chains, fixed faculty (f2) never move,
+    # and f5 would move back into A
+    assert sorted(map(faculty_of, chains)) == [["f1", "f3"], ["f1", "f4"], ["f6", "f7"]]
+    assert chains[0][0] == {"faculty_id": "f1", "from_class": "B", "to_class": "A"}
+    assert chains[0][1]["from_class"] is None
+
+
+def test_find_chains_max_depth():
+    chains, _ = find_chains(make_snapshot(), "A", max_depth=1, time_budget_ms=1000, limit=10)
+    assert chains == []
+
+
+def test_find_chains_limit():
+    chains, _ = find_chains(make_snapshot(), "A", max_depth=3, time_budget_ms=1000, limit=1)
+    assert len(chains) == 1
+
+
+def test_find_chains_prefers_lighter_faculty():
+    loads = {"f3": {"weekly": 30}, "f4": {"weekly": 2}, "f7": {"weekly": 10}}
+    chains, _ = find_chains(make_snapshot(loads), "A", max_depth=3, time_budget_ms=1000, limit=10)
+    assert list(map(faculty_of, chains)) == [["f1", "f4"], ["f6", "f7"], ["f1", "f3"]]
+
+
+def test_chain_cost():
+    snapshot = make_snapshot({"f3": {"weekly": 5}})
+    chain = [{"faculty_id": "f1"}, {"faculty_id": "f3"}]
+    assert chain_cost(snapshot, chain) == 2 * Config.REARRANGE_HOP_COST + 5
+
+
+def test_validate_chain():
+    snapshot = make_snapshot()
+    steps = validate_chain(snapshot, "A", ["f1", "f4"])
+    assert faculty_of(steps) == ["f1", "f4"]
+    assert steps[1] == {"faculty_id": "f4", "from_class": None, "to_class": "B"}
+
+
+def test_validate_chain_rejects_stale_chains():
+    snapshot = make_snapshot()
+    assert validate_chain(snapshot, "A", ["f0"]) is None
+    assert validate_chain(snapshot, "A", ["f1", "f1"]) is None
+    assert validate_chain(snapshot, "A", ["f2", "f3"]) is None
+    assert validate_chain(snapshot, "A", ["f1", "f7"]) is None
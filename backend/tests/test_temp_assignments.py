@@ -0,0 +1,55 @@
+from datetime import date
+
+import pytest
+
+from app.database.migrations import TEMP_RESERVATION_INDEX, create_indexes
+from app.services.temp_assignments import SlotTakenError, build_temp_record, insert_temp_records
+from app.services.versioning import TEMP_SCOPE, get_versions
+
+D1 = "sem4_cse_d1"
+D2 = "sem4_cse_d2"
+
+
+@pytest.fixture
+def temp_col(mongo_db):
+    create_indexes(mongo_db, "temp_faculty_timetable", [TEMP_RESERVATION_INDEX])
+    mongo_db.faculty_timetable.insert_many([{"_id": "f1"}, {"_id": "f2"}])
+    return mongo_db.temp_faculty_timetable
+
+
+def test_insert_reserves_and_counts(temp_col, mongo_db):
+    # Buckets outside the load window are pruned on write: book today
+    today = date.today().isoformat()
+    insert_temp_records([build_temp_record("f1", today, "mon", 0, D1)])
+
+    assert temp_col.count_documents({}) == 1
+    assert mongo_db.faculty_timetable.find_one({"_id": "f1"})["load"]["subs"] == {today: 1}
+    assert get_versions([TEMP_SCOPE])[TEMP_SCOPE] == 1
+
+
+def test_second_booking_of_a_slot_is_rejected(temp_col):
+    insert_temp_records([build_temp_record("f1", "2026-10-19", "mon", 0, D1)])
+
+    with pytest.raises(SlotTakenError) as caught:
+        insert_temp_records([build_temp_record("f1", "2026-10-19", "mon", 0, D2)])
+
+    assert caught.value.record["class_id"] == D2
+    assert [rec["class_id"] for rec in temp_col.find()] == [D1]
+    # Another lecture or another date is still free
+    insert_temp_records([build_temp_record("f1", "2026-10-19", "mon", 1, D2)])
+    insert_temp_records([build_temp_record("f1", "2026-10-26", "mon", 0, D2)])
+    assert temp_col.count_documents({}) == 3
+
+
+def test_batch_is_all_or_nothing(temp_col, mongo_db):
+    insert_temp_records([build_temp_record("f2", "2026-10-19", "mon", 3, D1)])
+
+    with pytest.raises(SlotTakenError) as caught:
+        insert_temp_records([
+            build_temp_record("f1", "2026-10-19", "mon", 2, D2),
+            build_temp_record("f2", "2026-10-19", "mon", 3, D2),
+        ])
+
+    assert caught.value.record["faculty_id"] == "f2"
+    assert temp_col.count_documents({"class_id": D2}) == 0
+    assert "load" not in mongo_db.faculty_timetable.find_one({"_id": "f1"})
@@ -0,0 +1,49 @@
+from app.services.timetable_diff import diff_assignments, slot_update
+
+
+def test_diff_assignments():
+    old = {
+        "fac1": {("mon", 0): "c1", ("tue", 1): "c1"},
+        "fac2": {("wed", 2): "c1"},
+    }
+    new = {
+        "fac1": {("mon", 0): "c1", ("tue", 2): "c1"},
+        "fac3": {("wed", 2): "c1"},
+    }
+    additions, removals = diff_assignments(old, new)
+
+    assert additions == {
+        "fac1": {("tue", 2): "c1"},
+        "fac3": {("wed", 2): "c1"},
+    }
+    assert removals == {
+        "fac1": {("tue", 1): "c1"},
+        "fac2": {("wed", 2): "c1"},
+    }
+
+
+def test_diff_assignments_unchanged():
+    same = {"fac1": {("mon", 0): "c1"}}
+    assert diff_assignments(same, same) == ({}, {})
+
+
+def test_diff_assignments_changed_value_is_an_addition():
+    additions, removals = diff_assignments(
+        {"fac1": {("mon", 0): "c1"}},
+        {"fac1": {("mon", 0): "c2"}}
+    )
+    assert additions == {"fac1": {("mon", 0): "c2"}}
+    assert removals == {}
+
+
+def test_slot_update_positional():
+    stored = {"mon": [None] * 8}
+    assert slot_update(stored, {("mon", 3): "c1"}, 8) == {"timetable.mon.3": "c1"}
+
+
+def test_slot_update_pads_short_days():
+    update = slot_update({"mon": ["c2"]}, {("mon", 2): "c1", ("tue", 0): "c1"}, 4)
+    assert update == {
+        "timetable.mon": ["c2", None, "c1", None],
+        "timetable.tue": ["c1", None, None, None],
+    }
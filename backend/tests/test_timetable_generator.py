@@ -0,0 +1,153 @@
+import pytest
+
+from app.services import timetable_generator
+from app.services.class_schedule import DAYS, TOTAL_SLOTS
+from app.services.timetable_generator import (
+    GenerationError,
+    _Solver,
+    bit_for,
+    bit_position,
+    day_mask,
+    generate_timetables,
+    iter_bits,
+    parse_requirements,
+    pick_faculty
+)
+
+WEEK = (1 << (len(DAYS) * TOTAL_SLOTS)) - 1
+
+
+def test_bitsets():
+    assert bit_for(0, 0) == 1
+    assert bit_for(1, 0) == 1 << TOTAL_SLOTS
+    assert day_mask(1) == 0xFF << TOTAL_SLOTS
+    assert list(iter_bits(0b1010)) == [0b10, 0b1000]
+    for day_idx in range(len(DAYS)):
+        for slot_idx in range(TOTAL_SLOTS):
+            assert bit_position(bit_for(day_idx, slot_idx)) == (day_idx, slot_idx)
+
+
+def test_parse_requirements():
+    requirements = parse_requirements([{
+        "class": "D1",
+        "allowed_faculty": ["f1", "f2"],
+        "requirements": [
+            {"subject": "DBMS", "faculty": "f1", "lectures": 3},
+            {"subject": "OS", "lectures": 2},
+        ],
+    }])
+    assert requirements == [
+        ("D1", "DBMS", ["f1"], 3),
+        ("D1", "OS", ["f1", "f2"], 2),
+    ]
+
+
+@pytest.mark.parametrize("classes", [
+    [],
+    [{"requirements": []}],
+    [{"class": "D1"}, {"class": "D1"}],
+    [{"class": "D1", "requirements": [{"subject": "OS", "lectures": 1}]}],
+    [{"class": "D1", "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 0}]}],
+    [{"class": "D1", "allowed_faculty": ["f2"],
+      "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 1}]}],
+])
+def test_parse_requirements_rejects(classes):
+    with pytest.raises(GenerationError):
+        parse_requirements(classes)
+
+
+def test_pick_faculty_prefers_spare_capacity():
+    busy = {"f1": day_mask(0), "f2": 0}
+    chosen, demand = pick_faculty(
+        [("D1", "OS", ["f1", "f2"], 10), ("D2", "OS", ["f1", "f2"], 3)],
+        busy,
+        day_mask(0) | day_mask(1)
+    )
+    # f2 has 16 open slots and f1 only 8, but D1 leaves f2 with 6 spare
+    assert chosen == [("D1", "OS", "f2", 10), ("D2", "OS", "f1", 3)]
+    assert demand == {"f2": 10, "f1": 3}
+
+
+def test_solver_places_without_clashes():
+    units = [("D1", "OS", "f1")] * 4 + [("D2", "OS", "f1")] * 4
+    solver = _Solver(units, {"f1": 0}, day_mask(0) | day_mask(1), max_per_day=2)
+
+    assert solver.solve() == []
+    d1 = set(solver.placed["D1"])
+    d2 = set(solver.placed["D2"])
+    assert len(d1) == len(d2) == 4
+    assert not d1 & d2
+    # At most max_per_day lectures of a subject per day
+    assert solver.day_counts[("D1", "OS")] == [2, 2, 0, 0, 0, 0]
+
+
+def test_solver_respects_existing_busy():
+    open_mask = day_mask(0)
+    solver = _Solver([("D1", "OS", "f1")] * 2, {"f1": open_mask & ~bit_for(0, 5)}, open_mask, 8)
+    assert solver.solve() == [("D1", "OS", "f1")]
+    assert list(solver.placed["D1"]) == [bit_for(0, 5)]
+
+
+def test_solver_repairs_by_moving_a_lecture():
+    # f2 can only teach in slot 0, which the greedy pass gave to f1
+    open_mask = bit_for(0, 0) | bit_for(0, 1)
+    units = [("D1", "OS", "f1"), ("D1", "DBMS", "f2")]
+    solver = _Solver(units, {"f2": bit_for(0, 1)}, open_mask, max_per_day=2)
+
+    assert solver.solve() == []
+    assert solver.placed["D1"] == {
+        bit_for(0, 0): ("DBMS", "f2"),
+        bit_for(0, 1): ("OS", "f1"),
+    }
+
+
+def test_generate_timetables(monkeypatch):
+    monkeypatch.setattr(
+        timetable_generator, "load_existing_busy",
+        lambda faculty_ids, own_class_ids: {f: 0 for f in faculty_ids}
+    )
+    result = generate_timetables(4, "CSE", [
+        {"class": "D1", "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 3}]},
+        {"class": "D2", "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 3}]},
+    ], days=["Monday"], slots_per_day=6, max_per_day=3, time_limit_ms=100)
+
+    assert result["unplaced"] == []
+    d1 = result["schedules"]["D1"]["Monday"]
+    d2 = result["schedules"]["D2"]["Monday"]
+    taken_d1 = {slot for slot, fac in d1.items() if fac == "f1"}
+    taken_d2 = {slot for slot, fac in d2.items() if fac == "f1"}
+    assert len(taken_d1) == len(taken_d2) == 3
+    assert not taken_d1 & taken_d2
+    assert result["subjects"]["D1"]["Monday"][next(iter(taken_d1))] == "OS"
+
+
+def test_generate_timetables_reports_unplaced(monkeypatch):
+    monkeypatch.setattr(
+        timetable_generator, "load_existing_busy",
+        lambda faculty_ids, own_class_ids: {f: 0 for f in faculty_ids}
+    )
+    result = generate_timetables(4, "CSE", [
+        {"class": "D1", "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 2}]},
+        {"class": "D2", "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 2}]},
+    ], days=["Monday"], slots_per_day=3, max_per_day=3, time_limit_ms=50)
+
+    assert len(result["unplaced"]) == 1
+
+
+def test_generate_timetables_rejects_overfull_class():
+    with pytest.raises(GenerationError):
+        generate_timetables(4, "CSE", [
+            {"class": "D1", "requirements": [{"subject": "OS", "faculty": "f1", "lectures": 9}]},
+        ], days=["Monday"])
+
+
+@pytest.mark.parametrize("commit", ["false", 1])
+def test_route_rejects_non_boolean_commit(client, commit):
+    response = client.post("/api/generate-timetable", json={
+        "sem": 4,
+        "branch": "CSE",
+        "classes": [{"class": "D1", "requirements": []}],
+        "commit": commit,
+    })
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "commit must be true or false"
@@ -0,0 +1,103 @@
+import io
+
+import pytest
+
+from app.config import Config
+from app.services.timetable_import import (
+    ImportModel,
+    TimetableImportError,
+    iter_csv_rows,
+    parse_slot
+)
+
+HEADER = "sem,branch,class,day,time_slot,faculty\n"
+
+
+def rows(text):
+    return list(iter_csv_rows(io.BytesIO((HEADER + text).encode())))
+
+
+def load(text, branches=("CSE",)):
+    model = ImportModel(list(branches))
+    for row_no, row in rows(text):
+        model.add(row_no, row)
+    return model
+
+
+def test_parse_slot():
+    assert parse_slot("Time Slot 3") == 2
+    assert parse_slot("time slot 8") == 7
+    assert parse_slot("1") == 0
+    assert parse_slot("1.0") == 0
+    assert parse_slot("9") is None
+    assert parse_slot("0") is None
+    assert parse_slot("first") is None
+
+
+def test_iter_csv_rows():
+    assert rows("4,CSE,D1,Monday,1,f1\n,,,,,\n4,CSE,D1,tue,2,\n") == [
+        (2, {"sem": "4", "branch": "CSE", "class": "D1", "day": "Monday",
+             "time_slot": "1", "faculty": "f1"}),
+        (4, {"sem": "4", "branch": "CSE", "class": "D1", "day": "tue",
+             "time_slot": "2", "faculty": ""}),
+    ]
+
+
+def test_iter_csv_rows_needs_columns():
+    with pytest.raises(TimetableImportError):
+        list(iter_csv_rows(io.BytesIO(b"sem,branch\n4,CSE\n")))
+    with pytest.raises(TimetableImportError):
+        list(iter_csv_rows(io.BytesIO(b"")))
+
+
+def test_model_builds_schedules():
+    model = load(
+        "4,CSE,D1,Monday,Time Slot 1,f1\n"
+        "4,CSE,D1,mon,2,free\n"
+        "4,CSE,D2,Tuesday,1,f1\n"
+    )
+    assert model.errors == [] and model.conflicts == []
+    assert sorted(model.classes) == ["sem4_cse_d1", "sem4_cse_d2"]
+    d1 = model.classes["sem4_cse_d1"]
+    assert d1["schedule"]["Monday"] == {"Time Slot 1": "f1"}
+    assert d1["schedule"]["Tuesday"] == {}
+
+
+@pytest.mark.parametrize("line, error", [
+    ("9,CSE,D1,Monday,1,f1", "Invalid semester"),
+    ("x,CSE,D1,Monday,1,f1", "Invalid semester"),
+    ("4,ECE,D1,Monday,1,f1", "Invalid branch"),
+    ("4,CSE,,Monday,1,f1", "Missing class"),
+    ("4,CSE,D1,Sunday,1,f1", "Invalid day: 'Sunday'"),
+    ("4,CSE,D1,Monday,12,f1", "Invalid time slot: '12'"),
+])
+def test_model_rejects_rows(line, error):
+    model = load(line + "\n")
+    assert model.errors == [{"row": 2, "error": error}]
+    assert model.classes == {}
+
+
+def test_model_rejects_repeated_slot():
+    model = load("4,CSE,D1,Monday,1,f1\n4,CSE,D1,mon,Time Slot 1,f2\n")
+    assert model.errors == [{"row": 3, "error": "Monday Time Slot 1 already given on row 2"}]
+
+
+def test_model_reports_double_booking():
+    model = load("4,CSE,D1,Monday,1,f1\n4,CSE,D2,Monday,1,f1\n")
+    assert model.conflicts == [{
+        "row": 3,
+        "other_row": 2,
+        "faculty": "f1",
+        "day": "mon",
+        "time_slot": "Time Slot 1",
+        "existing_lecture": "CSE-D1-Sem4-Time Slot 1",
+        "new_lecture": "CSE-D2-Sem4-Time Slot 1",
+    }]
+    assert model.classes["sem4_cse_d2"]["schedule"]["Monday"] == {}
+    assert model.row_for({"faculty": "f1", "day": "mon", "time_slot": "Time Slot 1"}) == 2
+
+
+def test_model_row_limit(monkeypatch):
+    monkeypatch.setattr(Config, "IMPORT_MAX_ROWS", 1)
+    with pytest.raises(TimetableImportError):
+        load("4,CSE,D1,Monday,1,f1\n4,CSE,D1,Monday,2,f1\n")
@@ -0,0 +1,153 @@
+from app.services.class_schedule import empty_schedule
+from app.services.timetable_writer import save_class_timetables
+from app.services.versioning import get_versions, class_scope
+
+D1 = "sem4_cse_d1"
+D2 = "sem4_cse_d2"
+
+
+def schedule(*cells):
+    """cells: (day name, time slot number, faculty)"""
+    result = empty_schedule()
+    for day_name, slot, faculty in cells:
+        result[day_name][f"Time Slot {slot}"] = faculty
+    return result
+
+
+def save(class_name, *cells, **kwargs):
+    return save_class_timetables(
+        [{"sem": 4, "branch": "CSE", "class": class_name, "schedule": schedule(*cells)}],
+        **kwargs
+    )
+
+
+def test_save_writes_every_collection(mongo_db):
+    result = save("D1", ("Monday", 1, "f1"), ("Monday", 3, "f2"))
+
+    assert result["conflicts"] == []
+    assert sorted(result["faculty_updated"]) == ["f1", "f2"]
+
+    f1 = mongo_db.faculty_timetable.find_one({"_id": "f1"})
+    assert f1["timetable"]["mon"] == [D1, None, None, None, None, None, None, None]
+    assert f1["load"]["weekly"] == 1
+
+    classwise = mongo_db.classwise_faculty.find_one({"_id": D1})
+    assert sorted(classwise["allowed_faculty"]) == ["f1", "f2"]
+    stored = mongo_db.class_timetable.find_one({"_id": D1})["schedule"]
+    assert stored["Monday"]["Time Slot 3"] == "f2"
+
+    versions = get_versions(["classwise_faculty", "faculty_timetable", class_scope(D1)])
+    assert all(version == 1 for version in versions.values())
+
+
+def test_save_reports_conflicts_and_writes_nothing(mongo_db):
+    save("D1", ("Monday", 1, "f1"))
+    result = save("D2", ("Monday", 1, "f1"), ("Tuesday", 2, "f3"))
+
+    assert result["faculty_updated"] == []
+    assert result["conflicts"] == [{
+        "faculty": "f1",
+        "day": "mon",
+        "time_slot": "Time Slot 1",
+        "existing_lecture": "CSE-D1-Sem4-Time Slot 1",
+        "new_lecture": "CSE-D2-Sem4-Time Slot 1",
+    }]
+    assert mongo_db.classwise_faculty.find_one({"_id": D2}) is None
+    assert mongo_db.faculty_timetable.find_one({"_id": "f3"}) is None
+
+
+def test_save_dry_run_writes_nothing(mongo_db):
+    result = save("D1", ("Monday", 1, "f1"), dry_run=True)
+    assert result == {"class_ids": [D1], "faculty_updated": ["f1"], "conflicts": []}
+    assert mongo_db.faculty_timetable.count_documents({}) == 0
+    assert mongo_db.class_timetable.count_documents({}) == 0
+
+
+def test_resave_only_moves_changed_slots(mongo_db):
+    save("D1", ("Monday", 1, "f1"), ("Monday", 2, "f2"))
+    save("D2", ("Tuesday", 1, "f1"))
+
+    result = save("D1", ("Monday", 2, "f1"), ("Monday", 3, "f3"))
+
+    assert result["conflicts"] == []
+    assert sorted(result["faculty_updated"]) == ["f1", "f2", "f3"]
+    f1 = mongo_db.faculty_timetable.find_one({"_id": "f1"})
+    assert f1["timetable"]["mon"][:3] == [None, D1, None]
+    # D2's lecture is left alone
+    assert f1["timetable"]["tue"][0] == D2
+    assert f1["load"]["weekly"] == 2
+
+    f2 = mongo_db.faculty_timetable.find_one({"_id": "f2"})
+    assert f2["timetable"]["mon"][1] is None
+    assert f2["load"]["weekly"] == 0
+
+
+def test_resave_unchanged_schedule_touches_no_faculty(mongo_db):
+    save("D1", ("Monday", 1, "f1"))
+    assert save("D1", ("Monday", 1, "f1"))["faculty_updated"] == []
+
+
+def test_move_within_the_batch_is_not_a_conflict(mongo_db):
+    save("D1", ("Monday", 1, "f1"))
+    # f1 leaves D1's slot 1 in the same save that gives it to D2
+    result = save_class_timetables([
+        {"sem": 4, "branch": "CSE", "class": "D1", "schedule": schedule()},
+        {"sem": 4, "branch": "CSE", "class": "D2", "schedule": schedule(("Monday", 1, "f1"))},
+    ])
+    assert result["conflicts"] == []
+    f1 = mongo_db.faculty_timetable.find_one({"_id": "f1"})
+    assert f1["timetable"]["mon"][0] == D2
+
+
+def test_delete_frees_slots_and_purges_temp_records(mongo_db):
+    from app.services.temp_assignments import build_temp_record
+    from app.services.timetable_writer import delete_class_timetables
+
+    save("D1", ("Monday", 1, "f1"), ("Monday", 2, "f2"))
+    save("D2", ("Tuesday", 1, "f1"))
+    mongo_db.temp_faculty_timetable.insert_many([
+        build_temp_record("f3", "2026-10-19", "mon", 0, D1),
+        build_temp_record("f3", "2026-10-20", "tue", 0, D2),
+    ])
+
+    class_doc = mongo_db.classwise_faculty.find_one({"_id": D1})
+    result = delete_class_timetables([class_doc])
+
+    assert result["class_ids"] == [D1]
+    assert sorted(result["faculty_updated"]) == ["f1", "f2"]
+    assert result["temp_deleted"] == 1
+
+    f1 = mongo_db.faculty_timetable.find_one({"_id": "f1"})
+    assert f1["timetable"]["mon"][0] is None
+    assert f1["timetable"]["tue"][0] == D2
+    assert f1["load"]["weekly"] == 1
+    assert mongo_db.classwise_faculty.find_one({"_id": D1}) is None
+    assert mongo_db.class_timetable.find_one({"_id": D1}) is None
+    assert [rec["class_id"] for rec in mongo_db.temp_faculty_timetable.find()] == [D2]
+    assert get_versions([class_scope(D1)])[class_scope(D1)] == 2
+
+
+def test_delete_via_route(client, mongo_db):
+    save("D1", ("Monday", 1, "f1"))
+
+    response = client.delete("/api/timetable", data={"sem": "4", "branch": "CSE", "class": "D1"})
+    assert response.status_code == 200
+    assert response.get_json()["faculty_updated"] == ["f1"]
+
+    response = client.get("/api/fetchtimetable?sem=4&branch=CSE&class=D1")
+    assert response.status_code == 404
+    response = client.delete("/api/timetable", data={"sem": "4", "branch": "CSE", "class": "D1"})
+    assert response.status_code == 404
+
+
+def test_delete_reaches_scheduled_faculty_outside_allowed(mongo_db):
+    from app.services.timetable_writer import delete_class_timetables
+
+    save("D1", ("Monday", 1, "f1"), ("Monday", 2, "f2"))
+    # allowed_faculty edited on its own, dropping f2
+    mongo_db.classwise_faculty.update_one({"_id": D1}, {"$set": {"allowed_faculty": ["f1"]}})
+
+    delete_class_timetables([mongo_db.classwise_faculty.find_one({"_id": D1})])
+
+    f2 = mongo_db.faculty_timetable.find_one({"_id": "f2"})
+    assert f2["timetable"]["mon"][1] is None
@@ -0,0 +1,53 @@
+from app.services.class_schedule import empty_schedule
+from app.services.timetable_writer import save_class_timetables
+from app.services.versioning import bump, class_scope, get_versions, make_etag
+
+D1_URL = "/api/fetchtimetable?sem=4&branch=CSE&class=D1"
+
+
+def save_d1(faculty):
+    schedule = empty_schedule()
+    schedule["Monday"]["Time Slot 1"] = faculty
+    save_class_timetables([{"sem": 4, "branch": "CSE", "class": "D1", "schedule": schedule}])
+
+
+def test_bump_and_get_versions(mongo_db):
+    bump("a", "b", "a")
+    bump("a")
+    assert get_versions(["a", "b", "c"]) == {"a": 2, "b": 1, "c": 0}
+
+
+def test_make_etag_changes_with_counter_and_variant(mongo_db):
+    first = make_etag(["a"], "/x")
+    assert make_etag(["a"], "/x") == first
+    assert make_etag(["a"], "/y") != first
+    bump("a")
+    assert make_etag(["a"], "/x") != first
+
+
+def test_conditional_get(client):
+    save_d1("f1")
+
+    response = client.get(D1_URL)
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    response = client.get(D1_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+    # Another class changing leaves the tag alone
+    bump(class_scope("sem4_cse_d2"))
+    assert client.get(D1_URL, headers={"If-None-Match": etag}).status_code == 304
+
+    save_d1("f2")
+    response = client.get(D1_URL, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["schedule"]["Monday"]["Time Slot 1"] == "f2"
+
+
+def test_errors_are_not_tagged(client):
+    response = client.get(D1_URL)
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
@@ -400,6 +400,7 @@ export default function ReplaceLecture() {
         ...formData,
         primary_faculty_id: selectedOption.primary_faculty.id,
         secondary_faculty_id: selectedOption.secondary_faculty.id,
+        chain: selectedOption.chain?.map((step) => step.faculty_id),
       });
 
       if (response.data.success) {
@@ -58,13 +58,25 @@ export default function ViewChanges() {
     setTimeout(() => setAlert(null), 5000);
   };
 
-  const fetchChanges = async () => {
-    setIsLoading(true);
+  // quiet: background refresh after a live update, no spinner or alert
+  const fetchChanges = async (quiet = false) => {
+    if (!quiet) setIsLoading(true);
     setError("");
     setSuccess("");
 
     try {
-      const response = await api.get("/api/fetch-all-changes");
+      // Only this week's window: the server filters and groups by date
+      const from = new Date();
+      from.setDate(from.getDate() - 7);
+      const to = new Date();
+      to.setDate(to.getDate() + 7);
+
+      const response = await api.get("/api/fetch-all-changes", {
+        params: {
+          from: from.toISOString().split("T")[0],
+          to: to.toISOString().split("T")[0],
+        },
+      });
 
       if (response.data.changes) {
         setChanges(response.data.changes);
@@ -74,7 +86,7 @@ export default function ViewChanges() {
         setAllChanges(flattenedChanges);
         
         // Show success message using Alert component
-        showAlert(
+        if (!quiet) showAlert(
           "Temporary changes loaded",
           `${flattenedChanges.length} temporary changes loaded successfully`,
           "success"
@@ -380,6 +392,48 @@ export default function ViewChanges() {
     fetchChanges();
   }, []);
 
+  // Live updates: the server pushes each new / deleted substitution, so
+  // the list is refetched only when something changed instead of polled.
+  // EventSource reconnects (and resumes) on its own, except after an error
+  // response such as the 503 sent when the server has too many streams
+  // open; then we refetch and try again later.
+  useEffect(() => {
+    if (typeof EventSource === "undefined") return;
+
+    let source = null;
+    let timer = null;
+    let retryTimer = null;
+
+    const connect = () => {
+      source = new EventSource(
+        `${import.meta.env.VITE_BASEURL || ""}/api/changes/stream`
+      );
+
+      source.onmessage = () => {
+        // Several events usually arrive together (swaps, chains): one refetch
+        clearTimeout(timer);
+        timer = setTimeout(() => fetchChanges(true), 500);
+      };
+
+      source.onerror = () => {
+        if (source.readyState !== EventSource.CLOSED) return;
+        clearTimeout(retryTimer);
+        retryTimer = setTimeout(() => {
+          fetchChanges(true);
+          connect();
+        }, 15000);
+      };
+    };
+
+    connect();
+
+    return () => {
+      clearTimeout(timer);
+      clearTimeout(retryTimer);
+      source.close();
+    };
+  }, []);
+
   const groupedChanges = filterAndGroupChanges();
   const totalFilteredChanges = Object.values(groupedChanges).reduce(
     (total, group) => total + group.length,
@@ -498,7 +552,7 @@ export default function ViewChanges() {
                 </p>
               </div>
               <button
-                onClick={fetchChanges}
+                onClick={() => fetchChanges()}
                 disabled={isLoading}
                 className="flex items-center gap-2 px-4 py-2 bg-indigo-600 hover:bg-indigo-700 text-white rounded-lg font-medium transition-colors"
               >